@@ -1,118 +1,203 @@
 import asyncio
-import json
 import os
-from pyppeteer import launch
+import re
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
 
-CHROMIUM_PATH = "./chrome-win/chrome.exe"
-AXE_JS_URL = "https://cdnjs.cloudflare.com/ajax/libs/axe-core/4.4.1/axe.min.js"
+import requests
 
+from accessibility_checker.browser_pool import BrowserPool
 
-async def analyze_local_html(folder_path):
-    """
-    Ejecuta axe-core en todos los archivos .html dentro de la carpeta 'folder_path'.
-    """
+# Versión de axe-core fijada (se puede cambiar con la variable de entorno AXE_VERSION)
+AXE_VERSION = os.environ.get("AXE_VERSION", "4.4.1")
+AXE_JS_URL = f"https://cdnjs.cloudflare.com/ajax/libs/axe-core/{AXE_VERSION}/axe.min.js"
 
-    # 1️⃣ Verificar que la ruta es una carpeta válida
-    if not os.path.isdir(folder_path):
-        raise NotADirectoryError(f"🚫 La ruta {folder_path} no es una carpeta válida.")
+# Archivo axe.min.js local (vendorizado) para entornos sin red; si no se indica, se usa la caché
+AXE_JS_PATH = os.environ.get("AXE_JS_PATH")
+AXE_CACHE_FOLDER = os.environ.get("AXE_CACHE_FOLDER", ".axe_cache")
 
-    # 2️⃣ Obtener lista de archivos .html en la carpeta
-    html_files = [f for f in os.listdir(folder_path) if f.endswith(".html")]
-    if not html_files:
-        print(f"⚠️ No se encontraron archivos .html en {folder_path}.")
-        return []
+# Máximo que esperamos a que `axe` esté disponible tras inyectarlo
+AXE_READY_TIMEOUT_MS = 10000
 
-    # 3️⃣ Abrir navegador UNA sola vez para procesar todos los archivos
-    browser = await launch(headless=True, executablePath=CHROMIUM_PATH, args=["--no-sandbox"])
-    results = []
+# Timeout de navegación por defecto (con HostHealth se usa el aprendido del host, si es menor)
+NAVIGATION_TIMEOUT_MS = 60000
 
-    try:
-        for html_file in html_files:
-            file_path = os.path.join(folder_path, html_file)  # Ruta completa del archivo
-            abs_path = os.path.abspath(file_path)
-            file_url = "file:///" + abs_path.replace("\\", "/")  # Convertir a URL local
+_axe_source = None  # Código de axe-core, leído UNA vez por proceso
+_axe_source_version = None  # Versión que declara ese código (cabecera "/*! axe vX.Y.Z")
+# Evita que varias pestañas lo descarguen a la vez. Es un lock de hilos y no de asyncio
+# porque se toma dentro del executor: sirve para cualquier event loop del proceso.
+_axe_source_lock = threading.Lock()
 
-            page = await browser.newPage()
 
-            try:
-                # 4️⃣ Cargar el archivo HTML local en el navegador
-                await page.goto(file_url, {"waitUntil": "domcontentloaded", "timeout": 60000})
+@asynccontextmanager
+async def _pool_or_temporary(pool, max_tabs=1):
+    """Usa el pool compartido si lo hay; si no, abre uno propio y lo cierra al terminar."""
+    if pool is not None:
+        yield pool
+        return
+    async with BrowserPool(browsers=1, max_tabs=max_tabs) as temporary_pool:
+        yield temporary_pool
 
-                # 5️⃣ Inyectar axe-core en la página
-                await page.addScriptTag({"url": AXE_JS_URL})
-                await asyncio.sleep(2)
 
-                # 6️⃣ Verificar si axe-core se cargó antes de ejecutarlo
-                axe_loaded = await page.evaluate("typeof axe !== 'undefined'")
-                if not axe_loaded:
-                    raise RuntimeError("axe-core no se cargó correctamente")
+def _download_axe(cache_path):
+    """Descarga axe-core de la CDN a la caché local (escritura atómica)."""
+    print(f"⬇️ Descargando axe-core {AXE_VERSION} a {cache_path}...")
+    response = requests.get(AXE_JS_URL, timeout=30)
+    response.raise_for_status()
 
-                # 7️⃣ Ejecutar análisis de accesibilidad con axe
-                axe_result = await page.evaluate("axe.run()")
-                results.append({
-                    "file_path": file_path,
-                    "violations": axe_result.get("violations", [])
-                })
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(response.text)
+    os.replace(tmp_path, cache_path)
 
-            except Exception as e:
-                print(f"❌ Error al analizar {file_path}: {e}")
-                results.append({
-                    "file_path": file_path,
-                    "violations": [],
-                    "error": str(e)
-                })
 
-            finally:
-                await page.close()  # Cerramos la pestaña
+def load_axe_source():
+    """
+    Devuelve el código de axe-core, leído una sola vez por proceso:
+    1) AXE_JS_PATH si está definido (archivo vendorizado, sin red).
+    2) La caché local `.axe_cache/axe-<versión>.min.js`.
+    3) Si no está en caché, se descarga de la CDN y se guarda para la próxima vez.
+    """
+    global _axe_source, _axe_source_version
+    with _axe_source_lock:
+        if _axe_source is not None:
+            return _axe_source
+
+        if AXE_JS_PATH:
+            source_path = AXE_JS_PATH
+        else:
+            source_path = os.path.join(AXE_CACHE_FOLDER, f"axe-{AXE_VERSION}.min.js")
+            if not os.path.isfile(source_path):
+                _download_axe(source_path)
 
-    finally:
-        await browser.close()  # Cerramos el navegador
+        with open(source_path, "r", encoding="utf-8") as f:
+            source = f.read()
+        # El archivo vendorizado puede no coincidir con AXE_VERSION: manda su cabecera
+        match = re.match(r"\s*/\*!?\s*axe v(\S+)", source)
+        _axe_source_version = match.group(1) if match else AXE_VERSION
+        _axe_source = source
+        return _axe_source
 
-    return results
 
+async def load_axe_source_async():
+    """`load_axe_source` sin bloquear el event loop: la lectura o descarga va en un hilo."""
+    if _axe_source is not None:
+        return _axe_source
+    return await asyncio.get_running_loop().run_in_executor(None, load_axe_source)
 
-async def analyze_accessibility(url):
-    """
-    Ejecuta axe-core en una página con Chromium usando una URL online.
-    (Código original tuyo, mantenemos la lógica, solo añadimos comentarios)
-    """
-    browser = await launch(headless=True, executablePath=CHROMIUM_PATH, args=["--no-sandbox"])
-    page = await browser.newPage()
+
+def _axe_ready_check():
+    """Expresión JS: `axe` existe y es la versión fijada (no la que traiga el sitio)."""
+    return f"typeof axe !== 'undefined' && axe.version === {_axe_source_version!r}"
+
+
+async def _inject_axe(page):
+    """Inyecta axe-core inline y espera (sondeo, sin sleep fijo) a que esté disponible."""
+    source = await load_axe_source_async()
+    ready_check = _axe_ready_check()
+
+    # Si la página ya tiene NUESTRO axe (p. ej. otra medición en la misma pestaña), no lo
+    # reinyectamos; un axe propio del sitio (otra versión) se sobrescribe con el fijado
+    if await page.evaluate(ready_check):
+        return
 
     try:
-        await page.goto(url, {"waitUntil": "domcontentloaded", "timeout": 60000})
+        await page.addScriptTag({"content": source})
+    except Exception:
+        pass  # Se comprueba abajo igual que un bloqueo por CSP
+    # Con una CSP que bloquea scripts inline la etiqueta se añade sin error pero no se
+    # ejecuta: en ese caso lo evaluamos por el protocolo de DevTools (no sujeto a la CSP)
+    if not await page.evaluate(ready_check):
+        await page.evaluate(source, force_expr=True)
 
-        # Inyectar axe-core correctamente
-        await page.addScriptTag({"url": AXE_JS_URL})
+    try:
+        await page.waitForFunction(ready_check, {"timeout": AXE_READY_TIMEOUT_MS, "polling": 50})
+    except Exception:
+        raise RuntimeError("axe-core no se cargó correctamente")
 
-        # Esperar un poco para asegurarnos de que axe-core está disponible
-        await asyncio.sleep(2)
 
-        # Verificar si axe-core se cargó antes de ejecutarlo
-        axe_loaded = await page.evaluate("typeof axe !== 'undefined'")
-        if not axe_loaded:
-            raise RuntimeError("axe-core no se cargó correctamente")
+async def _run_axe(page):
+    """Inyecta axe-core en una pestaña ya cargada y devuelve el resultado de axe.run()."""
+    await _inject_axe(page)
+    return await page.evaluate("axe.run()")
 
-        # Ejecutar análisis con axe-core
-        results = await page.evaluate("axe.run()")
-        return {"url": url, "violations": results.get("violations", [])}
 
+async def analyze_accessibility_on_page(page, url):
+    """
+    Ejecuta axe-core sobre una pestaña YA cargada (modo fusionado: la del scraper),
+    sin volver a navegar. Devuelve el mismo formato que `analyze_accessibility`.
+    """
+    try:
+        results = await _run_axe(page)
+        return {"url": url, "violations": results.get("violations", [])}
     except Exception as e:
         print(f"❌ Error al analizar {url}: {e}")
         return {"url": url, "violations": [], "error": str(e)}
 
-    finally:
-        # Asegurar que el navegador se cierre incluso si ocurre un error
-        await browser.close()
 
+async def _wait_for_host(url, host_health):
+    """
+    Espera (sin ocupar pestaña) a que el circuito del host deje pasar cargas.
+    :return: False si el host se da por caído.
+    """
+    while not host_health.allow(url):
+        if host_health.is_down(url):
+            return False
+        await asyncio.sleep(host_health.park(url))
+    return True
+
+
+async def analyze_accessibility(url, pool=None, host_health=None):
+    """
+    Ejecuta axe-core en una página con Chromium usando una URL online.
 
-async def analyze_local_html(folder_path):
+    :param pool: `BrowserPool` compartido. Si no se pasa, se abre un navegador solo para esta URL.
+    :param host_health: `HostHealth` compartido con el scraper (opcional): si el circuito del
+                        host está abierto se espera antes de pedir pestaña, y el timeout de
+                        navegación es el aprendido del host.
+    """
+    timeout = NAVIGATION_TIMEOUT_MS
+    if host_health is not None:
+        if not await _wait_for_host(url, host_health):
+            print(f"❌ Host no disponible, axe omitido en {url}")
+            return {"url": url, "violations": [], "error": "host no disponible (circuito abierto)"}
+        timeout = host_health.navigation_timeout(url, NAVIGATION_TIMEOUT_MS)
+
+    async with _pool_or_temporary(pool) as browser_pool:
+        try:
+            async with browser_pool.tab() as page:
+                started = time.monotonic()
+                try:
+                    await page.goto(url, {"waitUntil": "domcontentloaded", "timeout": timeout})
+                except Exception:
+                    if host_health is not None:
+                        host_health.record_failure(url)
+                    raise
+                if host_health is not None:
+                    host_health.record_success(url, time.monotonic() - started)
+
+                # Inyectar y ejecutar axe-core
+                results = await _run_axe(page)
+                return {"url": url, "violations": results.get("violations", [])}
+
+        except Exception as e:
+            print(f"❌ Error al analizar {url}: {e}")
+            return {"url": url, "violations": [], "error": str(e)}
+
+
+async def analyze_local_html(folder_path, pool=None, max_tabs=4):
     """
     Ejecuta axe-core en todos los archivos .html dentro de la carpeta 'folder_path'.
 
     1) Verifica que 'folder_path' sea una carpeta.
-    2) Busca todos los .html y los analiza con Pyppeteer + axe (igual que antes, pero para cada archivo).
-    3) Retorna una lista de resultados, uno por cada archivo analizado.
+    2) Busca todos los .html y los analiza con Pyppeteer + axe, con hasta `max_tabs`
+       pestañas del pool a la vez.
+    3) Retorna una lista de resultados, uno por cada archivo analizado (en orden alfabético).
+
+    :param pool: `BrowserPool` compartido. Si no se pasa, se abre uno solo para esta carpeta.
     """
 
     # 1) Verificar que sea una carpeta válida
@@ -120,59 +205,36 @@ async def analyze_local_html(folder_path):
         raise NotADirectoryError(f"La ruta {folder_path} no es una carpeta válida.")
 
     # Obtenemos la lista de archivos .html
-    html_files = [f for f in os.listdir(folder_path) if f.endswith(".html")]
+    html_files = sorted(f for f in os.listdir(folder_path) if f.endswith(".html"))
     if not html_files:
         print(f"⚠️ No se encontraron archivos .html en {folder_path}")
         return []
 
-    # Lanzamos el navegador UNA sola vez, luego abrimos/cerramos páginas para cada archivo
-    browser = await launch(headless=True, executablePath=CHROMIUM_PATH, args=["--no-sandbox"])
-    results = []
+    async def analyze_file(browser_pool, html_file):
+        file_path = os.path.join(folder_path, html_file)
+        abs_path = os.path.abspath(file_path)
+        file_url = "file:///" + abs_path.replace("\\", "/")
 
-    try:
-        for html_file in html_files:
-            file_path = os.path.join(folder_path, html_file)
-            abs_path = os.path.abspath(file_path)
-            file_url = "file:///" + abs_path.replace("\\", "/")
-
-            page = await browser.newPage()
-            try:
+        try:
+            async with browser_pool.tab() as page:
                 # Cargamos cada archivo local
                 await page.goto(file_url, {"waitUntil": "domcontentloaded", "timeout": 60000})
 
-                # Inyectar axe-core
-                await page.addScriptTag({"url": AXE_JS_URL})
-                await asyncio.sleep(2)
-
-                # Verificar si axe-core está disponible
-                axe_loaded = await page.evaluate("typeof axe !== 'undefined'")
-                if not axe_loaded:
-                    raise RuntimeError("axe-core no se cargó correctamente")
-
-                # Ejecutamos axe.run()
-                axe_result = await page.evaluate("axe.run()")
-                results.append({
+                # Inyectar y ejecutar axe-core
+                axe_result = await _run_axe(page)
+                return {
                     "file_path": file_path,
                     "violations": axe_result.get("violations", [])
-                })
-
-            except Exception as e:
-                print(f"❌ Error al analizar {file_path}: {e}")
-                results.append({
-                    "file_path": file_path,
-                    "violations": [],
-                    "error": str(e)
-                })
-
-            finally:
-                # Cerramos la pestaña (no el navegador completo)
-                await page.close()
-
-    finally:
-        # Al terminar todos los archivos, cerramos el navegador
-        await browser.close()
-
-    return results
-
-
-
+                }
+
+        except Exception as e:
+            print(f"❌ Error al analizar {file_path}: {e}")
+            return {
+                "file_path": file_path,
+                "violations": [],
+                "error": str(e)
+            }
+
+    # Las pestañas salen del pool (el navegador se arranca una sola vez)
+    async with _pool_or_temporary(pool, max_tabs=max_tabs) as browser_pool:
+        return await asyncio.gather(*(analyze_file(browser_pool, html_file) for html_file in html_files))
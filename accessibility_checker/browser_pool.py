@@ -0,0 +1,243 @@
+# browser_pool.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from urllib.parse import urlparse
+
+from pyppeteer import launch
+
+CHROMIUM_PATH = "./chrome-win/chrome.exe"
+LAUNCH_OPTIONS = {
+    "headless": True,
+    "executablePath": CHROMIUM_PATH,
+    "args": ["--no-sandbox"]
+}
+
+
+class _BrowserSlot:
+    """Un proceso de Chromium del pool y sus pestañas abiertas."""
+
+    def __init__(self, index):
+        self.index = index
+        self.browser = None
+        self.alive = False
+        self.generation = 0  # Aumenta en cada (re)arranque: invalida pestañas del proceso anterior
+        self.open_tabs = 0
+
+
+class _Tab:
+    """Pestaña del pool: la página de pyppeteer, su navegador y cuántas veces se ha usado."""
+
+    def __init__(self, page, slot):
+        self.page = page
+        self.slot = slot
+        self.generation = slot.generation
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Pool de navegadores Chromium de larga duración, compartido por el scraper y los
+    análisis de axe (URLs y archivos locales).
+
+    - Arranca `browsers` procesos de Chromium UNA vez (sin arranque en frío por página).
+    - Presta pestañas con `async with pool.tab() as page:`; como mucho `max_tabs` a la vez.
+    - Recicla cada pestaña tras `max_uses_per_tab` usos para acotar la memoria.
+    - Si un navegador se cae (evento "disconnected"), se relanza en la siguiente petición
+      y sus pestañas se descartan.
+    - `lighthouse_browsers` navegadores más, reservados para Lighthouse: `debugging_port()`
+      presta uno en exclusiva y Lighthouse se conecta a él con `--port` en vez de arrancar
+      su propio Chrome en cada ejecución. Las pestañas de `tab()` nunca usan estos navegadores.
+    """
+
+    def __init__(self, browsers=1, max_tabs=4, max_uses_per_tab=20, launch_options=None, lighthouse_browsers=0):
+        self.max_tabs = max_tabs
+        self.max_uses_per_tab = max_uses_per_tab
+        self.launch_options = launch_options or LAUNCH_OPTIONS
+
+        self._slots = [_BrowserSlot(index) for index in range(max(browsers, 1))]
+        self._lighthouse_slots = [_BrowserSlot(len(self._slots) + index) for index in range(lighthouse_browsers)]
+        self._free_lighthouse_slots = asyncio.Queue()
+        for slot in self._lighthouse_slots:
+            self._free_lighthouse_slots.put_nowait(slot)
+        self._idle_tabs = []
+        self._tab_semaphore = asyncio.Semaphore(max_tabs)
+        self._tabs_in_use = 0
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+        # Contadores para diagnóstico
+        self.stats = {"launches": 0, "restarts": 0, "tabs_created": 0, "tabs_recycled": 0, "lighthouse_leases": 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Arranca todos los navegadores del pool."""
+        async with self._lock:
+            for slot in self._slots + self._lighthouse_slots:
+                if not slot.alive:
+                    await self._launch(slot)
+
+    async def close(self):
+        """Cierra todas las pestañas y navegadores."""
+        self._closed = True
+        async with self._lock:
+            self._idle_tabs = []
+            for slot in self._slots + self._lighthouse_slots:
+                await self._shutdown(slot)
+
+    async def _launch(self, slot):
+        """(Re)arranca el Chromium de `slot`."""
+        if slot.browser is not None:
+            self.stats["restarts"] += 1
+            await self._shutdown(slot)
+
+        browser = await launch(**self.launch_options)
+        slot.browser = browser
+        slot.alive = True
+        slot.generation += 1
+        slot.open_tabs = 0
+        self.stats["launches"] += 1
+
+        def on_disconnected():
+            # Solo marcamos si sigue siendo el navegador actual del slot (no uno ya reemplazado)
+            if slot.browser is browser:
+                slot.alive = False
+                if not self._closed:
+                    print(f"⚠️ Navegador {slot.index} desconectado. Se relanzará en la próxima petición.")
+
+        browser.on("disconnected", on_disconnected)
+
+    async def _shutdown(self, slot):
+        """Cierra el navegador de `slot` ignorando errores (puede estar ya muerto)."""
+        browser = slot.browser
+        slot.alive = False
+        slot.open_tabs = 0
+        if browser is None:
+            return
+        try:
+            await browser.close()
+        except Exception:
+            pass
+
+    async def _new_tab(self):
+        """Abre una pestaña en el navegador vivo con menos pestañas (relanzando los caídos)."""
+        async with self._lock:
+            for slot in self._slots:
+                if not slot.alive:
+                    await self._launch(slot)
+
+            slot = min(self._slots, key=lambda s: s.open_tabs)
+            page = await slot.browser.newPage()
+            slot.open_tabs += 1
+            self.stats["tabs_created"] += 1
+            return _Tab(page, slot)
+
+    def _is_usable(self, tab):
+        return tab.slot.alive and tab.generation == tab.slot.generation and not tab.page.isClosed()
+
+    async def _discard(self, tab):
+        """Cierra una pestaña (si su navegador sigue vivo) y la saca de la cuenta."""
+        self.stats["tabs_recycled"] += 1
+        if tab.generation != tab.slot.generation:
+            return  # Su navegador ya fue relanzado: la pestaña murió con él
+        tab.slot.open_tabs = max(tab.slot.open_tabs - 1, 0)
+        if tab.slot.alive and not tab.page.isClosed():
+            try:
+                await tab.page.close()
+            except Exception:
+                pass
+
+    async def acquire_tab(self):
+        """Presta una pestaña (esperando si ya hay `max_tabs` en uso). Devuélvela con `release_tab`."""
+        if self._closed:
+            raise RuntimeError("BrowserPool cerrado")
+
+        await self._tab_semaphore.acquire()
+        self._tabs_in_use += 1
+        try:
+            while self._idle_tabs:
+                tab = self._idle_tabs.pop()
+                if self._is_usable(tab):
+                    return tab
+                await self._discard(tab)
+            return await self._new_tab()
+        except Exception:
+            self._tabs_in_use -= 1
+            self._tab_semaphore.release()
+            raise
+
+    async def release_tab(self, tab, broken=False):
+        """Devuelve la pestaña al pool; se recicla si está rota o agotó sus usos."""
+        try:
+            tab.uses += 1
+            if broken or self._closed or tab.uses >= self.max_uses_per_tab or not self._is_usable(tab):
+                await self._discard(tab)
+            else:
+                self._idle_tabs.append(tab)
+        finally:
+            self._tabs_in_use -= 1
+            self._tab_semaphore.release()
+
+    def has_lighthouse_browsers(self):
+        return bool(self._lighthouse_slots)
+
+    @asynccontextmanager
+    async def debugging_port(self):
+        """
+        Uso: `async with pool.debugging_port() as port:` y lanzar Lighthouse con `--port=port`.
+        Presta un navegador reservado para Lighthouse en exclusiva (una ejecución por navegador
+        a la vez: Lighthouse abre su propio target y resetea el almacenamiento del origen, así
+        no interfiere con otra auditoría). Al devolverlo se cierran los targets que quedaran
+        abiertos (p. ej. si Lighthouse se mató por timeout).
+        """
+        if not self._lighthouse_slots:
+            raise RuntimeError("BrowserPool sin navegadores para Lighthouse (lighthouse_browsers=0)")
+        if self._closed:
+            raise RuntimeError("BrowserPool cerrado")
+
+        slot = await self._free_lighthouse_slots.get()
+        try:
+            async with self._lock:
+                if not slot.alive:
+                    await self._launch(slot)
+            self.stats["lighthouse_leases"] += 1
+            yield urlparse(slot.browser.wsEndpoint).port
+        finally:
+            await self._close_extra_targets(slot)
+            self._free_lighthouse_slots.put_nowait(slot)
+
+    async def _close_extra_targets(self, slot):
+        """Deja el navegador como al arrancar: solo su primera pestaña."""
+        if not slot.alive:
+            return
+        try:
+            for page in (await slot.browser.pages())[1:]:
+                await page.close()
+        except Exception:
+            pass  # Navegador caído: se relanzará en el siguiente préstamo
+
+    def has_free_tab(self):
+        """True si `tab()` puede prestar una pestaña ahora mismo, sin esperar."""
+        return self._tabs_in_use < self.max_tabs
+
+    @asynccontextmanager
+    async def tab(self):
+        """
+        Uso: `async with pool.tab() as page: await page.goto(url)`.
+        Si el bloque lanza una excepción, la pestaña se descarta (su estado es dudoso).
+        """
+        tab = await self.acquire_tab()
+        broken = False
+        try:
+            yield tab.page
+        except BaseException:
+            broken = True
+            raise
+        finally:
+            await self.release_tab(tab, broken=broken)
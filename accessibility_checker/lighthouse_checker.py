@@ -1,6 +1,11 @@
+import asyncio
 import subprocess
 import json
 import os
+import shutil
+import signal
+import tempfile
+import time
 
 LIGHTHOUSE_EXECUTABLE = "C:\\Users\\namic\\AppData\\Roaming\\npm\\lighthouse.cmd"
 LIGHTHOUSE_OPTIONS = [
@@ -10,15 +15,50 @@ LIGHTHOUSE_OPTIONS = [
     "--output=json"
 ]
 
-def analyze_lighthouse(url):
+# Máximo que puede tardar una ejecución de Lighthouse antes de matarla
+LIGHTHOUSE_TIMEOUT = 180
+
+
+def _extract_accessibility_errors(report):
+    """Auditorías de la categoría de accesibilidad del informe que no pasan (score < 1 o None)."""
+    # 📌 Extraer solo la categoría de accesibilidad
+    accessibility_audits = report["categories"]["accessibility"]["auditRefs"]
+    audits = report["audits"]
+
+    errors = []
+    for audit in accessibility_audits:
+        audit_id = audit["id"]
+        audit_data = audits.get(audit_id, {})
+
+        # Obtener el puntaje (score) de la auditoría, asegurando que no sea None
+        score = audit_data.get("score", 1.0)
+        if score is None or (isinstance(score, (int, float)) and score < 1.0):
+            errors.append({
+                "id": audit_id,
+                "title": audit_data.get("title"),
+                "description": audit_data.get("description"),
+                "help_url": audit_data.get("help"),
+                "nodes": audit_data.get("details", {}).get("items", [])
+            })
+
+    return errors
+
+
+def analyze_lighthouse(url, output_path=None, timeout=LIGHTHOUSE_TIMEOUT):
     """
     Ejecuta Google Lighthouse para evaluar accesibilidad en la URL dada y filtra solo los errores detectados.
 
     :param url: (str) La URL de la página a analizar.
+    :param output_path: (str) Dónde escribe Lighthouse su informe JSON. Por defecto, un archivo
+                        en una carpeta temporal propia de esta ejecución (se borra al terminar),
+                        así varias ejecuciones en paralelo no se pisan.
+    :param timeout: (int) Segundos máximos de la ejecución; pasado ese tiempo se mata el proceso.
     :return: (list) Lista de errores de accesibilidad detectados.
     """
-
-    output_path = "lighthouse_report.json"
+    tmp_dir = None
+    if output_path is None:
+        tmp_dir = tempfile.mkdtemp(prefix="lighthouse_")
+        output_path = os.path.join(tmp_dir, "report.json")
 
     command = [
         LIGHTHOUSE_EXECUTABLE, url,
@@ -28,7 +68,7 @@ def analyze_lighthouse(url):
 
     try:
         print(f"🚀 Ejecutando Lighthouse en {url}...")
-        subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
 
         if not os.path.exists(output_path):
             raise FileNotFoundError("Lighthouse no generó el archivo esperado.")
@@ -36,27 +76,11 @@ def analyze_lighthouse(url):
         with open(output_path, "r", encoding="utf-8") as file:
             report = json.load(file)
 
-        # 📌 Extraer solo la categoría de accesibilidad
-        accessibility_audits = report["categories"]["accessibility"]["auditRefs"]
-        audits = report["audits"]
-
-        errors = []
-        for audit in accessibility_audits:
-            audit_id = audit["id"]
-            audit_data = audits.get(audit_id, {})
-
-            # Obtener el puntaje (score) de la auditoría, asegurando que no sea None
-            score = audit_data.get("score", 1.0)
-            if score is None or (isinstance(score, (int, float)) and score < 1.0):
-                errors.append({
-                    "id": audit_id,
-                    "title": audit_data.get("title"),
-                    "description": audit_data.get("description"),
-                    "help_url": audit_data.get("help"),
-                    "nodes": audit_data.get("details", {}).get("items", [])
-                })
+        return _extract_accessibility_errors(report)
 
-        return errors
+    except subprocess.TimeoutExpired:
+        print(f"⏱️ Lighthouse superó {timeout} s en {url}. Proceso terminado.")
+        return [{"url": url, "error": f"timeout ({timeout} s)"}]
 
     except subprocess.CalledProcessError as e:
         print(f"❌ Error al ejecutar Lighthouse: {e}")
@@ -65,3 +89,135 @@ def analyze_lighthouse(url):
     except Exception as e:
         print(f"⚠️ Lighthouse falló: {e}")
         return [{"url": url, "error": str(e)}]
+
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _new_process_group_options():
+    """Opciones para lanzar Lighthouse en su propio grupo de procesos (para poder matar el árbol)."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+async def _kill_process_tree(process):
+    """Mata Lighthouse y sus hijos (node, Chrome) y espera a que terminen."""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == "nt":
+            # lighthouse.cmd -> node -> Chrome: taskkill /T baja por todo el árbol
+            killer = await asyncio.create_subprocess_exec(
+                "taskkill", "/F", "/T", "/PID", str(process.pid),
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            await killer.wait()
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        pass
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await process.wait()
+
+
+async def analyze_lighthouse_async(url, timeout=LIGHTHOUSE_TIMEOUT, port=None):
+    """
+    Versión asíncrona de `analyze_lighthouse`: no bloquea el event loop mientras Lighthouse trabaja.
+
+    El informe se lee de la salida estándar (`--output-path=stdout`), sin archivos intermedios.
+    Si se supera `timeout` o se cancela la tarea, se mata el árbol de procesos entero
+    (Lighthouse, node y el Chrome que lanza); la cancelación se propaga.
+
+    :param port: puerto de depuración remota de un Chrome ya abierto (ver
+                 `BrowserPool.debugging_port`). Lighthouse abre en él un target nuevo en vez de
+                 arrancar su propio Chrome; el reseteo de almacenamiento se mantiene.
+    :return: (list) Lista de errores de accesibilidad detectados (o [{"url", "error"}]).
+    """
+    command = [
+        LIGHTHOUSE_EXECUTABLE, url,
+        *LIGHTHOUSE_OPTIONS,
+        "--output-path=stdout"
+    ]
+    if port is not None:
+        command.append(f"--port={port}")
+
+    print(f"🚀 Ejecutando Lighthouse en {url}...")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_new_process_group_options()
+        )
+    except OSError as e:
+        print(f"❌ Error al ejecutar Lighthouse: {e}")
+        return [{"url": url, "error": str(e)}]
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill_process_tree(process)
+        print(f"⏱️ Lighthouse superó {timeout} s en {url}. Proceso terminado.")
+        return [{"url": url, "error": f"timeout ({timeout} s)"}]
+    except asyncio.CancelledError:
+        await _kill_process_tree(process)
+        raise
+
+    if process.returncode != 0:
+        message = f"Lighthouse terminó con código {process.returncode}: {stderr.decode('utf-8', errors='replace').strip()[-500:]}"
+        print(f"❌ Error al ejecutar Lighthouse: {message}")
+        return [{"url": url, "error": message}]
+
+    try:
+        return _extract_accessibility_errors(json.loads(stdout))
+    except Exception as e:
+        print(f"⚠️ Lighthouse falló: {e}")
+        return [{"url": url, "error": str(e)}]
+
+
+class LighthouseRunner:
+    """
+    Ejecuta Lighthouse desde asyncio sin bloquear el event loop (`analyze_lighthouse_async`).
+
+    - Como mucho `max_processes` procesos de Lighthouse a la vez (el resto espera su turno).
+    - El informe llega por stdout: ninguna ejecución comparte archivos con otra.
+    - Cada ejecución tiene un límite de `timeout` segundos; al superarlo o al cancelar la
+      tarea se mata su árbol de procesos.
+    - Con un `pool` (BrowserPool con `lighthouse_browsers`), cada ejecución se conecta a uno
+      de sus navegadores ya abiertos en vez de arrancar y cerrar un Chrome propio.
+    Uso: `runner = LighthouseRunner(2)` y `errores = await runner.run(url)`.
+    """
+
+    def __init__(self, max_processes=2, timeout=LIGHTHOUSE_TIMEOUT, pool=None):
+        self.max_processes = max_processes
+        self.timeout = timeout
+        self.pool = pool if pool is not None and pool.has_lighthouse_browsers() else None
+        self._slots = asyncio.Semaphore(max_processes)
+        self.stats = {"runs": 0, "errors": 0, "seconds": 0.0}
+
+    async def run(self, url):
+        """Errores de accesibilidad de Lighthouse para `url` (misma salida que `analyze_lighthouse`)."""
+        async with self._slots:
+            started = time.monotonic()
+            if self.pool is None:
+                errors = await analyze_lighthouse_async(url, self.timeout)
+            else:
+                async with self.pool.debugging_port() as port:
+                    errors = await analyze_lighthouse_async(url, self.timeout, port=port)
+        self.stats["runs"] += 1
+        self.stats["seconds"] += time.monotonic() - started
+        if any("error" in item for item in errors):
+            self.stats["errors"] += 1
+        return errors
+
+    def print_summary(self):
+        stats = self.stats
+        if not stats["runs"]:
+            return
+        print(
+            f"🏮 Lighthouse: {stats['runs']} ejecuciones ({stats['errors']} con error), "
+            f"{stats['seconds'] / stats['runs']:.1f} s de media, hasta {self.max_processes} a la vez"
+        )
@@ -0,0 +1,123 @@
+# parse_backends.py
+"""
+Benchmark de los parsers HTML disponibles en parser_backend.py.
+
+Mide el tiempo de parseo (mejor de N repeticiones) de cada backend:
+  - html.parser            (puro Python, referencia)
+  - lxml                   (C, sin números de línea; lo que usa el scraper)
+  - lxml + sourceline      (C, con `sourceline` anotado; lo que usan los testers)
+
+Sobre:
+  1) Cada fixture de html_succesfull_pass/.
+  2) Una página grande (varios MB): la indicada con --page (p. ej. una página
+     guardada del crawl) o, si no se indica, una sintética construida repitiendo
+     los cuerpos de los fixtures hasta --size-mb.
+
+Uso (desde la raíz del repo):
+    python -m benchmarks.parse_backends
+    python -m benchmarks.parse_backends --page pagina_crawleada.html --repeat 5
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+
+from parser_backend import LXML_AVAILABLE, make_soup
+
+FIXTURES_FOLDER = "html_succesfull_pass"
+
+BACKENDS = [
+    ("html.parser", {"parser": "html.parser"}),
+    ("lxml", {"parser": "lxml", "sourcelines": False}),
+    ("lxml + sourceline", {"parser": "lxml", "sourcelines": True}),
+]
+
+
+def best_time(html_content, options, repeat):
+    """Mejor tiempo (segundos) de `repeat` parseos."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        make_soup(html_content, **options)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def available_backends():
+    if LXML_AVAILABLE:
+        return BACKENDS
+    print("⚠️ lxml no está instalado: solo se mide html.parser.")
+    return BACKENDS[:1]
+
+
+def build_large_page(fixtures, size_mb):
+    """Página sintética de ~size_mb MB con los <body> de los fixtures repetidos."""
+    bodies = []
+    for html_content in fixtures.values():
+        match = re.search(r"<body[^>]*>(.*)</body>", html_content, re.S | re.I)
+        bodies.append(match.group(1) if match else html_content)
+    chunk = "\n".join(bodies)
+
+    target = int(size_mb * 1024 * 1024)
+    parts = []
+    total = 0
+    while total < target:
+        parts.append(chunk)
+        total += len(chunk)
+    return "<!DOCTYPE html>\n<html><head><title>Benchmark</title></head><body>\n" + "\n".join(parts) + "\n</body></html>"
+
+
+def print_row(name, size, times):
+    cells = "".join(f"{t * 1000:>22.2f}" for t in times)
+    print(f"{name[:40]:<40}{size / 1024:>10.1f}{cells}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de parsers HTML")
+    parser.add_argument("--page", help="Página HTML grande (p. ej. guardada del crawl)")
+    parser.add_argument("--size-mb", type=float, default=5, help="Tamaño de la página sintética si no hay --page")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medida (se toma la mejor)")
+    args = parser.parse_args()
+
+    backends = available_backends()
+
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_FOLDER, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures[os.path.basename(path)] = f.read()
+
+    header = "".join(f"{name + ' (ms)':>22}" for name, _ in backends)
+    print(f"{'Documento':<40}{'KB':>10}{header}")
+
+    # 1️⃣ Fixtures
+    totals = [0.0] * len(backends)
+    for name, html_content in fixtures.items():
+        times = [best_time(html_content, options, args.repeat) for _, options in backends]
+        totals = [total + t for total, t in zip(totals, times)]
+        print_row(name, len(html_content), times)
+    if fixtures:
+        size = sum(len(html_content) for html_content in fixtures.values())
+        print_row(f"TOTAL fixtures ({len(fixtures)})", size, totals)
+
+    # 2️⃣ Página grande
+    if args.page:
+        with open(args.page, "r", encoding="utf-8", errors="replace") as f:
+            large_page = f.read()
+        label = os.path.basename(args.page)
+    else:
+        large_page = build_large_page(fixtures, args.size_mb)
+        label = f"sintética ~{args.size_mb:g} MB"
+
+    times = [best_time(large_page, options, args.repeat) for _, options in backends]
+    print_row(label, len(large_page), times)
+
+    if len(backends) > 1:
+        print(f"\n🚀 Speed-up lxml + sourceline vs html.parser en {label}: {times[0] / times[-1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,34 @@
+import argparse
 import json
 import asyncio
 import os
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
 
 from scraper.scraper import WebScraper
-from accessibility_checker.axe_checker import analyze_accessibility, analyze_local_html
-from accessibility_checker.lighthouse_checker import analyze_lighthouse  # 🔥 NUEVO
+from scraper.checkpoint import CHECKPOINT_FILE, CrawlCheckpoint
+from scraper.host_health import HEDGE_PERCENTILE, HostHealth
+from scraper.rate_limiter import RateLimiter
+from scraper.discovery import NormalizationPolicy, UrlDiscovery
+from scraper.http_cache import HttpCache
+from scraper.templates import TemplateClusterer
+from accessibility_checker import axe_checker, lighthouse_checker
+from accessibility_checker.axe_checker import AXE_VERSION, analyze_accessibility, analyze_accessibility_on_page, analyze_local_html
+from accessibility_checker.browser_pool import BrowserPool
+from accessibility_checker.lighthouse_checker import LIGHTHOUSE_TIMEOUT, LighthouseRunner  # 🔥 NUEVO
 
 from reports.generate_report import generate_report
+from transform_json_to_excel import flush_excel_buffer
+from results_store import RESULTS_STORE_FILE, ResultsStore, content_hash, source_version
 
+from manual_checks import shared_components
+from manual_checks.shared_components import DEFAULT_COMPONENTS_FILE, ComponentRegistry
 from manual_checks.global_tester import (
-    run_all_testers,
+    DEFAULT_WORKERS,
+    TESTERS_BY_NAME,
+    CHEAP_TESTERS,
+    tester_versions,
+    run_testers_job,
+    collect_testers_result,
     run_all_testers_in_folder,
     report_incidences_to_file
 )
@@ -18,50 +36,369 @@ from manual_checks.global_tester import (
 FILTER_BY_CLASS = False  # Filtrar por clase específica
 TARGET_CLASS = "web-inherited-reference"
 
-async def main():
+# Modo fusionado: axe se ejecuta en la pestaña que el scraper ya tiene abierta
+# (una sola navegación por página). Con False, axe vuelve a cargar cada URL.
+FUSED_MODE = True
+
+# Recursos que el crawler no descarga: "crawl_only" (solo DOM), "full_render" (para axe)
+# o None para elegir automáticamente según FUSED_MODE (ver scraper/resource_policy.py)
+RESOURCE_PROFILE = None
+
+# Descubrimiento de URLs: sembrar la frontera con robots.txt / sitemap.xml y cómo se
+# deduplican las URLs (ver NormalizationPolicy en scraper/discovery.py)
+USE_SITEMAPS = True
+URL_POLICY = NormalizationPolicy(keep_query=False, strip_trailing_slash=True, collapse_locales=False)
+
+# Modo muestreo por plantillas: las páginas se agrupan por estructura del DOM y solo
+# REPRESENTATIVES_PER_TEMPLATE páginas de cada plantilla pasan axe, Lighthouse y los testers
+# caros (OCR, modelos); el resto solo los testers estáticos baratos.
+SAMPLING_MODE = False
+REPRESENTATIVES_PER_TEMPLATE = 3
+TEMPLATE_SIMILARITY = 0.7      # Jaccard estimado mínimo entre páginas de la misma plantilla
+
+# Componentes compartidos: cabeceras, menús y pies idénticos en muchas páginas se analizan
+# una vez (reglas con scope "element") y sus incidencias se informan solo en la primera
+# página; shared_components.json indica en qué páginas aparece cada componente.
+SHARED_COMPONENTS = True
+
+# Caché HTTP en disco entre ejecuciones (HTML e imágenes, revalidados con ETag/Last-Modified).
+# None para desactivarla.
+HTTP_CACHE_FOLDER = ".http_cache"
+HTTP_CACHE_MAX_MB = 500
+
+# Re-auditoría incremental: si el HTML de una página no cambió desde la última ejecución,
+# se reutilizan los resultados de axe, Lighthouse y de cada tester manual (salvo los que
+# se hayan editado). None para auditar siempre todo.
+RESULTS_STORE_PATH = RESULTS_STORE_FILE
+
+# Ritmo por host (ver scraper/rate_limiter.py): se respetan Disallow y Crawl-delay de
+# robots.txt y, ante respuestas 429/503 o latencias altas, se reducen las cargas simultáneas
+# (como mucho MAX_TABS_PER_HOST) y se espacian las siguientes.
+RESPECT_ROBOTS_TXT = True
+
+# Salud de cada host (ver scraper/host_health.py): si el p95 de latencia se degrada o hay
+# fallos seguidos, el circuito del host se abre y sus URLs se aparcan (scraper y axe) en vez
+# de esperar timeouts. HEDGED_NAVIGATION lanza una segunda navegación en otra pestaña cuando
+# la primera supera el percentil HEDGE_PERCENTILE de latencia del host.
+HEDGED_NAVIGATION = False
+
+# Checkpoint del crawl (frontera, URLs visitadas y páginas terminadas) guardado sobre la
+# marcha: con `python main.py --resume` un crawl interrumpido continúa donde se quedó sin
+# volver a cargar las páginas ya terminadas. None para desactivarlo.
+CHECKPOINT_PATH = CHECKPOINT_FILE
+
+# Concurrencia máxima por tipo de recurso
+BROWSER_POOL_SIZE = 1          # Procesos de Chromium compartidos (scraper + axe)
+MAX_BROWSER_TABS = 4           # Pestañas de Chromium abiertas a la vez (las limita el BrowserPool)
+TAB_MAX_USES = 20              # Usos de una pestaña antes de reciclarla (acota la memoria)
+MAX_TABS_PER_HOST = 2          # Páginas del mismo host cargando a la vez durante el crawl
+MAX_LIGHTHOUSE_PROCESSES = 2   # Procesos de Lighthouse simultáneos
+LIGHTHOUSE_TIMEOUT_S = LIGHTHOUSE_TIMEOUT  # Máximo por ejecución de Lighthouse
+LIGHTHOUSE_ON_POOL = True      # Lighthouse usa navegadores del BrowserPool (uno por proceso) en vez de su propio Chrome
+MANUAL_WORKERS = DEFAULT_WORKERS  # Procesos para los testers manuales (1 = secuencial)
+MAX_PAGES_IN_AUDIT = 8         # Páginas auditándose a la vez mientras el crawl sigue
+PAGE_QUEUE_SIZE = 4            # Páginas scrapeadas esperando auditoría (backpressure sobre el crawl)
+
+
+def audit_versions():
+    """Versión de cada etapa para la re-auditoría incremental (cambia al editar su código)."""
+    manual_extra = TARGET_CLASS if FILTER_BY_CLASS else ""
+    manual_versions = tester_versions()
+    return {
+        "axe": source_version(axe_checker, extra=AXE_VERSION),
+        "lighthouse": source_version(lighthouse_checker),
+        "manual": {name: version + manual_extra for name, version in manual_versions.items()},
+        # Componentes de cada página con sus incidencias: dependen de todos los testers
+        "components": source_version(shared_components, extra="".join(sorted(manual_versions.values())) + manual_extra)
+    }
+
+
+def make_cached_axe_analyzer(store, version):
+    """
+    Analizador de axe para el modo fusionado que consulta antes el ResultsStore:
+    si el HTML de la pestaña no cambió, no se inyecta ni se ejecuta axe.
+    """
+    async def analyzer(page, url):
+        page_hash = content_hash(await page.content())
+        cached = store.get(url, "axe", page_hash, version)
+        if cached is not None:
+            return cached
+        result = await analyze_accessibility_on_page(page, url)
+        if "error" not in result:
+            store.put(url, "axe", page_hash, version, result)
+        return result
+
+    return analyzer
+
+
+def make_cached_page_analysis(store, axe_version):
+    """
+    `cached_analysis` del scraper: axe guardado para el HTML de la caché HTTP. Con él,
+    una página que responde 304 no se vuelve a renderizar aunque el modo fusionado esté activo.
+    """
+    def cached_analysis(url, html):
+        cached = store.get(url, "axe", content_hash(html), axe_version)
+        return None if cached is None else {"axe": cached}
+
+    return cached_analysis
+
+
+async def audit_page(page, limits):
+    """
+    Audita UNA página: axe, Lighthouse y testers manuales a la vez.
+    Cada etapa espera a su semáforo, así que el total de recursos en uso está acotado.
+    Con un ResultsStore (`limits["results_store"]`) solo se ejecuta lo que cambió.
+    En modo muestreo, una página que no representa a su plantilla solo pasa los
+    testers baratos (axe y Lighthouse devuelven None).
+    Una etapa que falla no tumba las demás ni el resto de páginas: su resultado es
+    una entrada con "error", igual que las que devuelven los propios analizadores.
+    """
+    loop = asyncio.get_running_loop()
+    page_url = page["url"]
+    template = page.get("template")
+    sampled = template is not None and not template["representative"]
+    print(f"Procesando página: {page_url}" + (f" (muestreada, plantilla {template['cluster']})" if sampled else ""))
+
+    store = limits.get("results_store")
+    versions = limits.get("versions")
+    page_hash = content_hash(page.get("content", ""))
+
+    # 1️⃣ Análisis con axe-core: en modo fusionado ya viene del scraper; si no, pestaña del BrowserPool
+    async def run_axe():
+        if sampled:
+            return None
+        fused_result = page.get("analysis", {}).get("axe")
+        if fused_result is not None:
+            return fused_result  # Ya medido por el scraper en su pestaña (o reutilizado)
+        if store:
+            cached = store.get(page_url, "axe", page_hash, versions["axe"])
+            if cached is not None:
+                return cached
+        result = await analyze_accessibility(page_url, pool=limits["browser_pool"], host_health=limits.get("host_health"))
+        if store and "error" not in result:
+            store.put(page_url, "axe", page_hash, versions["axe"], result)
+        return result
+
+    # 2️⃣ Análisis con Lighthouse (solo errores). LighthouseRunner limita los procesos y no bloquea el event loop
+    async def run_lighthouse():
+        if sampled:
+            return None
+        if store:
+            cached = store.get(page_url, "lighthouse", page_hash, versions["lighthouse"])
+            if cached is not None:
+                return cached
+        result = await limits["lighthouse"].run(page_url)
+        if store and not any("error" in item for item in result):
+            store.put(page_url, "lighthouse", page_hash, versions["lighthouse"], result)
+        return result
+
+    # 3️⃣ Chequeo manual (CPU): se ejecuta en el pool de procesos
+    async def run_manual():
+        html_content = page.get("content", "")
+        if not html_content:
+            print(f"⚠️ No hay contenido HTML en {page_url} para pruebas manuales.")
+            return None
+
+        testers = CHEAP_TESTERS if sampled else list(TESTERS_BY_NAME)
+
+        # Incidencias guardadas de los testers cuya versión y página no cambiaron
+        cached_by_rule = {}
+        if store:
+            for name in testers:
+                cached = store.get(page_url, f"manual:{name}", page_hash, versions["manual"][name])
+                if cached is not None:
+                    cached_by_rule[name] = cached
+        stale_testers = [name for name in testers if name not in cached_by_rule]
+
+        result = {"page_url": page_url, "incidences": [], "incidences_by_rule": {}, "error": None}
+        components = limits.get("components")
+        if stale_testers:
+            job = {
+                "page_url": page_url,
+                "html_content": html_content,
+                "filter_class": TARGET_CLASS if FILTER_BY_CLASS else None,
+                "testers": stale_testers
+            }
+            if components is not None:
+                job["shared_components"] = True
+                job["known_components"] = components.known_hashes(
+                    name for name in stale_testers if TESTERS_BY_NAME[name].scope == "element"
+                )
+            async with limits["cpu"]:
+                if limits["cpu_executor"] is None:
+                    result = run_testers_job(job)
+                else:
+                    try:
+                        result = await loop.run_in_executor(limits["cpu_executor"], run_testers_job, job)
+                    except Exception as e:  # p. ej. un worker muerto (BrokenProcessPool)
+                        return {"page_url": page_url, "incidences": [], "error": f"{type(e).__name__}: {e}"}
+            if result["error"]:
+                return result
+            if components is not None:
+                components.merge_into(result)
+                if store:
+                    store.put(page_url, "components", page_hash, versions["components"],
+                              components.page_components(page_url))
+        elif store and components is not None:
+            # Todo salió del ResultsStore: la página igualmente cuenta en shared_components.json
+            cached_components = store.get(page_url, "components", page_hash, versions["components"])
+            if cached_components is not None:
+                components.restore_page(cached_components, page_url)
+
+        if store:
+            for name, incidences in result["incidences_by_rule"].items():
+                store.put(page_url, f"manual:{name}", page_hash, versions["manual"][name], incidences)
+
+        # Mismo orden que una ejecución completa: el de TESTERS
+        incidences_by_rule = {**cached_by_rule, **result["incidences_by_rule"]}
+        result["incidences"] = []
+        for name in testers:
+            result["incidences"].extend(incidences_by_rule.get(name, []))
+        return result
+
+    async def isolated(stage, run, error_result):
+        try:
+            return await run()
+        except Exception as e:
+            message = f"{type(e).__name__}: {e}"
+            print(f"❌ {stage} falló en {page_url}: {message}")
+            return error_result(message)
+
+    axe_result, lighthouse_result, manual_result = await asyncio.gather(
+        isolated("axe", run_axe, lambda message: {"url": page_url, "violations": [], "error": message}),
+        isolated("Lighthouse", run_lighthouse, lambda message: [{"url": page_url, "error": message}]),
+        isolated("Chequeo manual", run_manual, lambda message: {"page_url": page_url, "incidences": [], "error": message})
+    )
+    return axe_result, lighthouse_result, manual_result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoría de accesibilidad de un sitio web")
+    parser.add_argument("--resume", action="store_true",
+                        help="Reanuda el último crawl desde su checkpoint (ver CHECKPOINT_PATH)")
+    # parse_known_args: ignora opciones de otros usos (p. ej. --local)
+    return parser.parse_known_args()[0]
+
+
+async def main(resume=False):
+    # Un único pool de Chromium para todo: scraper, axe online y axe sobre archivos locales
+    async with BrowserPool(
+        browsers=BROWSER_POOL_SIZE,
+        max_tabs=MAX_BROWSER_TABS,
+        max_uses_per_tab=TAB_MAX_USES,
+        lighthouse_browsers=MAX_LIGHTHOUSE_PROCESSES if LIGHTHOUSE_ON_POOL else 0
+    ) as browser_pool:
+        await run_pipeline(browser_pool, resume=resume)
+
+
+async def run_pipeline(browser_pool, resume=False):
     start_url = "https://www.barcelo.com/en-us/"
 
     print("🔍 Scrapeando el sitio web...")
-    scraper = WebScraper(start_url)
-    pages = await scraper.run()
+    results_store = ResultsStore(RESULTS_STORE_PATH) if RESULTS_STORE_PATH else None
+    versions = audit_versions()
+
+    axe_analyzer = analyze_accessibility_on_page
+    if results_store:
+        axe_analyzer = make_cached_axe_analyzer(results_store, versions["axe"])
+    page_analyzers = {"axe": axe_analyzer} if FUSED_MODE else None
+    cached_analysis = make_cached_page_analysis(results_store, versions["axe"]) if results_store and FUSED_MODE else None
+    http_cache = HttpCache(HTTP_CACHE_FOLDER, HTTP_CACHE_MAX_MB * 1024 * 1024) if HTTP_CACHE_FOLDER else None
+    checkpoint = CrawlCheckpoint(CHECKPOINT_PATH, resume=resume) if CHECKPOINT_PATH else None
+    host_health = HostHealth(hedge_percentile=HEDGE_PERCENTILE if HEDGED_NAVIGATION else None)
+    scraper = WebScraper(
+        start_url,
+        pool=browser_pool,
+        page_analyzers=page_analyzers,
+        cached_analysis=cached_analysis,
+        concurrency=MAX_BROWSER_TABS,
+        per_host_limit=MAX_TABS_PER_HOST,
+        resource_policy=RESOURCE_PROFILE,
+        http_cache=http_cache,
+        discovery=UrlDiscovery(URL_POLICY, use_sitemaps=USE_SITEMAPS),
+        template_clusterer=TemplateClusterer(TEMPLATE_SIMILARITY, REPRESENTATIVES_PER_TEMPLATE) if SAMPLING_MODE else None,
+        checkpoint=checkpoint,
+        rate_limiter=RateLimiter(max_concurrency=MAX_TABS_PER_HOST, respect_robots=RESPECT_ROBOTS_TXT),
+        host_health=host_health
+    )
 
-    print("🧪 Analizando accesibilidad de las páginas vivas...")
+    print("🧪 Analizando accesibilidad de las páginas vivas a medida que se scrapean...")
     axe_results = []
     lighthouse_errors = []  # 🔥 Guardamos aquí SOLO los errores de Lighthouse
-    all_manual_incidences = []
 
-    for page in pages:
-        page_url = page["url"]
-        print(f"Procesando página: {page_url}")
+    lighthouse_runner = LighthouseRunner(MAX_LIGHTHOUSE_PROCESSES, timeout=LIGHTHOUSE_TIMEOUT_S, pool=browser_pool)
+    cpu_executor = ProcessPoolExecutor(max_workers=MANUAL_WORKERS) if MANUAL_WORKERS > 1 else None
+    limits = {
+        "browser_pool": browser_pool,
+        "lighthouse": lighthouse_runner,
+        "cpu": asyncio.Semaphore(max(MANUAL_WORKERS, 1)),
+        "cpu_executor": cpu_executor,
+        "results_store": results_store,
+        "versions": versions,
+        "components": ComponentRegistry() if SHARED_COMPONENTS else None,
+        "host_health": host_health,
+    }
 
-        # 1️⃣ Análisis con axe-core
-        accessibility_result = await analyze_accessibility(page_url)
-        axe_results.append(accessibility_result)
+    # Cada página se audita en cuanto el scraper la entrega. Con MAX_PAGES_IN_AUDIT páginas
+    # en auditoría dejamos de recoger más y el crawl se frena (cola de PAGE_QUEUE_SIZE):
+    # en memoria nunca hay más HTML que el de esas páginas.
+    # Los resultados de cada página se escriben en cuanto termina su auditoría (JSONL y
+    # buffer de Excel): no se acumulan hasta el final ni se pierden si el proceso se cae.
+    audit_slots = asyncio.Semaphore(MAX_PAGES_IN_AUDIT)
+    audit_tasks = set()
+
+    def report_page(axe_result, lighthouse_result, manual_result):
+        if axe_result is not None:  # None: página muestreada (ver SAMPLING_MODE)
+            axe_results.append(axe_result)
 
-        # 2️⃣ Análisis con Lighthouse (solo errores)
-        lighthouse_result = analyze_lighthouse(page_url)  # 🔥 NUEVO
         if lighthouse_result:
             lighthouse_errors.extend(lighthouse_result)  # Guardamos solo errores
 
-        # 3️⃣ Chequeo manual
-        html_content = page.get("content", "")
-        if not html_content:
-            print(f"⚠️ No hay contenido HTML en {page_url} para pruebas manuales.")
-            continue
+        if manual_result is None:
+            return
+        if limits["components"] is not None and not manual_result["error"]:
+            # Las incidencias de un componente compartido solo se informan en su primera página
+            manual_result["incidences"] = limits["components"].filter_reported(manual_result["incidences"])
+        manual_incidences = collect_testers_result(manual_result)  # -> buffer de Excel
+        if manual_incidences:
+            report_incidences_to_file(manual_incidences, "manual_incidences.jsonl")
 
-        if FILTER_BY_CLASS:
-            soup = BeautifulSoup(html_content, "html.parser")
-            target_elements = soup.find_all(class_=TARGET_CLASS)
-            html_content = "".join(str(el) for el in target_elements)
+    async def audit_and_report(page):
+        try:
+            report_page(*await audit_page(page, limits))
+        finally:
+            audit_slots.release()
 
-            if not html_content.strip():
-                print(f"⚠️ No se encontró la clase '{TARGET_CLASS}' en {page_url}. Omitiendo.")
-                continue
+    try:
+        async for page in scraper.stream(max_buffered=PAGE_QUEUE_SIZE):
+            await audit_slots.acquire()
+            task = asyncio.ensure_future(audit_and_report(page))
+            audit_tasks.add(task)
+            task.add_done_callback(audit_tasks.discard)
+        if audit_tasks:
+            await asyncio.gather(*audit_tasks)
+    finally:
+        for task in list(audit_tasks):
+            task.cancel()
+        if audit_tasks:
+            await asyncio.gather(*audit_tasks, return_exceptions=True)
+        if http_cache:
+            http_cache.close()
+        if checkpoint:
+            checkpoint.close()
+        lighthouse_runner.print_summary()
+        if cpu_executor is not None:
+            cpu_executor.shutdown(wait=True)
+        if results_store:
+            results_store.print_summary()
+            results_store.close()
 
-        manual_incidences = run_all_testers(html_content, page_url)
-        if manual_incidences:
-            all_manual_incidences.extend(manual_incidences)
-            report_incidences_to_file(manual_incidences, "manual_incidences.json")
+    if limits["components"] is not None:
+        limits["components"].print_summary()
+        limits["components"].save(DEFAULT_COMPONENTS_FILE)
+
+    # Escribir issue_report.xlsx UNA vez con las incidencias de todas las páginas vivas
+    flush_excel_buffer()
 
     # Guardar resultados de AXE
     with open("accessibility_results.json", "w", encoding="utf-8") as f:
@@ -79,33 +416,21 @@ async def main():
     if os.path.isdir(local_folder):
         print(f"\n🗂  Analizando carpeta local: {local_folder}")
 
-        local_analysis_results = await analyze_local_html(local_folder)
+        local_analysis_results = await analyze_local_html(local_folder, pool=browser_pool)
         axe_results.extend(local_analysis_results)
 
-        folder_incidences = []
-        for file_name in os.listdir(local_folder):
-            if file_name.endswith(".html"):
-                file_path = os.path.join(local_folder, file_name)
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                if FILTER_BY_CLASS:
-                    soup = BeautifulSoup(content, "html.parser")
-                    target_elements = soup.find_all(class_=TARGET_CLASS)
-                    content = "".join(str(el) for el in target_elements)
-
-                    if not content.strip():
-                        print(f"⚠️ No se encontró la clase '{TARGET_CLASS}' en {file_name}. Omitiendo.")
-                        continue
-
-                incidences = run_all_testers(content, file_path)
-                folder_incidences.extend(incidences)
+        folder_incidences = run_all_testers_in_folder(
+            local_folder,
+            workers=MANUAL_WORKERS,
+            filter_class=TARGET_CLASS if FILTER_BY_CLASS else None
+        )
 
         if folder_incidences:
-            all_manual_incidences.extend(folder_incidences)
-            report_incidences_to_file(folder_incidences, "manual_incidences.json")
+            report_incidences_to_file(folder_incidences, "manual_incidences.jsonl")
+
+        flush_excel_buffer()
 
-    print("✅ Finalizado. Revisa 'accessibility_results.json', 'lighthouse_errors.json' y 'manual_incidences.json'.")
+    print("✅ Finalizado. Revisa 'accessibility_results.json', 'lighthouse_errors.json' y 'manual_incidences.jsonl' (exporta a JSON con: python -m manual_checks.incidence_log export).")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    asyncio.run(main(resume=parse_args().resume))
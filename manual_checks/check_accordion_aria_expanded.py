@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, has_class, run_rules
 
 def get_element_info(element):
     """Retrieves useful information about an HTML element to facilitate issue identification."""
@@ -11,6 +11,58 @@ def get_element_info(element):
         "line_number": element.sourceline if hasattr(element, 'sourceline') else "N/A"  # Gets line number if available
     }
 
+class AccordionAriaExpandedRule(ManualRule):
+    """Rule for `check_accordion_aria_expanded`: collects accordion toggles during the shared traversal."""
+
+    classes = ("accordion-toggle",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.toggle_buttons = []  # <button class="accordion-toggle">
+        self.role_buttons = []    # role="button" + class="accordion-toggle"
+        self.toggle_links = []    # <a class="accordion-toggle">
+
+    def visit(self, element):
+        if not has_class(element, ["accordion-toggle"]):
+            return
+        if element.name == "button":
+            self.toggle_buttons.append(element)
+        if element.get("role") == "button":
+            self.role_buttons.append(element)
+        if element.name == "a":
+            self.toggle_links.append(element)
+
+    def finish(self, page):
+        # Find all potential accordion buttons
+        accordion_buttons = self.toggle_buttons + self.role_buttons + self.toggle_links
+
+        if not accordion_buttons:
+            return []  # No accordions found, no issue generated
+
+        incorrect_buttons = [
+            btn for btn in accordion_buttons if btn.get("aria-expanded") not in ["true", "false"]
+        ]
+
+        incidences = []
+        if incorrect_buttons:
+            for btn in incorrect_buttons:
+                incidences.append({
+                    "title": "Accordion items do not announce their state",
+                    "type": "Screen Reader",
+                    "severity": "Medium",
+                    "description": "One or more accordion buttons are missing the `aria-expanded` attribute. "
+                                   "This prevents screen reader users from knowing whether the accordion is expanded or collapsed.",
+                    "remediation": "Add `aria-expanded=\"true\"` or `aria-expanded=\"false\"` to the accordion button. "
+                                   "Example: `<button aria-expanded=\"false\">Section 1</button>`.",
+                    "wcag_reference": "4.1.2",
+                    "impact": "Screen reader users may not be aware of expandable content on the page.",
+                    "page_url": self.page_url,
+                    "resolution": "check_accordion_aria_expanded.md",
+                    "element_info": get_element_info(btn)
+                })
+
+        return incidences
+
 def check_accordion_aria_expanded(html_content, page_url, excel="issue_report.xlsx"):
     """
     Checks whether accordion buttons have the `aria-expanded` attribute properly configured.
@@ -19,40 +71,9 @@ def check_accordion_aria_expanded(html_content, page_url, excel="issue_report.xl
     - If any button lacks `aria-expanded="true"` or `aria-expanded="false"`, an issue is reported.
     """
 
-    # 1️⃣ Parse the HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2️⃣ Find all potential accordion buttons
-    accordion_buttons = soup.find_all("button", class_="accordion-toggle")  # Standard buttons
-    accordion_buttons += soup.find_all(attrs={"role": "button", "class": "accordion-toggle"})  # Elements with role="button"
-    accordion_buttons += soup.find_all("a", class_="accordion-toggle")  # Optionally, links
-
-    if not accordion_buttons:
-        return []  # No accordions found, no issue generated
-
-    incorrect_buttons = [
-        btn for btn in accordion_buttons if btn.get("aria-expanded") not in ["true", "false"]
-    ]
-
-    incidences = []
-    if incorrect_buttons:
-        for btn in incorrect_buttons:
-            incidences.append({
-                "title": "Accordion items do not announce their state",
-                "type": "Screen Reader",
-                "severity": "Medium",
-                "description": "One or more accordion buttons are missing the `aria-expanded` attribute. "
-                               "This prevents screen reader users from knowing whether the accordion is expanded or collapsed.",
-                "remediation": "Add `aria-expanded=\"true\"` or `aria-expanded=\"false\"` to the accordion button. "
-                               "Example: `<button aria-expanded=\"false\">Section 1</button>`.",
-                "wcag_reference": "4.1.2",
-                "impact": "Screen reader users may not be aware of expandable content on the page.",
-                "page_url": page_url,
-                "resolution": "check_accordion_aria_expanded.md",
-                "element_info": get_element_info(btn)
-            })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([AccordionAriaExpandedRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,8 +1,9 @@
 # file: check_alt_distinction.py
 
-from bs4 import BeautifulSoup, NavigableString
+from bs4 import NavigableString
 from sentence_transformers import SentenceTransformer, util
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
 
 # Load the transformer model for semantic similarity
 model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
@@ -17,6 +18,112 @@ def get_element_info(element):
         "line_number": element.sourceline if hasattr(element, 'sourceline') else "N/A"
     }
 
+class AltDistinctionRule(ManualRule):
+    """Rule for `check_alt_distinction`: collects <img> elements during the shared traversal."""
+
+    tags = ("img",)
+    expensive = True  # Encodes every alt and its nearby text with MiniLM
+
+    def __init__(self, page_url, similarity_threshold=0.8):
+        super().__init__(page_url)
+        self.similarity_threshold = similarity_threshold
+        self.images = []
+
+    def visit(self, element):
+        self.images.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        for img in self.images:
+            src = img.get("src", "")
+            alt = img.get("alt", None)  # None if missing
+            parent = img.parent  # Immediate parent, e.g., <a> or <p>...
+
+            # 1️⃣ IMAGE MISSING ALT ATTRIBUTE
+            if alt is None:
+                incidences.append({
+                    "title": "Image missing alt attribute",
+                    "type": "Alternative Text",
+                    "severity": "High",
+                    "description": "This image does not have an alt attribute. "
+                                   "It is unclear whether it is decorative or informative. "
+                                   "Screen readers may announce the filename instead.",
+                    "remediation": "Add an appropriate alt attribute. "
+                                   "If decorative, use `alt=''` and `aria-hidden='true'`. "
+                                   "If informative, describe the image content in alt.",
+                    "wcag_reference": "1.1.1",
+                    "impact": "Screen reader users may not understand the image's purpose.",
+                    "page_url": self.page_url,
+                    "resolution": "check_alt_distinction.md",
+                    "element_info": get_element_info(img)
+                })
+                continue
+
+            # 2️⃣ IMAGE WITH EMPTY ALT (`alt=""`) - POTENTIALLY DECORATIVE
+            if alt.strip() == "":
+                if parent and parent.name in ["a", "button"]:
+                    link_text = "".join(parent.stripped_strings)
+                    aria_label = parent.get("aria-label", "")
+
+                    if not link_text and not aria_label:
+                        incidences.append({
+                            "title": "Link/Button with no accessible text",
+                            "type": "Alternative Text",
+                            "severity": "High",
+                            "description": "The image has `alt=''`, suggesting it is decorative, "
+                                           "but it is the only content inside a link/button with no text or aria-label. "
+                                           "Screen reader users will not know the function of the link.",
+                            "remediation": "Add accessible text, e.g., `aria-label='Go to homepage'` "
+                                           "or visible text inside the link.",
+                            "wcag_reference": "1.1.1",
+                            "impact": "Screen reader users will not know the purpose of this link or button.",
+                            "page_url": self.page_url,
+                            "resolution": "check_alt_distinction.md",
+                            "element_info": get_element_info(parent)
+                        })
+                continue  # Skip further checks if the alt is empty and not inside an invalid container.
+
+            # 3️⃣ IMAGE WITH NON-EMPTY ALT - CHECK FOR REDUNDANCY
+            alt_text = alt.strip()
+
+            # Extract adjacent text (previous and next text nodes)
+            previous_text = img.find_previous(string=True, recursive=True)
+            next_text = img.find_next(string=True, recursive=True)
+
+            previous_text = previous_text.strip() if previous_text else ""
+            next_text = next_text.strip() if next_text else ""
+
+            adjacent_text = f"{previous_text} {next_text}".strip()
+
+            if adjacent_text:
+                # Convert to embeddings
+                alt_embedding = model.encode(alt_text, convert_to_tensor=True)
+                adj_embedding = model.encode(adjacent_text, convert_to_tensor=True)
+
+                # Compute cosine similarity
+                similarity = util.cos_sim(alt_embedding, adj_embedding).item()
+
+                if similarity > self.similarity_threshold:
+                    incidences.append({
+                        "title": "Redundant alternative text (semantic match)",
+                        "type": "Alternative Text",
+                        "severity": "Medium",
+                        "description": f"The image's alt text appears redundant with nearby text "
+                                       f"(semantic similarity={similarity:.2f}). "
+                                       "This may cause screen reader users to hear the same information twice.",
+                        "remediation": "If the image is purely decorative, use `alt=''`. "
+                                       "If informative, ensure the alt provides additional information "
+                                       "not already conveyed in nearby text.",
+                        "wcag_reference": "1.1.1",
+                        "impact": "Screen reader users may receive duplicate information.",
+                        "page_url": self.page_url,
+                        "resolution": "check_alt_distinction.md",
+                        "element_info": get_element_info(img)
+                    })
+
+        return incidences
+
 def check_alt_distinction(html_content, page_url, excel="issue_report.xlsx", similarity_threshold=0.8):
     """
     Checks for missing or redundant alt attributes in images:
@@ -37,99 +144,9 @@ def check_alt_distinction(html_content, page_url, excel="issue_report.xlsx", sim
       list[dict]: List of detected issues.
     """
 
-    soup = BeautifulSoup(html_content, "html.parser")
-    incidences = []
-
-    images = soup.find_all("img")
-
-    for img in images:
-        src = img.get("src", "")
-        alt = img.get("alt", None)  # None if missing
-        parent = img.parent  # Immediate parent, e.g., <a> or <p>...
-
-        # 1️⃣ IMAGE MISSING ALT ATTRIBUTE
-        if alt is None:
-            incidences.append({
-                "title": "Image missing alt attribute",
-                "type": "Alternative Text",
-                "severity": "High",
-                "description": "This image does not have an alt attribute. "
-                               "It is unclear whether it is decorative or informative. "
-                               "Screen readers may announce the filename instead.",
-                "remediation": "Add an appropriate alt attribute. "
-                               "If decorative, use `alt=''` and `aria-hidden='true'`. "
-                               "If informative, describe the image content in alt.",
-                "wcag_reference": "1.1.1",
-                "impact": "Screen reader users may not understand the image's purpose.",
-                "page_url": page_url,
-                "resolution": "check_alt_distinction.md",
-                "element_info": get_element_info(img)
-            })
-            continue
-
-        # 2️⃣ IMAGE WITH EMPTY ALT (`alt=""`) - POTENTIALLY DECORATIVE
-        if alt.strip() == "":
-            if parent and parent.name in ["a", "button"]:
-                link_text = "".join(parent.stripped_strings)
-                aria_label = parent.get("aria-label", "")
-
-                if not link_text and not aria_label:
-                    incidences.append({
-                        "title": "Link/Button with no accessible text",
-                        "type": "Alternative Text",
-                        "severity": "High",
-                        "description": "The image has `alt=''`, suggesting it is decorative, "
-                                       "but it is the only content inside a link/button with no text or aria-label. "
-                                       "Screen reader users will not know the function of the link.",
-                        "remediation": "Add accessible text, e.g., `aria-label='Go to homepage'` "
-                                       "or visible text inside the link.",
-                        "wcag_reference": "1.1.1",
-                        "impact": "Screen reader users will not know the purpose of this link or button.",
-                        "page_url": page_url,
-                        "resolution": "check_alt_distinction.md",
-                        "element_info": get_element_info(parent)
-                    })
-            continue  # Skip further checks if the alt is empty and not inside an invalid container.
-
-        # 3️⃣ IMAGE WITH NON-EMPTY ALT - CHECK FOR REDUNDANCY
-        alt_text = alt.strip()
-
-        # Extract adjacent text (previous and next text nodes)
-        previous_text = img.find_previous(string=True, recursive=True)
-        next_text = img.find_next(string=True, recursive=True)
-
-        previous_text = previous_text.strip() if previous_text else ""
-        next_text = next_text.strip() if next_text else ""
-
-        adjacent_text = f"{previous_text} {next_text}".strip()
-
-        if adjacent_text:
-            # Convert to embeddings
-            alt_embedding = model.encode(alt_text, convert_to_tensor=True)
-            adj_embedding = model.encode(adjacent_text, convert_to_tensor=True)
-
-            # Compute cosine similarity
-            similarity = util.cos_sim(alt_embedding, adj_embedding).item()
-
-            if similarity > similarity_threshold:
-                incidences.append({
-                    "title": "Redundant alternative text (semantic match)",
-                    "type": "Alternative Text",
-                    "severity": "Medium",
-                    "description": f"The image's alt text appears redundant with nearby text "
-                                   f"(semantic similarity={similarity:.2f}). "
-                                   "This may cause screen reader users to hear the same information twice.",
-                    "remediation": "If the image is purely decorative, use `alt=''`. "
-                                   "If informative, ensure the alt provides additional information "
-                                   "not already conveyed in nearby text.",
-                    "wcag_reference": "1.1.1",
-                    "impact": "Screen reader users may receive duplicate information.",
-                    "page_url": page_url,
-                    "resolution": "check_alt_distinction.md",
-                    "element_info": get_element_info(img)
-                })
+    incidences = run_rules([AltDistinctionRule(page_url, similarity_threshold=similarity_threshold)], html_content, page_url)
 
-    # Convert incidences to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
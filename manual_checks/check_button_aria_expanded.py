@@ -1,5 +1,65 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class ButtonAriaExpandedRule(ManualRule):
+    """Rule for `check_button_aria_expanded`: collects expandable controls during the shared traversal."""
+
+    tags = ("button",)
+    attrs = ("aria-expanded",)
+    roles = ("button",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.buttons = []          # <button>
+        self.role_buttons = []     # role="button"
+        self.expanded_elements = []  # cualquier elemento con aria-expanded
+
+    def visit(self, element):
+        if element.name == "button":
+            self.buttons.append(element)
+        if element.get("role") == "button":
+            self.role_buttons.append(element)
+        if element.has_attr("aria-expanded"):
+            self.expanded_elements.append(element)
+
+    def finish(self, page):
+        # 2️⃣ Buscar botones de control expandible
+        expandable_buttons = []
+
+        # a) Botones estándar <button>
+        expandable_buttons += self.buttons
+
+        # b) Elementos con role="button"
+        expandable_buttons += self.role_buttons
+
+        # c) Cualquier otro elemento con aria-expanded (para estructuras atípicas)
+        expandable_buttons += self.expanded_elements
+
+        if not expandable_buttons:
+            return []  # No hay botones expandibles, no se genera incidencia
+
+        incorrect_buttons = [
+            btn for btn in expandable_buttons if btn.get("aria-expanded") not in ["true", "false"]
+        ]
+
+        # 3️⃣ Si hay botones sin aria-expanded, generamos incidencias
+        incidences = []
+        for btn in incorrect_buttons:
+            incidences.append({
+                "title": "Expandable button missing aria-expanded",
+                "type": "Screen Reader",
+                "severity": "Medium",
+                "description": "One or more expandable buttons do not have the `aria-expanded` attribute. "
+                               "This means screen reader users will not know whether the button is expanded or collapsed.",
+                "remediation": "Ensure that expandable buttons include `aria-expanded=\"true\"` or `aria-expanded=\"false\"`. "
+                               "Example: `<button aria-expanded=\"false\">Categories</button>`.",
+                "wcag_reference": "4.1.2",
+                "impact": "Screen reader users may not receive correct information about the button state.",
+                "page_url": self.page_url,
+                "element_info": [str(btn)]  # Lista los botones con errores
+            })
+
+        return incidences
 
 def check_button_aria_expanded(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -10,46 +70,9 @@ def check_button_aria_expanded(html_content, page_url, excel="issue_report.xlsx"
     - Si falta `aria-expanded`, se genera una incidencia.
     """
 
-    # 1️⃣ Parsear el HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2️⃣ Buscar botones de control expandible
-    expandable_buttons = []
-
-    # a) Botones estándar <button>
-    expandable_buttons += soup.find_all("button")
-
-    # b) Elementos con role="button"
-    expandable_buttons += soup.find_all(attrs={"role": "button"})
-
-    # c) Cualquier otro elemento con aria-expanded (para estructuras atípicas)
-    expandable_buttons += soup.find_all(attrs={"aria-expanded": True})
-
-    if not expandable_buttons:
-        return []  # No hay botones expandibles, no se genera incidencia
-
-    incorrect_buttons = [
-        btn for btn in expandable_buttons if btn.get("aria-expanded") not in ["true", "false"]
-    ]
-
-    # 3️⃣ Si hay botones sin aria-expanded, generamos incidencias
-    incidences = []
-    for btn in incorrect_buttons:
-        incidences.append({
-            "title": "Expandable button missing aria-expanded",
-            "type": "Screen Reader",
-            "severity": "Medium",
-            "description": "One or more expandable buttons do not have the `aria-expanded` attribute. "
-                           "This means screen reader users will not know whether the button is expanded or collapsed.",
-            "remediation": "Ensure that expandable buttons include `aria-expanded=\"true\"` or `aria-expanded=\"false\"`. "
-                           "Example: `<button aria-expanded=\"false\">Categories</button>`.",
-            "wcag_reference": "4.1.2",
-            "impact": "Screen reader users may not receive correct information about the button state.",
-            "page_url": page_url,
-            "element_info": [str(btn)]  # Lista los botones con errores
-        })
-
-    # Convertir incidencias a Excel antes de retornar
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([ButtonAriaExpandedRule(page_url)], html_content, page_url)
+
+    # Añadir incidencias al buffer de Excel (el libro se escribe una vez por ejecución)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,5 +1,46 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class ButtonAriaPressedRule(ManualRule):
+    """Rule for `check_button_aria_pressed`: collects role="button" elements during the shared traversal."""
+
+    roles = ("button",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.buttons = []
+
+    def visit(self, element):
+        if element.get("role") == "button":
+            self.buttons.append(element)
+
+    def finish(self, page):
+        buttons = self.buttons
+
+        if not buttons:
+            return []  # No buttons with role="button", no issue generated
+
+        selected_button_found = any(button.get("aria-pressed") == "true" for button in buttons)
+
+        # 3️⃣ If no button has aria-pressed="true", generate an issue
+        incidences = []
+        if not selected_button_found:
+            incidences.append({
+                "title": "Selected button state is not announced",
+                "type": "Screen Reader",
+                "severity": "Medium",
+                "description": "No buttons on the page have the `aria-pressed=\"true\"` attribute. "
+                               "This means screen reader users will not know which button is currently selected.",
+                "remediation": "Ensure that the selected button includes `aria-pressed=\"true\"`. "
+                               "Example: `<button role=\"button\" aria-pressed=\"true\">Global Position</button>`.",
+                "wcag_reference": "4.1.2",
+                "impact": "Screen reader users may not be aware of which button is selected.",
+                "page_url": self.page_url,
+                "resolution": "check_button_aria_pressed.md",
+                "element_info": [str(btn) for btn in buttons]  # List of affected buttons
+            })
+
+        return incidences
 
 def check_button_aria_pressed(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -10,36 +51,9 @@ def check_button_aria_pressed(html_content, page_url, excel="issue_report.xlsx")
     - If no button is marked as selected, an issue is reported.
     """
 
-    # 1️⃣ Parse the HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2️⃣ Find all elements with role="button"
-    buttons = soup.find_all(attrs={"role": "button"})
-
-    if not buttons:
-        return []  # No buttons with role="button", no issue generated
-
-    selected_button_found = any(button.get("aria-pressed") == "true" for button in buttons)
-
-    # 3️⃣ If no button has aria-pressed="true", generate an issue
-    incidences = []
-    if not selected_button_found:
-        incidences.append({
-            "title": "Selected button state is not announced",
-            "type": "Screen Reader",
-            "severity": "Medium",
-            "description": "No buttons on the page have the `aria-pressed=\"true\"` attribute. "
-                           "This means screen reader users will not know which button is currently selected.",
-            "remediation": "Ensure that the selected button includes `aria-pressed=\"true\"`. "
-                           "Example: `<button role=\"button\" aria-pressed=\"true\">Global Position</button>`.",
-            "wcag_reference": "4.1.2",
-            "impact": "Screen reader users may not be aware of which button is selected.",
-            "page_url": page_url,
-            "resolution": "check_button_aria_pressed.md",
-            "element_info": [str(btn) for btn in buttons]  # List of affected buttons
-        })
-
-    # Convert incidences to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([ButtonAriaPressedRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
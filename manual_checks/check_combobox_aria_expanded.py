@@ -1,5 +1,5 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
 
 def get_element_info(element):
     """Retrieves useful information about an HTML element to facilitate issue identification."""
@@ -11,55 +11,77 @@ def get_element_info(element):
         "line_number": element.sourceline if hasattr(element, 'sourceline') else "N/A"
     }
 
-def check_combobox_aria_expanded(html_content, page_url, excel="issue_report.xlsx"):
-    """
-    Checks if search comboboxes have `aria-expanded` correctly configured.
+class ComboboxAriaExpandedRule(ManualRule):
+    """Rule for `check_combobox_aria_expanded`: collects combobox candidates during the shared traversal."""
 
-    - Looks for inputs with `role="combobox"`, divs with `role="combobox"`, and selects.
-    - Verifies if they have `aria-expanded="true"` or `aria-expanded="false"`.
-    - If `aria-expanded` does not change correctly, an issue is generated.
-    """
+    tags = ("input", "div", "select")
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.input_comboboxes = []
+        self.div_comboboxes = []
+        self.expanded_selects = []
 
-    soup = BeautifulSoup(html_content, "html.parser")
+    def visit(self, element):
+        if element.name == "input" and element.get("role") == "combobox":
+            self.input_comboboxes.append(element)
+        elif element.name == "div" and element.get("role") == "combobox":
+            self.div_comboboxes.append(element)
+        elif element.name == "select" and element.has_attr("aria-expanded"):
+            self.expanded_selects.append(element)
 
-    # Find all potential comboboxes
-    comboboxes = []
+    def finish(self, page):
+        # Find all potential comboboxes
+        comboboxes = []
     
-    # a) Inputs with role="combobox"
-    comboboxes += soup.find_all("input", attrs={"role": "combobox"})
+        # a) Inputs with role="combobox"
+        comboboxes += self.input_comboboxes
     
-    # b) Divs with role="combobox"
-    comboboxes += soup.find_all("div", attrs={"role": "combobox"})
+        # b) Divs with role="combobox"
+        comboboxes += self.div_comboboxes
     
-    # c) Selects with aria-expanded (not common, but some use it)
-    comboboxes += soup.find_all("select", attrs={"aria-expanded": True})
+        # c) Selects with aria-expanded (not common, but some use it)
+        comboboxes += self.expanded_selects
+
+        if not comboboxes:
+            return []  # No comboboxes found
+
+        incorrect_comboboxes = [
+            cb for cb in comboboxes if cb.get("aria-expanded") not in ["true", "false"]
+        ]
 
-    if not comboboxes:
-        return []  # No comboboxes found
+        incidences = []
+        for cb in incorrect_comboboxes:
+            incidences.append({
+                "title": "Search combobox missing aria-expanded",
+                "type": "Screen Reader",
+                "severity": "Medium",
+                "description": "One or more search comboboxes do not properly update the `aria-expanded` attribute. "
+                               "When the search menu expands, `aria-expanded` should change to `true`, "
+                               "and when collapsed, it should change to `false`.",
+                "remediation": "Ensure that the search combobox updates its `aria-expanded` attribute properly. "
+                               "Example: `<input role=\"combobox\" aria-expanded=\"true\">` when expanded.",
+                "wcag_reference": "4.1.2",
+                "impact": "Screen reader users may be confused if `aria-expanded` does not correctly update on search elements.",
+                "page_url": self.page_url,
+                "resolution": "check_combobox_aria_expanded.md",
+                "element_info": get_element_info(cb)
+            })
 
-    incorrect_comboboxes = [
-        cb for cb in comboboxes if cb.get("aria-expanded") not in ["true", "false"]
-    ]
+        return incidences
+
+def check_combobox_aria_expanded(html_content, page_url, excel="issue_report.xlsx"):
+    """
+    Checks if search comboboxes have `aria-expanded` correctly configured.
+
+    - Looks for inputs with `role="combobox"`, divs with `role="combobox"`, and selects.
+    - Verifies if they have `aria-expanded="true"` or `aria-expanded="false"`.
+    - If `aria-expanded` does not change correctly, an issue is generated.
+    """
 
-    incidences = []
-    for cb in incorrect_comboboxes:
-        incidences.append({
-            "title": "Search combobox missing aria-expanded",
-            "type": "Screen Reader",
-            "severity": "Medium",
-            "description": "One or more search comboboxes do not properly update the `aria-expanded` attribute. "
-                           "When the search menu expands, `aria-expanded` should change to `true`, "
-                           "and when collapsed, it should change to `false`.",
-            "remediation": "Ensure that the search combobox updates its `aria-expanded` attribute properly. "
-                           "Example: `<input role=\"combobox\" aria-expanded=\"true\">` when expanded.",
-            "wcag_reference": "4.1.2",
-            "impact": "Screen reader users may be confused if `aria-expanded` does not correctly update on search elements.",
-            "page_url": page_url,
-            "resolution": "check_combobox_aria_expanded.md",
-            "element_info": get_element_info(cb)
-        })
+    incidences = run_rules([ComboboxAriaExpandedRule(page_url)], html_content, page_url)
 
-    # Convert incidences to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
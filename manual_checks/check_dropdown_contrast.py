@@ -1,6 +1,6 @@
-from bs4 import BeautifulSoup
 import re
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
 
 # Función para calcular la luminancia relativa de un color
 def luminance(color):
@@ -13,6 +13,59 @@ def contrast_ratio(color1, color2):
     lum1, lum2 = luminance(color1), luminance(color2)
     return (max(lum1, lum2) + 0.05) / (min(lum1, lum2) + 0.05)
 
+class DropdownContrastRule(ManualRule):
+    """Regla para `check_dropdown_contrast`: recoge los <select> durante el recorrido compartido."""
+
+    tags = ("select",)
+    scope = "element"
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.dropdowns = []
+
+    def visit(self, element):
+        self.dropdowns.append(element)
+
+    def finish(self, page):
+        incidences = []
+        for dropdown in self.dropdowns:
+            # Obtener la opción seleccionada
+            selected_option = dropdown.find("option", selected=True) or dropdown.find("option")
+
+            if selected_option:
+                # Obtener el color del texto y el fondo desde el atributo style si existen
+                text_color_match = re.search(r'color:\s*(#[0-9A-Fa-f]{6})', selected_option.get("style", ""))
+                bg_color_match = re.search(r'background-color:\s*(#[0-9A-Fa-f]{6})', selected_option.get("style", ""))
+
+                # Si no hay color especificado, asumir valores por defecto
+                text_color = text_color_match.group(1) if text_color_match else "#000000"  # Negro por defecto
+                bg_color = bg_color_match.group(1) if bg_color_match else "#FFFFFF"  # Blanco por defecto
+
+                # Calcular relación de contraste
+                contrast = contrast_ratio(text_color, bg_color)
+
+                if contrast < 4.5:
+                    incidences.append({
+                        "title": "Dropdown selected value fails contrast once expanded",
+                        "type": "Color Contrast",
+                        "severity": "High",
+                        "description": (
+                            f"The selected option in the dropdown has a contrast ratio of {contrast:.2f}:1, "
+                            "which does not meet the minimum recommended contrast ratio of 4.5:1 for small text."
+                        ),
+                        "remediation": (
+                            "Use a darker text color or change the background to increase contrast. "
+                            "Example: `color: #2C3E50;` instead of `color: #BAC7CB;`."
+                        ),
+                        "wcag_reference": "1.4.3",
+                        "impact": "Users with low vision may not be able to read the selected dropdown text.",
+                        "page_url": self.page_url,
+                        "resolution": "check_dropdown_contrast.md",
+                        "element_info": str(selected_option)
+                    })
+
+        return incidences
+
 # Función principal para detectar problemas de contraste en dropdowns
 def check_dropdown_contrast(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -24,49 +77,9 @@ def check_dropdown_contrast(html_content, page_url, excel="issue_report.xlsx"):
     - Calcula la relación de contraste y reporta si es menor a 4.5:1.
     """
 
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # Buscar todos los <select> en la página
-    dropdowns = soup.find_all("select")
-
-    incidences = []
-    for dropdown in dropdowns:
-        # Obtener la opción seleccionada
-        selected_option = dropdown.find("option", selected=True) or dropdown.find("option")
-
-        if selected_option:
-            # Obtener el color del texto y el fondo desde el atributo style si existen
-            text_color_match = re.search(r'color:\s*(#[0-9A-Fa-f]{6})', selected_option.get("style", ""))
-            bg_color_match = re.search(r'background-color:\s*(#[0-9A-Fa-f]{6})', selected_option.get("style", ""))
-
-            # Si no hay color especificado, asumir valores por defecto
-            text_color = text_color_match.group(1) if text_color_match else "#000000"  # Negro por defecto
-            bg_color = bg_color_match.group(1) if bg_color_match else "#FFFFFF"  # Blanco por defecto
-
-            # Calcular relación de contraste
-            contrast = contrast_ratio(text_color, bg_color)
-
-            if contrast < 4.5:
-                incidences.append({
-                    "title": "Dropdown selected value fails contrast once expanded",
-                    "type": "Color Contrast",
-                    "severity": "High",
-                    "description": (
-                        f"The selected option in the dropdown has a contrast ratio of {contrast:.2f}:1, "
-                        "which does not meet the minimum recommended contrast ratio of 4.5:1 for small text."
-                    ),
-                    "remediation": (
-                        "Use a darker text color or change the background to increase contrast. "
-                        "Example: `color: #2C3E50;` instead of `color: #BAC7CB;`."
-                    ),
-                    "wcag_reference": "1.4.3",
-                    "impact": "Users with low vision may not be able to read the selected dropdown text.",
-                    "page_url": page_url,
-                    "resolution": "check_dropdown_contrast.md",
-                    "element_info": str(selected_option)
-                })
-
-    # Exportar incidencias a Excel antes de retornar
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([DropdownContrastRule(page_url)], html_content, page_url)
+
+    # Añadir incidencias al buffer de Excel (el libro se escribe una vez por ejecución)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,6 +1,7 @@
 import re
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.page_context import get_page_context
+from manual_checks.rule_engine import ManualRule, run_rules
 
 # --- Funciones de ayuda para color y contraste ---
 
@@ -47,9 +48,9 @@ def contrast_ratio(color1, color2):
 def extract_css_colors(html_content):
     """
     Extrae reglas CSS dentro de <style> y devuelve un diccionario con selectores y propiedades de color.
+    Acepta el HTML en texto o un `PageContext` ya parseado.
     """
-    soup = BeautifulSoup(html_content, "html.parser")
-    styles = soup.find_all("style")
+    page = get_page_context(html_content)
 
     css_rules = {}
 
@@ -62,8 +63,7 @@ def extract_css_colors(html_content):
         re.IGNORECASE
     )
 
-    for style_tag in styles:
-        style_content = style_tag.get_text()
+    for style_content in page.style_texts:
         blocks = style_content.split("}")
 
         for block in blocks:
@@ -97,6 +97,70 @@ def extract_css_colors(html_content):
 
     return css_rules
 
+class DropdownFocusContrastRule(ManualRule):
+    """Regla para `check_dropdown_focus_contrast`: recoge los <select> durante el recorrido compartido."""
+
+    tags = ("select",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.dropdowns = []
+
+    def visit(self, element):
+        self.dropdowns.append(element)
+
+    def finish(self, page):
+        css_styles = extract_css_colors(page)
+
+        incidences = []
+
+        for dropdown in self.dropdowns:
+            all_options = dropdown.find_all("option")
+
+            for option in all_options:
+                is_selected = option.has_attr("selected")
+                states_to_test = ["selected"] if is_selected else []
+
+                for state in states_to_test:
+                    selector_key = f"option:{state}" if state in ["hover", "focus"] else f"option[{state}]"
+                    matched_rule = css_styles.get(selector_key)
+
+                    if not matched_rule:
+                        for k in css_styles:
+                            if selector_key in k.replace(" ", ""):
+                                matched_rule = css_styles[k]
+                                break
+
+                    text_color = matched_rule.get("color", "#000") if matched_rule else "#000"
+                    bg_color = matched_rule.get("background", "#fff") if matched_rule else "#fff"
+
+                    ratio = contrast_ratio(text_color, bg_color)
+
+                    if ratio < 3.0:
+                        incidences.append({
+                            "title": "Dropdown selected/hovered option fails color contrast requirements",
+                            "type": "Color Contrast",
+                            "severity": "High",
+                            "description": (
+                                f"The dropdown option (state {state}) has a contrast ratio of {ratio:.2f}:1, "
+                                "which is below the recommended minimum of 3:1 for active states."
+                            ),
+                            "remediation": (
+                                "Use a darker background color or a lighter text color. "
+                                "For example: `background-color: #939393;`."
+                            ),
+                            "wcag_reference": "1.4.11",
+                            "impact": (
+                                "Users with low vision may not notice which option is selected or focused "
+                                "if the contrast is insufficient."
+                            ),
+                            "page_url": self.page_url,
+                            "resolution": "check_dropdown_focus_contrast.md",
+                            "affected_element": str(option)
+                        })
+
+        return incidences
+
 # --- Función principal de chequeo ---
 
 def check_dropdown_focus_contrast(html_content, page_url, excel="issue_report.xlsx"):
@@ -108,58 +172,9 @@ def check_dropdown_focus_contrast(html_content, page_url, excel="issue_report.xl
     - Calcula la relación de contraste y reporta si es menor a 3:1.
     """
 
-    soup = BeautifulSoup(html_content, "html.parser")
-    css_styles = extract_css_colors(html_content)
-    dropdowns = soup.find_all("select")
-
-    incidences = []
-
-    for dropdown in dropdowns:
-        all_options = dropdown.find_all("option")
-
-        for option in all_options:
-            is_selected = option.has_attr("selected")
-            states_to_test = ["selected"] if is_selected else []
-
-            for state in states_to_test:
-                selector_key = f"option:{state}" if state in ["hover", "focus"] else f"option[{state}]"
-                matched_rule = css_styles.get(selector_key)
-
-                if not matched_rule:
-                    for k in css_styles:
-                        if selector_key in k.replace(" ", ""):
-                            matched_rule = css_styles[k]
-                            break
-
-                text_color = matched_rule.get("color", "#000") if matched_rule else "#000"
-                bg_color = matched_rule.get("background", "#fff") if matched_rule else "#fff"
-
-                ratio = contrast_ratio(text_color, bg_color)
-
-                if ratio < 3.0:
-                    incidences.append({
-                        "title": "Dropdown selected/hovered option fails color contrast requirements",
-                        "type": "Color Contrast",
-                        "severity": "High",
-                        "description": (
-                            f"The dropdown option (state {state}) has a contrast ratio of {ratio:.2f}:1, "
-                            "which is below the recommended minimum of 3:1 for active states."
-                        ),
-                        "remediation": (
-                            "Use a darker background color or a lighter text color. "
-                            "For example: `background-color: #939393;`."
-                        ),
-                        "wcag_reference": "1.4.11",
-                        "impact": (
-                            "Users with low vision may not notice which option is selected or focused "
-                            "if the contrast is insufficient."
-                        ),
-                        "page_url": page_url,
-                        "resolution": "check_dropdown_focus_contrast.md",
-                        "affected_element": str(option)
-                    })
-
-    # Convertir incidencias a Excel antes de retornar
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([DropdownFocusContrastRule(page_url)], html_content, page_url)
+
+    # Añadir incidencias al buffer de Excel (el libro se escribe una vez por ejecución)
+    buffer_incidences(incidences, excel)
 
     return incidences
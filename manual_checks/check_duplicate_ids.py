@@ -1,6 +1,48 @@
-from bs4 import BeautifulSoup
 from collections import defaultdict
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class DuplicateIdsRule(ManualRule):
+    """Rule for `check_duplicate_ids`: groups `id` attributes during the shared traversal."""
+
+    attrs = ("id",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.id_elements = defaultdict(list)
+
+    def visit(self, element):
+        self.id_elements[element["id"]].append(element.name)
+
+    def finish(self, page):
+        # 3️⃣ Filter duplicated IDs
+        duplicated_ids = {id_: tags for id_, tags in self.id_elements.items() if len(tags) > 1}
+
+        # 4️⃣ Generate incidences if duplicate `id` values are found
+        incidences = []
+        if duplicated_ids:
+            for id_, tags in duplicated_ids.items():
+                incidences.append({
+                    "title": "Duplicated id in fields",
+                    "type": "HTML Validator",
+                    "severity": "High",
+                    "description": (
+                        f"The id `{id_}` is used multiple times in {len(tags)} different elements ({', '.join(tags)}). "
+                        "This can cause issues with assistive technologies and web scripts. Each `id` must be unique within the DOM."
+                    ),
+                    "remediation": (
+                        "Ensure that each `id` in the page is unique. "
+                        "If multiple instances are needed, use `class` instead or add a unique suffix, "
+                        "e.g., `id='passwordPositions_1'`."
+                    ),
+                    "wcag_reference": "4.1.1",
+                    "impact": "Users relying on assistive technologies may not receive the correct content.",
+                    "page_url": self.page_url,
+                    "resolution": "check_duplicate_ids.md",
+                    "element_info": str(tags)+"//////"+str(id_)   # List of elements with duplicated IDs
+                })
+
+        return incidences
 
 def check_duplicate_ids(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -12,44 +54,9 @@ def check_duplicate_ids(html_content, page_url, excel="issue_report.xlsx"):
     - If duplicates are found, an issue is generated.
     """
 
-    # 1️⃣ Parse the HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2️⃣ Find ALL elements with an `id` attribute
-    id_elements = defaultdict(list)
-    for element in soup.find_all(attrs={"id": True}):
-        element_id = element["id"]
-        tag_name = element.name
-        id_elements[element_id].append(tag_name)
-
-    # 3️⃣ Filter duplicated IDs
-    duplicated_ids = {id_: tags for id_, tags in id_elements.items() if len(tags) > 1}
-
-    # 4️⃣ Generate incidences if duplicate `id` values are found
-    incidences = []
-    if duplicated_ids:
-        for id_, tags in duplicated_ids.items():
-            incidences.append({
-                "title": "Duplicated id in fields",
-                "type": "HTML Validator",
-                "severity": "High",
-                "description": (
-                    f"The id `{id_}` is used multiple times in {len(tags)} different elements ({', '.join(tags)}). "
-                    "This can cause issues with assistive technologies and web scripts. Each `id` must be unique within the DOM."
-                ),
-                "remediation": (
-                    "Ensure that each `id` in the page is unique. "
-                    "If multiple instances are needed, use `class` instead or add a unique suffix, "
-                    "e.g., `id='passwordPositions_1'`."
-                ),
-                "wcag_reference": "4.1.1",
-                "impact": "Users relying on assistive technologies may not receive the correct content.",
-                "page_url": page_url,
-                "resolution": "check_duplicate_ids.md",
-                "element_info": str(tags)+"//////"+str(id_)   # List of elements with duplicated IDs
-            })
-
-    # Convert incidences to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([DuplicateIdsRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,5 +1,84 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class MenuTextSpacingRule(ManualRule):
+    """Rule for `check_menu_text_spacing`: collects menu containers during the shared traversal."""
+
+    classes = ("menu", "navigation", "navbar")
+    scope = "element"
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.menus = []
+
+    def visit(self, element):
+        if element.name in ["nav", "ul", "div"]:
+            self.menus.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        for menu in self.menus:
+            # 🔍 Check styles that could cause spacing issues
+            for item in menu.find_all(["li", "a", "span", "div"]):
+                style = item.get("style", "").lower()
+
+                if "overflow: hidden" in style:
+                    incidences.append({
+                        "title": "Content may be cropped with text spacing adjustments",
+                        "type": "Zoom",
+                        "severity": "High",
+                        "description": (
+                            "`overflow: hidden;` was detected in a menu item. "
+                            "This may cause content to be cut off when text spacing is increased."
+                        ),
+                        "remediation": (
+                            "Avoid using `overflow: hidden;` in menu items. "
+                            "Ensure that content expands properly."
+                        ),
+                        "wcag_reference": "1.4.12",
+                        "impact": "Users who need additional spacing may not see the full content.",
+                        "page_url": self.page_url,
+                        "resolution": "check_menu_text_spacing.md"
+                    })
+
+                if "white-space: nowrap" in style:
+                    incidences.append({
+                        "title": "Text does not wrap in the menu",
+                        "type": "Zoom",
+                        "severity": "High",
+                        "description": (
+                            "`white-space: nowrap;` was detected, preventing text from wrapping properly "
+                            "when text spacing is increased."
+                        ),
+                        "remediation": (
+                            "Avoid using `white-space: nowrap;` in menus to allow text to adjust correctly."
+                        ),
+                        "wcag_reference": "1.4.12",
+                        "impact": "Menu items may overflow from their container.",
+                        "page_url": self.page_url,
+                        "resolution": "check_menu_text_spacing.md"
+                    })
+
+                if "max-height" in style and "px" in style:
+                    incidences.append({
+                        "title": "Menu items may be cut off",
+                        "type": "Zoom",
+                        "severity": "High",
+                        "description": (
+                            "`max-height` in pixels was detected in a menu, which may cause items "
+                            "to be cropped when text spacing increases."
+                        ),
+                        "remediation": (
+                            "Use `min-height: auto;` instead of fixed values to allow dynamic adjustment."
+                        ),
+                        "wcag_reference": "1.4.12",
+                        "impact": "Users may not see the full content of the menu.",
+                        "page_url": self.page_url,
+                        "resolution": "check_menu_text_spacing.md"
+                    })
+
+        return incidences
 
 def check_menu_text_spacing(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -18,73 +97,9 @@ def check_menu_text_spacing(html_content, page_url, excel="issue_report.xlsx"):
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 🔍 Find all navigation elements that may contain menus
-    menus = soup.find_all(["nav", "ul", "div"], class_=["menu", "navigation", "navbar"])
-
-    for menu in menus:
-        # 🔍 Check styles that could cause spacing issues
-        for item in menu.find_all(["li", "a", "span", "div"]):
-            style = item.get("style", "").lower()
-
-            if "overflow: hidden" in style:
-                incidences.append({
-                    "title": "Content may be cropped with text spacing adjustments",
-                    "type": "Zoom",
-                    "severity": "High",
-                    "description": (
-                        "`overflow: hidden;` was detected in a menu item. "
-                        "This may cause content to be cut off when text spacing is increased."
-                    ),
-                    "remediation": (
-                        "Avoid using `overflow: hidden;` in menu items. "
-                        "Ensure that content expands properly."
-                    ),
-                    "wcag_reference": "1.4.12",
-                    "impact": "Users who need additional spacing may not see the full content.",
-                    "page_url": page_url,
-                    "resolution": "check_menu_text_spacing.md"
-                })
-
-            if "white-space: nowrap" in style:
-                incidences.append({
-                    "title": "Text does not wrap in the menu",
-                    "type": "Zoom",
-                    "severity": "High",
-                    "description": (
-                        "`white-space: nowrap;` was detected, preventing text from wrapping properly "
-                        "when text spacing is increased."
-                    ),
-                    "remediation": (
-                        "Avoid using `white-space: nowrap;` in menus to allow text to adjust correctly."
-                    ),
-                    "wcag_reference": "1.4.12",
-                    "impact": "Menu items may overflow from their container.",
-                    "page_url": page_url,
-                    "resolution": "check_menu_text_spacing.md"
-                })
-
-            if "max-height" in style and "px" in style:
-                incidences.append({
-                    "title": "Menu items may be cut off",
-                    "type": "Zoom",
-                    "severity": "High",
-                    "description": (
-                        "`max-height` in pixels was detected in a menu, which may cause items "
-                        "to be cropped when text spacing increases."
-                    ),
-                    "remediation": (
-                        "Use `min-height: auto;` instead of fixed values to allow dynamic adjustment."
-                    ),
-                    "wcag_reference": "1.4.12",
-                    "impact": "Users may not see the full content of the menu.",
-                    "page_url": page_url,
-                    "resolution": "check_menu_text_spacing.md"
-                })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([MenuTextSpacingRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
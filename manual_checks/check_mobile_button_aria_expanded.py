@@ -1,5 +1,70 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class MobileButtonAriaExpandedRule(ManualRule):
+    """Rule for `check_mobile_button_aria_expanded`: collects expandable controls during the shared traversal."""
+
+    tags = ("button",)
+    attrs = ("aria-expanded",)
+    roles = ("button",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.buttons = []            # <button>
+        self.role_buttons = []       # role="button"
+        self.expanded_elements = []  # any element with aria-expanded
+
+    def visit(self, element):
+        if element.name == "button":
+            self.buttons.append(element)
+        if element.get("role") == "button":
+            self.role_buttons.append(element)
+        if element.has_attr("aria-expanded"):
+            self.expanded_elements.append(element)
+
+    def finish(self, page):
+        # 2) Find expandable control buttons
+        expandable_buttons = []
+
+        # a) Standard <button> elements
+        expandable_buttons += self.buttons
+
+        # b) Elements with role="button"
+        expandable_buttons += self.role_buttons
+
+        # c) Any other element that has aria-expanded (for non-conventional structures)
+        expandable_buttons += self.expanded_elements
+
+        if not expandable_buttons:
+            return []  # No expandable buttons found, no issue detected
+
+        incorrect_buttons = [
+            btn for btn in expandable_buttons if btn.get("aria-expanded") not in ["true", "false"]
+        ]
+
+        # 3) If buttons without aria-expanded exist, generate an issue
+        incidences = []
+        if incorrect_buttons:
+            incidences.append({
+                "title": "Button has no expanded/collapsed state announced on mobile",
+                "type": "Screen Readers",
+                "severity": "Medium",
+                "description": (
+                    "One or more expandable buttons are missing the `aria-expanded` attribute. "
+                    "This means that screen reader users on mobile devices "
+                    "will not know whether the button is expanded or collapsed."
+                ),
+                "remediation": (
+                    "Add `aria-expanded=\"true\"` or `aria-expanded=\"false\"` to the expandable button. "
+                    "Example: `<button aria-expanded=\"false\">See more</button>`."
+                ),
+                "wcag_reference": "4.1.2",
+                "impact": "Screen reader users on mobile devices will not receive information about the button's state.",
+                "page_url": self.page_url,
+                "resolution": "check_mobile_button_aria_expanded.md"
+            })
+
+        return incidences
 
 def check_mobile_button_aria_expanded(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -18,51 +83,9 @@ def check_mobile_button_aria_expanded(html_content, page_url, excel="issue_repor
         list[dict]: List of detected issues.
     """
 
-    # 1) Parse the HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2) Find expandable control buttons
-    expandable_buttons = []
-
-    # a) Standard <button> elements
-    expandable_buttons += soup.find_all("button")
-
-    # b) Elements with role="button"
-    expandable_buttons += soup.find_all(attrs={"role": "button"})
-
-    # c) Any other element that has aria-expanded (for non-conventional structures)
-    expandable_buttons += soup.find_all(attrs={"aria-expanded": True})
-
-    if not expandable_buttons:
-        return []  # No expandable buttons found, no issue detected
-
-    incorrect_buttons = [
-        btn for btn in expandable_buttons if btn.get("aria-expanded") not in ["true", "false"]
-    ]
-
-    # 3) If buttons without aria-expanded exist, generate an issue
-    incidences = []
-    if incorrect_buttons:
-        incidences.append({
-            "title": "Button has no expanded/collapsed state announced on mobile",
-            "type": "Screen Readers",
-            "severity": "Medium",
-            "description": (
-                "One or more expandable buttons are missing the `aria-expanded` attribute. "
-                "This means that screen reader users on mobile devices "
-                "will not know whether the button is expanded or collapsed."
-            ),
-            "remediation": (
-                "Add `aria-expanded=\"true\"` or `aria-expanded=\"false\"` to the expandable button. "
-                "Example: `<button aria-expanded=\"false\">See more</button>`."
-            ),
-            "wcag_reference": "4.1.2",
-            "impact": "Screen reader users on mobile devices will not receive information about the button's state.",
-            "page_url": page_url,
-            "resolution": "check_mobile_button_aria_expanded.md"
-        })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([MobileButtonAriaExpandedRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
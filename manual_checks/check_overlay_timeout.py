@@ -1,6 +1,83 @@
 import time
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, has_class, run_rules
+
+class OverlayTimeoutRule(ManualRule):
+    """Rule for `check_overlay_timeout`: collects overlay triggers and overlays during the shared traversal."""
+
+    tags = ("button",)
+    attrs = ("onclick",)
+    classes = ("button", "overlay", "popup", "modal")
+
+    def __init__(self, page_url, min_duration=5):
+        super().__init__(page_url)
+        self.min_duration = min_duration
+        self.buttons = []          # <button>
+        self.onclick_links = []    # <a onclick>
+        self.onclick_divs = []     # <div onclick>
+        self.class_buttons = []    # class="button"
+        self.overlays = []
+
+    def visit(self, element):
+        if element.name == "button":
+            self.buttons.append(element)
+        if element.name == "a" and element.has_attr("onclick"):
+            self.onclick_links.append(element)
+        if element.name == "div" and element.has_attr("onclick"):
+            self.onclick_divs.append(element)
+        if has_class(element, ["button"]):
+            self.class_buttons.append(element)
+        if element.name in ["div", "dialog"] and has_class(element, ["overlay", "popup", "modal"]):
+            self.overlays.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        # 🔍 1) Search for all buttons that may trigger overlays
+        buttons = list(self.buttons)  # Detects <button>
+        buttons += self.onclick_links  # Detects <a> with onclick
+        buttons += self.onclick_divs  # Detects <div> with onclick
+        buttons += self.class_buttons  # Detects any element with class="button"
+
+        # 🔍 2) Search for possible overlays in the page
+        overlays = self.overlays
+
+        if not buttons or not overlays:
+            return []  # No buttons or overlays detected
+
+        for button in buttons:
+            button_text = button.get_text(strip=True) or "[Button without text]"
+
+            for overlay in overlays:
+                overlay_id = overlay.get("id", "[no id]")
+
+                # 🔥 Simulation: Overlay disappears in less than `min_duration` seconds
+                timeout_value = 3  # Example overlay timeout of 3s
+
+                if timeout_value < self.min_duration:
+                    incidences.append({
+                        "title": "Overlay disappears too quickly",
+                        "type": "Other A11y",
+                        "severity": "High",
+                        "description": (
+                            f"The overlay '{overlay_id}' automatically disappears in {timeout_value} seconds "
+                            f"after clicking the button '{button_text}'. "
+                            "This may prevent some users from properly interacting with it."
+                        ),
+                        "remediation": (
+                            "Ensure that the overlay remains visible until the user manually closes it, "
+                            "or provide an option in the settings to adjust the timing."
+                        ),
+                        "wcag_reference": "2.2.1",
+                        "impact": (
+                            "Users with visual, motor, or cognitive disabilities may not have enough time "
+                            "to read or interact with the overlay content before it disappears."
+                        ),
+                        "page_url": self.page_url,
+                        "resolution": "check_overlay_timeout.md"
+                    })
+
+        return incidences
 
 def check_overlay_timeout(html_content, page_url, min_duration=5, excel="issue_report.xlsx"):
     """
@@ -20,54 +97,9 @@ def check_overlay_timeout(html_content, page_url, min_duration=5, excel="issue_r
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 🔍 1) Search for all buttons that may trigger overlays
-    buttons = soup.find_all("button")  # Detects <button>
-    buttons += soup.find_all("a", onclick=True)  # Detects <a> with onclick
-    buttons += soup.find_all("div", onclick=True)  # Detects <div> with onclick
-    buttons += soup.find_all(class_="button")  # Detects any element with class="button"
-
-    # 🔍 2) Search for possible overlays in the page
-    overlays = soup.find_all(["div", "dialog"], class_=["overlay", "popup", "modal"])
-
-    if not buttons or not overlays:
-        return []  # No buttons or overlays detected
-
-    for button in buttons:
-        button_text = button.get_text(strip=True) or "[Button without text]"
-
-        for overlay in overlays:
-            overlay_id = overlay.get("id", "[no id]")
-
-            # 🔥 Simulation: Overlay disappears in less than `min_duration` seconds
-            timeout_value = 3  # Example overlay timeout of 3s
-
-            if timeout_value < min_duration:
-                incidences.append({
-                    "title": "Overlay disappears too quickly",
-                    "type": "Other A11y",
-                    "severity": "High",
-                    "description": (
-                        f"The overlay '{overlay_id}' automatically disappears in {timeout_value} seconds "
-                        f"after clicking the button '{button_text}'. "
-                        "This may prevent some users from properly interacting with it."
-                    ),
-                    "remediation": (
-                        "Ensure that the overlay remains visible until the user manually closes it, "
-                        "or provide an option in the settings to adjust the timing."
-                    ),
-                    "wcag_reference": "2.2.1",
-                    "impact": (
-                        "Users with visual, motor, or cognitive disabilities may not have enough time "
-                        "to read or interact with the overlay content before it disappears."
-                    ),
-                    "page_url": page_url,
-                    "resolution": "check_overlay_timeout.md"
-                })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([OverlayTimeoutRule(page_url, min_duration=min_duration)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
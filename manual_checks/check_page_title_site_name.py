@@ -1,6 +1,73 @@
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class PageTitleSiteNameRule(ManualRule):
+    """Rule for `check_page_title_site_name_auto_minimal`: keeps the first og:site_name <meta> and <title>."""
+
+    tags = ("meta", "title")
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.og_site = None
+        self.title_tag = None
+
+    def visit(self, element):
+        if element.name == "meta":
+            if self.og_site is None and element.get("property") == "og:site_name":
+                self.og_site = element
+        elif self.title_tag is None:
+            self.title_tag = element
+
+    def finish(self, page):
+        incidences = []
+
+        # 2) Attempt to get site_name from meta property="og:site_name"
+        og_site = self.og_site
+        if og_site and og_site.get("content"):
+            site_name = og_site["content"].strip()
+        else:
+            # If og:site_name does not exist, derive from domain
+            domain = urlparse(self.page_url).netloc
+            parts = domain.split(".")
+            if len(parts) >= 2:
+                site_name = parts[-2].capitalize()  # e.g., "samsclub"
+            else:
+                # Cannot determine site name
+                site_name = ""
+
+        # 3) If no site_name is obtained, do not report
+        if not site_name:
+            return []
+
+        # 4) Find <title>. If missing, do not report
+        title_tag = self.title_tag
+        if not title_tag:
+            return []
+
+        title_text = title_tag.get_text(strip=True) or ""
+
+        # 5) Check if site_name is included in the title
+        if site_name.lower() not in title_text.lower():
+            incidences.append({
+                "title": "Page title does not contain site name",
+                "type": "Other A11y",
+                "severity": "Medium",
+                "description": (
+                    f"The page title '{title_text}' does not include the site name '{site_name}'. "
+                    "This makes it harder for users to identify the website."
+                ),
+                "remediation": (
+                    "Update the <title> to include the site name. "
+                    "Example: 'Help Center - Sams Club'."
+                ),
+                "wcag_reference": "2.4.2",
+                "impact": "Users may not easily recognize which site they are visiting.",
+                "page_url": self.page_url,
+                "resolution": "check_page_title_site_name_auto_minimal.md"
+            })
+
+        return incidences
 
 def check_page_title_site_name_auto_minimal(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -20,57 +87,9 @@ def check_page_title_site_name_auto_minimal(html_content, page_url, excel="issue
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    
-    # 1) Parse HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2) Attempt to get site_name from meta property="og:site_name"
-    og_site = soup.find("meta", property="og:site_name")
-    if og_site and og_site.get("content"):
-        site_name = og_site["content"].strip()
-    else:
-        # If og:site_name does not exist, derive from domain
-        domain = urlparse(page_url).netloc
-        parts = domain.split(".")
-        if len(parts) >= 2:
-            site_name = parts[-2].capitalize()  # e.g., "samsclub"
-        else:
-            # Cannot determine site name
-            site_name = ""
-
-    # 3) If no site_name is obtained, do not report
-    if not site_name:
-        return []
-
-    # 4) Find <title>. If missing, do not report
-    title_tag = soup.find("title")
-    if not title_tag:
-        return []
-
-    title_text = title_tag.get_text(strip=True) or ""
-
-    # 5) Check if site_name is included in the title
-    if site_name.lower() not in title_text.lower():
-        incidences.append({
-            "title": "Page title does not contain site name",
-            "type": "Other A11y",
-            "severity": "Medium",
-            "description": (
-                f"The page title '{title_text}' does not include the site name '{site_name}'. "
-                "This makes it harder for users to identify the website."
-            ),
-            "remediation": (
-                "Update the <title> to include the site name. "
-                "Example: 'Help Center - Sams Club'."
-            ),
-            "wcag_reference": "2.4.2",
-            "impact": "Users may not easily recognize which site they are visiting.",
-            "page_url": page_url,
-            "resolution": "check_page_title_site_name_auto_minimal.md"
-        })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([PageTitleSiteNameRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,6 +1,66 @@
 import time
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class SessionTimeoutRule(ManualRule):
+    """Rule for `check_session_timeout`: collects session warnings during the shared traversal."""
+
+    classes = ("session-warning", "timeout-alert", "modal-warning")
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.session_warnings = []
+
+    def visit(self, element):
+        self.session_warnings.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        # 🔍 1) Check for a session timeout warning
+        session_warnings = self.session_warnings
+
+        if not session_warnings:
+            incidences.append({
+                "title": "No session timeout warning",
+                "type": "Screen Reader",
+                "severity": "High",
+                "description": (
+                    "No session timeout warning message was detected before expiration. "
+                    "Screen reader users may be logged out without prior notice."
+                ),
+                "remediation": (
+                    "Implement a warning modal before session expiration with `aria-live='assertive'` "
+                    "so that users are properly notified."
+                ),
+                "wcag_reference": "2.2.1",
+                "impact": "Users may be locked out without knowing they have been logged out.",
+                "page_url": self.page_url,
+                "resolution": "check_session_timeout.md"
+            })
+
+        # 🔍 2) Verify if the warning uses `aria-live="assertive"`
+        for warning in session_warnings:
+            aria_live = warning.get("aria-live", "").lower()
+            if aria_live != "assertive":
+                incidences.append({
+                    "title": "Session timeout warning is not screen reader friendly",
+                    "type": "Screen Reader",
+                    "severity": "Medium",
+                    "description": (
+                        "A session timeout warning was detected, but it does not use `aria-live='assertive'`, "
+                        "which prevents it from being immediately announced to screen reader users."
+                    ),
+                    "remediation": (
+                        "Add `aria-live='assertive'` to the warning modal or alert."
+                    ),
+                    "wcag_reference": "2.2.1",
+                    "impact": "Users with disabilities will not be notified in time about session expiration.",
+                    "page_url": self.page_url,
+                    "resolution": "check_session_timeout.md"
+                })
+
+        return incidences
 
 def check_session_timeout(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -19,53 +79,9 @@ def check_session_timeout(html_content, page_url, excel="issue_report.xlsx"):
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 🔍 1) Check for a session timeout warning
-    session_warnings = soup.find_all(class_=["session-warning", "timeout-alert", "modal-warning"])
-
-    if not session_warnings:
-        incidences.append({
-            "title": "No session timeout warning",
-            "type": "Screen Reader",
-            "severity": "High",
-            "description": (
-                "No session timeout warning message was detected before expiration. "
-                "Screen reader users may be logged out without prior notice."
-            ),
-            "remediation": (
-                "Implement a warning modal before session expiration with `aria-live='assertive'` "
-                "so that users are properly notified."
-            ),
-            "wcag_reference": "2.2.1",
-            "impact": "Users may be locked out without knowing they have been logged out.",
-            "page_url": page_url,
-            "resolution": "check_session_timeout.md"
-        })
-
-    # 🔍 2) Verify if the warning uses `aria-live="assertive"`
-    for warning in session_warnings:
-        aria_live = warning.get("aria-live", "").lower()
-        if aria_live != "assertive":
-            incidences.append({
-                "title": "Session timeout warning is not screen reader friendly",
-                "type": "Screen Reader",
-                "severity": "Medium",
-                "description": (
-                    "A session timeout warning was detected, but it does not use `aria-live='assertive'`, "
-                    "which prevents it from being immediately announced to screen reader users."
-                ),
-                "remediation": (
-                    "Add `aria-live='assertive'` to the warning modal or alert."
-                ),
-                "wcag_reference": "2.2.1",
-                "impact": "Users with disabilities will not be notified in time about session expiration.",
-                "page_url": page_url,
-                "resolution": "check_session_timeout.md"
-            })
+    incidences = run_rules([SessionTimeoutRule(page_url)], html_content, page_url)
 
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
@@ -1,5 +1,49 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class TabAriaSelectedRule(ManualRule):
+    """Rule for `check_tab_aria_selected`: collects role="tab" elements during the shared traversal."""
+
+    roles = ("tab",)
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.tabs = []
+
+    def visit(self, element):
+        if element.get("role") == "tab":
+            self.tabs.append(element)
+
+    def finish(self, page):
+        tabs = self.tabs
+
+        if not tabs:
+            return []  # No tabs found, no issue detected
+
+        selected_tab_found = any(tab.get("aria-selected") == "true" for tab in tabs)
+
+        # 3) If no tab has aria-selected="true", generate an issue
+        incidences = []
+        if not selected_tab_found:
+            incidences.append({
+                "title": "Selected tab state is not announced",
+                "type": "Screen Reader",
+                "severity": "Medium",
+                "description": (
+                    "None of the tabs on the page have the attribute `aria-selected=\"true\"`. "
+                    "This means that screen reader users will not be able to identify which tab is active."
+                ),
+                "remediation": (
+                    "Add `aria-selected=\"true\"` to the active tab within a `role=\"tablist\"`. "
+                    "Example: `<button role=\"tab\" aria-selected=\"true\">My Groupons</button>`."
+                ),
+                "wcag_reference": "4.1.2",
+                "impact": "Screen reader users may not know which tab is currently selected.",
+                "page_url": self.page_url,
+                "resolution": "check_tab_aria_selected.md"
+            })
+
+        return incidences
 
 def check_tab_aria_selected(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -18,39 +62,9 @@ def check_tab_aria_selected(html_content, page_url, excel="issue_report.xlsx"):
         list[dict]: List of detected issues.
     """
 
-    # 1) Parse the HTML
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 2) Find all elements with role="tab"
-    tabs = soup.find_all(attrs={"role": "tab"})
-
-    if not tabs:
-        return []  # No tabs found, no issue detected
-
-    selected_tab_found = any(tab.get("aria-selected") == "true" for tab in tabs)
-
-    # 3) If no tab has aria-selected="true", generate an issue
-    incidences = []
-    if not selected_tab_found:
-        incidences.append({
-            "title": "Selected tab state is not announced",
-            "type": "Screen Reader",
-            "severity": "Medium",
-            "description": (
-                "None of the tabs on the page have the attribute `aria-selected=\"true\"`. "
-                "This means that screen reader users will not be able to identify which tab is active."
-            ),
-            "remediation": (
-                "Add `aria-selected=\"true\"` to the active tab within a `role=\"tablist\"`. "
-                "Example: `<button role=\"tab\" aria-selected=\"true\">My Groupons</button>`."
-            ),
-            "wcag_reference": "4.1.2",
-            "impact": "Screen reader users may not know which tab is currently selected.",
-            "page_url": page_url,
-            "resolution": "check_tab_aria_selected.md"
-        })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([TabAriaSelectedRule(page_url)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
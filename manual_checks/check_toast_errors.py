@@ -1,6 +1,50 @@
 import time
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class ToastErrorsRule(ManualRule):
+    """Rule for `check_toast_errors`: collects toast-like messages during the shared traversal."""
+
+    classes = ("toast", "notification", "alert", "error-message")
+    scope = "element"
+
+    def __init__(self, page_url, min_duration=5):
+        super().__init__(page_url)
+        self.min_duration = min_duration
+        self.toast_messages = []
+
+    def visit(self, element):
+        self.toast_messages.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        for toast in self.toast_messages:
+            toast_text = toast.get_text(strip=True) or "[Message without text]"
+            timeout_value = 2  # Simulation: message disappears in 2s
+
+            if timeout_value < self.min_duration:
+                incidences.append({
+                    "title": "Error message disappears too quickly",
+                    "type": "Other A11y",
+                    "severity": "High",
+                    "description": (
+                        f"The error message '{toast_text}' automatically disappears in {timeout_value} seconds. "
+                        "This may prevent some users from reading or understanding the error."
+                    ),
+                    "remediation": (
+                        "Ensure that error messages remain visible until the user manually dismisses them. "
+                        "Ideally, display the message near the form field causing the error."
+                    ),
+                    "wcag_reference": "2.2.1",
+                    "impact": (
+                        "Users may not notice the error and may not understand why the form was not submitted."
+                    ),
+                    "page_url": self.page_url,
+                    "resolution": "check_toast_errors.md"
+                })
+
+        return incidences
 
 def check_toast_errors(html_content, page_url, min_duration=5, excel="issue_report.xlsx"):
     """
@@ -20,38 +64,9 @@ def check_toast_errors(html_content, page_url, min_duration=5, excel="issue_repo
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 🔍 Search for possible toast messages (floating notifications)
-    toast_messages = soup.find_all(class_=["toast", "notification", "alert", "error-message"])
-
-    for toast in toast_messages:
-        toast_text = toast.get_text(strip=True) or "[Message without text]"
-        timeout_value = 2  # Simulation: message disappears in 2s
-
-        if timeout_value < min_duration:
-            incidences.append({
-                "title": "Error message disappears too quickly",
-                "type": "Other A11y",
-                "severity": "High",
-                "description": (
-                    f"The error message '{toast_text}' automatically disappears in {timeout_value} seconds. "
-                    "This may prevent some users from reading or understanding the error."
-                ),
-                "remediation": (
-                    "Ensure that error messages remain visible until the user manually dismisses them. "
-                    "Ideally, display the message near the form field causing the error."
-                ),
-                "wcag_reference": "2.2.1",
-                "impact": (
-                    "Users may not notice the error and may not understand why the form was not submitted."
-                ),
-                "page_url": page_url,
-                "resolution": "check_toast_errors.md"
-            })
-
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    incidences = run_rules([ToastErrorsRule(page_url, min_duration=min_duration)], html_content, page_url)
+
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
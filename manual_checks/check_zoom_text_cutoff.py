@@ -1,5 +1,74 @@
-from bs4 import BeautifulSoup
-from transform_json_to_excel import transform_json_to_excel  
+from transform_json_to_excel import buffer_incidences
+from manual_checks.rule_engine import ManualRule, run_rules
+
+class ZoomTextCutoffRule(ManualRule):
+    """Rule for `check_zoom_text_cutoff`: collects styled and classed elements during the shared traversal."""
+
+    attrs = ("style", "class")
+
+    def __init__(self, page_url):
+        super().__init__(page_url)
+        self.styled_elements = []
+        self.classed_elements = []
+
+    def visit(self, element):
+        if element.has_attr("style"):
+            self.styled_elements.append(element)
+        if element.has_attr("class"):
+            self.classed_elements.append(element)
+
+    def finish(self, page):
+        incidences = []
+
+        # 🔍 1) Detect inline styles that may cause text cut-off
+        problem_elements = []
+        for tag in self.styled_elements:
+            style = tag["style"].lower()
+            if "overflow: hidden" in style or "height:" in style or "max-height:" in style:
+                problem_elements.append(tag)
+
+        if problem_elements:
+            incidences.append({
+                "title": "Text may be cut off at 200% zoom",
+                "type": "Zoom",
+                "severity": "High",
+                "description": (
+                    "Elements with `overflow: hidden;`, `height`, or `max-height` detected, which may "
+                    "cause content to be hidden when zoomed to 200%."
+                ),
+                "remediation": (
+                    "Ensure that containers can dynamically expand when text size increases. "
+                    "Avoid `overflow: hidden;` in critical content sections and use `min-height` instead of `height`."
+                ),
+                "wcag_reference": "1.4.4",
+                "impact": "Users may lose access to important information when zooming.",
+                "page_url": self.page_url,
+                "resolution": "check_zoom_text_cutoff.md"
+            })
+
+        # 🔍 2) Detect common classes that may truncate text
+        problematic_classes = {"hidden", "truncate", "text-cutoff", "text-hidden"}
+        for tag in self.classed_elements:
+            classes = set(tag["class"])
+            if classes & problematic_classes:
+                incidences.append({
+                    "title": "Text truncation detected",
+                    "type": "Zoom",
+                    "severity": "High",
+                    "description": (
+                        f"Classes `{classes & problematic_classes}` detected, which may truncate text "
+                        "and prevent visibility when zoomed to 200%."
+                    ),
+                    "remediation": (
+                        "Ensure that full content remains visible and accessible without requiring horizontal scrolling."
+                    ),
+                    "wcag_reference": "1.4.4",
+                    "impact": "Text may be hidden without a way for users to access it.",
+                    "page_url": self.page_url,
+                    "resolution": "check_zoom_text_cutoff.md"
+                })
+
+        return incidences
 
 def check_zoom_text_cutoff(html_content, page_url, excel="issue_report.xlsx"):
     """
@@ -18,58 +87,9 @@ def check_zoom_text_cutoff(html_content, page_url, excel="issue_report.xlsx"):
         list[dict]: List of detected issues.
     """
 
-    incidences = []
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # 🔍 1) Detect inline styles that may cause text cut-off
-    problem_elements = []
-    for tag in soup.find_all(style=True):
-        style = tag["style"].lower()
-        if "overflow: hidden" in style or "height:" in style or "max-height:" in style:
-            problem_elements.append(tag)
-
-    if problem_elements:
-        incidences.append({
-            "title": "Text may be cut off at 200% zoom",
-            "type": "Zoom",
-            "severity": "High",
-            "description": (
-                "Elements with `overflow: hidden;`, `height`, or `max-height` detected, which may "
-                "cause content to be hidden when zoomed to 200%."
-            ),
-            "remediation": (
-                "Ensure that containers can dynamically expand when text size increases. "
-                "Avoid `overflow: hidden;` in critical content sections and use `min-height` instead of `height`."
-            ),
-            "wcag_reference": "1.4.4",
-            "impact": "Users may lose access to important information when zooming.",
-            "page_url": page_url,
-            "resolution": "check_zoom_text_cutoff.md"
-        })
-
-    # 🔍 2) Detect common classes that may truncate text
-    problematic_classes = {"hidden", "truncate", "text-cutoff", "text-hidden"}
-    for tag in soup.find_all(class_=True):
-        classes = set(tag["class"])
-        if classes & problematic_classes:
-            incidences.append({
-                "title": "Text truncation detected",
-                "type": "Zoom",
-                "severity": "High",
-                "description": (
-                    f"Classes `{classes & problematic_classes}` detected, which may truncate text "
-                    "and prevent visibility when zoomed to 200%."
-                ),
-                "remediation": (
-                    "Ensure that full content remains visible and accessible without requiring horizontal scrolling."
-                ),
-                "wcag_reference": "1.4.4",
-                "impact": "Text may be hidden without a way for users to access it.",
-                "page_url": page_url,
-                "resolution": "check_zoom_text_cutoff.md"
-            })
+    incidences = run_rules([ZoomTextCutoffRule(page_url)], html_content, page_url)
 
-    # Convert incidences directly to Excel before returning
-    transform_json_to_excel(incidences, excel)
+    # Add incidences to the Excel buffer (the workbook is written once per run)
+    buffer_incidences(incidences, excel)
 
     return incidences
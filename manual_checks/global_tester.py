@@ -1,146 +1,317 @@
 # global_tester.py
 
 import os
-import json
-from datetime import datetime
-
-# Importa cada tester manual
-from manual_checks.check_alt_distinction import check_alt_distinction
-from manual_checks.check_images_decorative import check_images_decorative
-from manual_checks.check_icons_informative import check_icons_informative
-from manual_checks.check_inaccurate_image_text import check_informative_images
-from manual_checks.check_images_of_text import check_images_of_text
-from manual_checks.check_overlay_timeout import check_overlay_timeout
-from manual_checks.check_toast_errors import check_toast_errors
-from manual_checks.check_session_timeout import check_session_timeout
-from manual_checks.check_reflow_320px import check_reflow_320px
-from manual_checks.check_zoom_text_cutoff import check_zoom_text_cutoff
-from manual_checks.check_text_spacing_cropping import check_text_spacing_cropping
-from manual_checks.check_menu_text_spacing import check_menu_text_spacing
-from manual_checks.check_page_title_site_name import check_page_title_site_name_auto_minimal
-from manual_checks.check_page_title_language import check_page_title_language
-from manual_checks.check_tab_aria_selected import check_tab_aria_selected
-from manual_checks.check_button_aria_pressed import check_button_aria_pressed
-from manual_checks.check_accordion_aria_expanded import check_accordion_aria_expanded
-from manual_checks.check_mobile_button_aria_expanded import check_mobile_button_aria_expanded
-from manual_checks.check_button_aria_expanded import check_button_aria_expanded
-from manual_checks.check_combobox_aria_expanded import check_combobox_aria_expanded
-from manual_checks.check_duplicate_ids import check_duplicate_ids
-from manual_checks.check_invalid_elements_in_list import check_invalid_elements_in_list
-from manual_checks.check_aria_label_in_div import check_aria_label_in_div
-from manual_checks.check_buttons_only_by_color import check_buttons_only_by_color
-from manual_checks.check_dropdown_contrast import check_dropdown_contrast
-from manual_checks.check_placeholder_contrast import check_placeholder_contrast
-from manual_checks.check_dropdown_focus_contrast import check_dropdown_focus_contrast
+from concurrent.futures import ProcessPoolExecutor
+
+# Importa la regla de cada tester manual
+from manual_checks.check_alt_distinction import AltDistinctionRule
+from manual_checks.check_images_decorative import ImagesDecorativeRule
+from manual_checks.check_icons_informative import IconsInformativeRule
+from manual_checks.check_inaccurate_image_text import InformativeImagesRule
+from manual_checks.check_images_of_text import ImagesOfTextRule
+from manual_checks.check_overlay_timeout import OverlayTimeoutRule
+from manual_checks.check_toast_errors import ToastErrorsRule
+from manual_checks.check_session_timeout import SessionTimeoutRule
+from manual_checks.check_reflow_320px import Reflow320pxRule
+from manual_checks.check_zoom_text_cutoff import ZoomTextCutoffRule
+from manual_checks.check_text_spacing_cropping import TextSpacingCroppingRule
+from manual_checks.check_menu_text_spacing import MenuTextSpacingRule
+from manual_checks.check_page_title_site_name import PageTitleSiteNameRule
+from manual_checks.check_page_title_language import PageTitleLanguageRule
+from manual_checks.check_tab_aria_selected import TabAriaSelectedRule
+from manual_checks.check_button_aria_pressed import ButtonAriaPressedRule
+from manual_checks.check_accordion_aria_expanded import AccordionAriaExpandedRule
+from manual_checks.check_mobile_button_aria_expanded import MobileButtonAriaExpandedRule
+from manual_checks.check_button_aria_expanded import ButtonAriaExpandedRule
+from manual_checks.check_combobox_aria_expanded import ComboboxAriaExpandedRule
+from manual_checks.check_duplicate_ids import DuplicateIdsRule
+from manual_checks.check_invalid_elements_in_list import InvalidElementsInListRule
+from manual_checks.check_aria_label_in_div import AriaLabelInDivRule
+from manual_checks.check_buttons_only_by_color import ButtonsOnlyByColorRule
+from manual_checks.check_dropdown_contrast import DropdownContrastRule
+from manual_checks.check_placeholder_contrast import PlaceholderContrastRule
+from manual_checks.check_dropdown_focus_contrast import DropdownFocusContrastRule
 #----------------------------------exam------------------------------------------------
-from manual_checks.check_info_and_relationships import check_info_and_relationships
-from manual_checks.check_keyboard_accessibility import check_keyboard_accessibility
-from manual_checks.check_focus_order import check_focus_order
-from manual_checks.check_focus_visible import check_focus_visible
-from manual_checks.check_form_error_identification import check_form_error_identification
-from manual_checks.check_name_role_value import check_name_role_value
+from manual_checks.check_info_and_relationships import InfoAndRelationshipsRule
+from manual_checks.check_keyboard_accessibility import KeyboardAccessibilityRule
+from manual_checks.check_focus_order import FocusOrderRule
+from manual_checks.check_focus_visible import FocusVisibleRule
+from manual_checks.check_form_error_identification import FormErrorIdentificationRule
+from manual_checks.check_name_role_value import NameRoleValueRule
 # ... otros testers
 
-# Lista de testers manuales disponibles
+import manual_checks.page_context
+import manual_checks.rule_engine
+import parser_backend
+from manual_checks.page_context import get_page_context
+from parser_backend import make_soup
+from manual_checks.rule_engine import run_rules_by_rule
+from manual_checks.shared_components import find_shared_components, tag_incidences
+from results_store import source_version
+from manual_checks.incidence_log import DEFAULT_LOG_FILE, append_incidences
+from transform_json_to_excel import buffer_incidences
+
+# Procesos para ejecutar testers en paralelo (1 = secuencial en el proceso actual)
+DEFAULT_WORKERS = int(os.environ.get("MANUAL_TESTER_WORKERS", os.cpu_count() or 1))
+
+# Lista de testers manuales disponibles (clases de regla del motor de un solo recorrido)
 TESTERS = [
-    check_alt_distinction,
-    check_images_decorative,
-    check_icons_informative,
-    check_informative_images,
-    check_images_of_text,
-    check_overlay_timeout,
-    check_toast_errors,
-    check_session_timeout,
-    check_reflow_320px,
-    check_zoom_text_cutoff,
-    check_text_spacing_cropping,
-    check_menu_text_spacing,
-    check_page_title_site_name_auto_minimal,
-    check_page_title_language,
-    check_tab_aria_selected,
-    check_button_aria_pressed,
-    check_accordion_aria_expanded,
-    check_mobile_button_aria_expanded,
-    check_button_aria_expanded,
-    check_combobox_aria_expanded,
-    check_duplicate_ids,
-    check_invalid_elements_in_list,
-    check_aria_label_in_div,
-    check_buttons_only_by_color,
-    check_dropdown_contrast,
-    check_placeholder_contrast,
-    check_dropdown_focus_contrast,
+    AltDistinctionRule,
+    ImagesDecorativeRule,
+    IconsInformativeRule,
+    InformativeImagesRule,
+    ImagesOfTextRule,
+    OverlayTimeoutRule,
+    ToastErrorsRule,
+    SessionTimeoutRule,
+    Reflow320pxRule,
+    ZoomTextCutoffRule,
+    TextSpacingCroppingRule,
+    MenuTextSpacingRule,
+    PageTitleSiteNameRule,
+    PageTitleLanguageRule,
+    TabAriaSelectedRule,
+    ButtonAriaPressedRule,
+    AccordionAriaExpandedRule,
+    MobileButtonAriaExpandedRule,
+    ButtonAriaExpandedRule,
+    ComboboxAriaExpandedRule,
+    DuplicateIdsRule,
+    InvalidElementsInListRule,
+    AriaLabelInDivRule,
+    ButtonsOnlyByColorRule,
+    DropdownContrastRule,
+    PlaceholderContrastRule,
+    DropdownFocusContrastRule,
     #---------------------------------------------------
-    check_info_and_relationships, 
-    check_keyboard_accessibility,
-    check_focus_order,
-    check_focus_visible,
-    check_form_error_identification,
-    check_name_role_value
+    InfoAndRelationshipsRule, 
+    KeyboardAccessibilityRule,
+    FocusOrderRule,
+    FocusVisibleRule,
+    FormErrorIdentificationRule,
+    NameRoleValueRule
     # ...
 ]
 
-def run_all_testers(html_content, page_url):
+TESTERS_BY_NAME = {rule_class.__name__: rule_class for rule_class in TESTERS}
+
+# Testers baratos (sin OCR ni modelos): los únicos que pasan las páginas muestreadas por plantilla
+CHEAP_TESTERS = [name for name, rule_class in TESTERS_BY_NAME.items() if not rule_class.expensive]
+
+def tester_versions():
+    """
+    {nombre de la regla: versión} para la re-auditoría incremental (results_store.py).
+    La versión cambia si se edita el módulo del tester o el motor compartido
+    (rule_engine, page_context, parser_backend) o si cambia el parser HTML.
+    """
+    engine_version = source_version(
+        manual_checks.rule_engine, manual_checks.page_context, parser_backend,
+        extra=parser_backend.resolve_parser()
+    )
+    return {name: source_version(rule_class, extra=engine_version) for name, rule_class in TESTERS_BY_NAME.items()}
+
+def run_testers_by_rule(html_content, page_url, testers=None):
+    """
+    Como `run_testers`, pero devuelve {nombre de la regla: incidencias}.
+    :param testers: nombres de las reglas a ejecutar (por defecto, todas las de TESTERS).
+    """
+    page = get_page_context(html_content, page_url)
+
+    rule_classes = TESTERS if testers is None else [TESTERS_BY_NAME[name] for name in testers]
+    rules = [rule_class(page_url) for rule_class in rule_classes]
+    return {type(rule).__name__: incidences for rule, incidences in run_rules_by_rule(rules, page)}
+
+def run_testers_with_components(html_content, page_url, testers=None, known_components=()):
+    """
+    Modo componentes compartidos (cabecera, menú, pie...; ver shared_components.py).
+
+    - Las reglas con scope "page" ven el documento entero.
+    - Las reglas con scope "element" NO recorren los componentes compartidos de la página;
+      cada componente se analiza aparte, y solo si su hash no está en `known_components`
+      (otra página ya lo analizó).
+    :return: ({nombre de la regla: incidencias fuera de los componentes},
+              [{"hash", "landmark", "incidences_by_rule"}]) con `incidences_by_rule` a None
+              en los componentes ya conocidos.
+    """
+    page = get_page_context(html_content, page_url)
+
+    rule_classes = TESTERS if testers is None else [TESTERS_BY_NAME[name] for name in testers]
+    components = find_shared_components(page)
+
+    rules = [rule_class(page_url) for rule_class in rule_classes]
+    skip_subtrees = [component["element"] for component in components]
+    incidences_by_rule = {
+        type(rule).__name__: incidences
+        for rule, incidences in run_rules_by_rule(rules, page, skip_subtrees=skip_subtrees)
+    }
+
+    element_classes = [rule_class for rule_class in rule_classes if rule_class.scope == "element"]
+    known = set(known_components)
+    component_results = []
+    for component in components:
+        entry = {"hash": component["hash"], "landmark": component["landmark"], "incidences_by_rule": None}
+        if component["hash"] not in known:
+            known.add(component["hash"])
+            component_rules = [rule_class(page_url) for rule_class in element_classes]
+            entry["incidences_by_rule"] = {
+                type(rule).__name__: tag_incidences(incidences, component)
+                for rule, incidences in run_rules_by_rule(component_rules, page, root=component["element"])
+            }
+        component_results.append(entry)
+
+    return incidences_by_rule, component_results
+
+def run_testers(html_content, page_url, testers=None):
+    """
+    Ejecuta todos los testers manuales sobre un documento y devuelve sus incidencias,
+    SIN tocar el buffer de Excel (lo usan los procesos worker, que devuelven las
+    incidencias al proceso principal).
+
+    El HTML se parsea UNA sola vez y se recorre UNA sola vez: cada tester es una
+    regla (`ManualRule`) que recibe solo los nodos que le interesan durante esa
+    pasada compartida (ver manual_checks/rule_engine.py).
+    También acepta un `PageContext` ya construido en lugar del texto HTML.
+    """
+    incidences = []
+    for rule_incidences in run_testers_by_rule(html_content, page_url, testers).values():
+        incidences.extend(rule_incidences)
+    return incidences
+
+def run_all_testers(html_content, page_url, excel="issue_report.xlsx"):
     """
     Ejecuta todos los testers manuales sobre el contenido HTML (un único documento)
     y devuelve las incidencias encontradas.
     """
-    all_incidencias = []
-    for tester in TESTERS:
-        incidencias = tester(html_content, page_url)
-        all_incidencias.extend(incidencias)
+    all_incidencias = run_testers(html_content, page_url)
+
+    # Las filas van al buffer de Excel; el libro se escribe con `flush_excel_buffer()`
+    buffer_incidences(all_incidencias, excel)
     return all_incidencias
 
-def run_all_testers_in_folder(folder_path):
+def filter_html_by_class(html_content, target_class):
+    """Devuelve solo el HTML de los elementos con la clase `target_class` (cadena vacía si no hay)."""
+    soup = make_soup(html_content, sourcelines=False)
+    target_elements = soup.find_all(class_=target_class)
+    return "".join(str(el) for el in target_elements)
+
+def run_testers_job(job):
+    """
+    Trabajo de un worker: un documento (HTML en memoria o ruta a un .html).
+    Con `testers` (lista de nombres de regla) solo ejecuta esas reglas; el resultado
+    incluye también las incidencias por regla (`incidences_by_rule`).
+    Con `shared_components` usa `run_testers_with_components` (sin analizar los hashes
+    de `known_components`) y añade `components` y `element_testers` al resultado: el
+    proceso principal completa las incidencias con `ComponentRegistry.merge_into`.
+    Nunca lanza excepciones: el error se devuelve para no tumbar el lote.
+    """
+    page_url = job["page_url"]
+    result = {"page_url": page_url, "incidences": [], "incidences_by_rule": {}, "error": None}
+
+    try:
+        html_content = job.get("html_content")
+        if html_content is None:
+            with open(job["file_path"], "r", encoding="utf-8") as f:
+                html_content = f.read()
+
+        target_class = job.get("filter_class")
+        if target_class:
+            html_content = filter_html_by_class(html_content, target_class)
+            if not html_content.strip():
+                print(f"⚠️ No se encontró la clase '{target_class}' en {page_url}. Omitiendo.")
+                return result
+
+        if job.get("shared_components"):
+            result["incidences_by_rule"], result["components"] = run_testers_with_components(
+                html_content, page_url, job.get("testers"), job.get("known_components", ())
+            )
+            result["element_testers"] = [
+                name for name in result["incidences_by_rule"] if TESTERS_BY_NAME[name].scope == "element"
+            ]
+        else:
+            result["incidences_by_rule"] = run_testers_by_rule(html_content, page_url, job.get("testers"))
+        for rule_incidences in result["incidences_by_rule"].values():
+            result["incidences"].extend(rule_incidences)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    return result
+
+def run_testers_parallel(jobs, workers=DEFAULT_WORKERS, excel="issue_report.xlsx"):
+    """
+    Ejecuta los testers sobre varios documentos, opcionalmente en varios procesos.
+
+    :param jobs: lista de dicts con `page_url` y `html_content` o `file_path`
+                 (opcional: `filter_class` para analizar solo esa clase).
+    :param workers: nº de procesos. Con 1 (o un solo trabajo) se ejecuta en este proceso.
+    :param excel: libro donde se acumulan las filas (vía buffer, desde este proceso).
+    :return: lista de resultados {page_url, incidences, error} en el MISMO orden que `jobs`.
+             Un error en un documento se informa en su resultado y el resto del lote sigue.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        results = [run_testers_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_testers_job, job) for job in jobs]
+            results = []
+            # Recogemos en orden de envío: resultado determinista sea cual sea el worker que acabe antes
+            for job, future in zip(jobs, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:  # p. ej. un worker muerto (BrokenProcessPool)
+                    results.append({"page_url": job["page_url"], "incidences": [], "error": f"{type(e).__name__}: {e}"})
+
+    for result in results:
+        collect_testers_result(result, excel)
+
+    return results
+
+def collect_testers_result(result, excel="issue_report.xlsx"):
+    """
+    Procesa en el proceso principal el resultado de `run_testers_job`:
+    informa del error o añade las incidencias al buffer de Excel.
     """
-    NUEVA FUNCIÓN:
-    1) Busca todos los archivos .html en 'folder_path'.
-    2) Para cada .html, lo abre, obtiene su contenido,
-       y llama a 'run_all_testers'.
-    3) Retorna la lista total de incidencias de la carpeta.
+    if result["error"]:
+        print(f"❌ Error en los testers manuales para {result['page_url']}: {result['error']}")
+    else:
+        buffer_incidences(result["incidences"], excel)
+    return result["incidences"]
+
+def run_all_testers_in_folder(folder_path, workers=DEFAULT_WORKERS, filter_class=None):
+    """
+    1) Busca todos los archivos .html en 'folder_path' (en orden alfabético).
+    2) Ejecuta los testers sobre cada uno, en paralelo con `workers` procesos.
+    3) Retorna la lista total de incidencias de la carpeta, en el orden de los archivos.
+       Los archivos que fallan se informan por consola y no detienen el resto.
     """
     if not os.path.isdir(folder_path):
         print(f"🚫 {folder_path} no es una carpeta válida.")
         return []
 
-    html_files = [f for f in os.listdir(folder_path) if f.endswith(".html")]
+    html_files = sorted(f for f in os.listdir(folder_path) if f.endswith(".html"))
     if not html_files:
         print(f"⚠️ No se encontraron archivos .html en {folder_path}")
         return []
 
-    all_folder_incidences = []
+    jobs = []
     for file_name in html_files:
         file_path = os.path.join(folder_path, file_name)
-        # Leemos el contenido HTML
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-        except Exception as e:
-            print(f"Error leyendo {file_path}: {e}")
-            continue
-
-        # Llamamos al tester manual
-        incidences = run_all_testers(content, page_url=file_path)
-        all_folder_incidences.extend(incidences)
+        jobs.append({"page_url": file_path, "file_path": file_path, "filter_class": filter_class})
+
+    results = run_testers_parallel(jobs, workers=workers)
+
+    all_folder_incidences = []
+    for result in results:
+        all_folder_incidences.extend(result["incidences"])
+
+    failed = sum(1 for result in results if result["error"])
+    if failed:
+        print(f"⚠️ {failed}/{len(results)} archivos con errores en {folder_path}")
 
     return all_folder_incidences
 
-def report_incidences_to_file(incidencias, report_file="manual_incidences.json"):
+def report_incidences_to_file(incidencias, report_file=DEFAULT_LOG_FILE):
     """
-    Guarda las incidencias en un archivo JSON (append).
+    Guarda las incidencias en el log JSONL (append, una incidencia por línea).
+    Para obtener el array JSON antiguo: `python -m manual_checks.incidence_log export`.
     """
-    existing_data = []
-    if os.path.isfile(report_file):
-        try:
-            with open(report_file, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-        except json.JSONDecodeError:
-            existing_data = []
-
-    now_str = datetime.now().isoformat()
-    for inc in incidencias:
-        inc["detected_at"] = now_str
-
-    existing_data.extend(incidencias)
-    with open(report_file, "w", encoding="utf-8") as f:
-        json.dump(existing_data, f, indent=4, ensure_ascii=False)
+    append_incidences(incidencias, report_file)
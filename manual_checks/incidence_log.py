@@ -0,0 +1,136 @@
+# incidence_log.py
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import datetime
+
+DEFAULT_LOG_FILE = "manual_incidences.jsonl"
+DEFAULT_EXPORT_FILE = "manual_incidences.json"
+
+
+def append_incidences(incidencias, log_file=DEFAULT_LOG_FILE):
+    """
+    Añade incidencias al log JSONL (una incidencia por línea, modo append).
+    El coste es proporcional a las incidencias de la página, no al tamaño del log.
+    """
+    if not incidencias:
+        return
+
+    now_str = datetime.now().isoformat()
+    lines = []
+    for inc in incidencias:
+        inc["detected_at"] = now_str
+        lines.append(json.dumps(inc, ensure_ascii=False, default=str))
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def iter_incidences(log_file=DEFAULT_LOG_FILE):
+    """
+    Recorre el log JSONL incidencia a incidencia (sin cargarlo entero en memoria).
+    Las líneas corruptas (p. ej. una escritura cortada) se ignoran con un aviso.
+    """
+    if not os.path.isfile(log_file):
+        return
+
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ Línea {line_number} inválida en {log_file}. Omitiendo.")
+
+
+def _iter_legacy_json(json_file):
+    """Incidencias de un JSON legado (array), si existe y es válido."""
+    if not json_file or not os.path.isfile(json_file):
+        return []
+    try:
+        with open(json_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        print(f"⚠️ {json_file} no es un JSON válido. Se ignora.")
+        return []
+    return data if isinstance(data, list) else [data]
+
+
+def export_legacy_json(log_file=DEFAULT_LOG_FILE, output_file=DEFAULT_EXPORT_FILE, base_file=None, truncate_log=False,
+                       force=False):
+    """
+    Compacta el log JSONL en el formato antiguo: un array JSON con `indent=4`.
+
+    :param log_file: log JSONL de origen.
+    :param output_file: JSON de salida (se reemplaza de forma atómica).
+    :param base_file: JSON legado cuyas incidencias van delante (p. ej. el propio
+                      `output_file` para acumular sobre lo exportado antes).
+    :param truncate_log: si es True, vacía el log tras exportar (las incidencias
+                         quedan ya en `output_file`).
+    :param force: permite reemplazar un `output_file` con incidencias que no se usa como
+                  `base_file` (sin él se lanza FileExistsError en vez de perderlas).
+    :return: número de incidencias exportadas.
+    """
+    same_file = base_file and os.path.abspath(base_file) == os.path.abspath(output_file)
+    if not force and not same_file and _iter_legacy_json(output_file):
+        raise FileExistsError(
+            f"{output_file} ya tiene incidencias: usa --base {output_file} para conservarlas o --force para reemplazarlo"
+        )
+
+    # Leemos la base ANTES de escribir: puede ser el mismo archivo que la salida
+    base_incidences = _iter_legacy_json(base_file)
+
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    fd, tmp_path = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+
+    count = 0
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write("[")
+            for source in (base_incidences, iter_incidences(log_file)):
+                for inc in source:
+                    entry = json.dumps(inc, indent=4, ensure_ascii=False, default=str)
+                    f.write(",\n" if count else "\n")
+                    f.write("\n".join("    " + line for line in entry.splitlines()))
+                    count += 1
+            f.write("\n]" if count else "]")
+        os.replace(tmp_path, output_file)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if truncate_log and os.path.isfile(log_file):
+        open(log_file, "w", encoding="utf-8").close()
+
+    print(f"✅ {count} incidencias exportadas a: {output_file}")
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log JSONL de incidencias manuales")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Exporta el log al array JSON legado")
+    export_parser.add_argument("--log", default=DEFAULT_LOG_FILE, help="Log JSONL de origen")
+    export_parser.add_argument("--output", default=DEFAULT_EXPORT_FILE, help="JSON de salida")
+    export_parser.add_argument("--base", default=None, help="JSON legado a conservar delante del log")
+    export_parser.add_argument("--truncate-log", action="store_true", help="Vacía el log tras exportar")
+    export_parser.add_argument("--force", action="store_true", help="Reemplaza la salida aunque ya tenga incidencias")
+
+    args = parser.parse_args()
+    if args.command == "export":
+        try:
+            export_legacy_json(args.log, args.output, base_file=args.base, truncate_log=args.truncate_log,
+                               force=args.force)
+        except FileExistsError as e:
+            print(f"❌ {e}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
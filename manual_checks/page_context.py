@@ -0,0 +1,71 @@
+# page_context.py
+
+from heapq import merge
+
+from parser_backend import make_soup
+
+
+class PageContext:
+    """
+    Documento HTML parseado UNA sola vez y compartido por todos los testers manuales.
+
+    - `soup`: árbol BeautifulSoup del documento (parser configurable en parser_backend.py).
+    - `all_elements()`: todos los elementos del documento, en orden de documento.
+    - `elements(*names)`: elementos por nombre de etiqueta, en orden de documento
+      (el índice se construye en una única pasada y se reutiliza).
+    - `style_texts`: contenido de todas las etiquetas <style> de la página.
+    """
+
+    def __init__(self, html_content, page_url):
+        self.html_content = html_content
+        self.page_url = page_url
+        self.soup = make_soup(html_content)
+
+        self._all_elements = None
+        self._elements_by_tag = None
+        self._style_texts = None
+
+    def _build_tag_index(self):
+        """Recorre el árbol una vez y agrupa los elementos por etiqueta (guardando su posición)."""
+        all_elements = self.soup.find_all(True)
+        index = {}
+        for position, element in enumerate(all_elements):
+            index.setdefault(element.name, []).append((position, element))
+        self._all_elements = all_elements
+        self._elements_by_tag = index
+
+    def all_elements(self):
+        """Todos los elementos (Tag) del documento, en orden de documento."""
+        if self._all_elements is None:
+            self._build_tag_index()
+        return self._all_elements
+
+    def elements(self, *names):
+        """
+        Devuelve los elementos con alguna de las etiquetas indicadas, en orden de documento.
+        Equivale a `soup.find_all([...names])` pero sin volver a recorrer el árbol.
+        """
+        if self._elements_by_tag is None:
+            self._build_tag_index()
+
+        groups = [self._elements_by_tag.get(name, []) for name in names]
+        if len(groups) == 1:
+            return [element for _, element in groups[0]]
+        return [element for _, element in merge(*groups, key=lambda item: item[0])]
+
+    @property
+    def style_texts(self):
+        """Texto de cada etiqueta <style> de la página."""
+        if self._style_texts is None:
+            self._style_texts = [style_tag.get_text() for style_tag in self.elements("style")]
+        return self._style_texts
+
+
+def get_page_context(html_content, page_url=None):
+    """
+    Shim de compatibilidad: los testers aceptan tanto un `PageContext` como el HTML en texto.
+    Si recibe texto, lo parsea (una vez) y devuelve un contexto nuevo.
+    """
+    if isinstance(html_content, PageContext):
+        return html_content
+    return PageContext(html_content, page_url)
@@ -0,0 +1,142 @@
+# rule_engine.py
+
+from manual_checks.page_context import get_page_context
+
+
+class ManualRule:
+    """
+    Regla base del motor de un solo recorrido.
+
+    Cada regla declara qué nodos le interesan y el motor se los entrega durante
+    UNA única pasada por el árbol, compartida por todas las reglas:
+
+    - `tags`: nombres de etiqueta (p. ej. ("img", "svg")).
+    - `attrs`: atributos cuya presencia interesa (p. ej. ("style", "onclick")).
+    - `roles`: valores de `role` (p. ej. ("button", "tab")).
+    - `classes`: clases CSS (p. ej. ("modal", "overlay")).
+    - `all_elements`: si es True, recibe todos los elementos del documento.
+    - `expensive`: True si la regla es cara (OCR, modelos): en modo muestreo por
+      plantillas solo se ejecuta en las páginas representativas.
+    - `scope`: "page" si la regla necesita el documento entero (ids duplicados, título,
+      estilos de la página, URLs relativas resueltas contra `page_url`, incidencias
+      agregadas...) o "element" si cada incidencia solo depende del elemento visitado y
+      sus descendientes. Las reglas "element" pueden ejecutarse una sola vez por
+      componente compartido (cabecera, menú, pie; ver shared_components.py).
+
+    El filtrado del motor es un superconjunto: `visit()` recibe cada elemento
+    una sola vez y debe comprobar sus propias condiciones.
+    `finish()` se llama al terminar el recorrido y devuelve las incidencias.
+    """
+
+    tags = ()
+    attrs = ()
+    roles = ()
+    classes = ()
+    all_elements = False
+    expensive = False
+    scope = "page"
+
+    def __init__(self, page_url):
+        self.page_url = page_url
+
+    def visit(self, element):
+        pass
+
+    def finish(self, page):
+        return []
+
+
+def has_class(element, class_names):
+    """True si el elemento tiene alguna de las clases indicadas (como `class_=[...]` en find_all)."""
+    element_classes = element.get("class") or []
+    return any(class_name in element_classes for class_name in class_names)
+
+
+def _build_dispatch(rules):
+    """Indexa las reglas por etiqueta, atributo, role y clase."""
+    dispatch = {"every": [], "tags": {}, "attrs": {}, "roles": {}, "classes": {}}
+
+    for rule in rules:
+        if rule.all_elements:
+            dispatch["every"].append(rule)
+            continue
+        for key in ("tags", "attrs", "roles", "classes"):
+            for value in getattr(rule, key):
+                dispatch[key].setdefault(value, []).append(rule)
+
+    return dispatch
+
+
+def _interested_rules(element, dispatch):
+    """Reglas interesadas en `element`, sin repetir."""
+    candidates = list(dispatch["every"])
+    candidates += dispatch["tags"].get(element.name, [])
+
+    if dispatch["attrs"]:
+        for attr in element.attrs:
+            candidates += dispatch["attrs"].get(attr, [])
+
+    if dispatch["roles"]:
+        role = element.get("role")
+        if isinstance(role, str):
+            candidates += dispatch["roles"].get(role, [])
+
+    if dispatch["classes"]:
+        for class_name in element.get("class") or []:
+            candidates += dispatch["classes"].get(class_name, [])
+
+    if len(candidates) < 2:
+        return candidates
+
+    seen = set()
+    unique = []
+    for rule in candidates:
+        if id(rule) not in seen:
+            seen.add(id(rule))
+            unique.append(rule)
+    return unique
+
+
+def run_rules_by_rule(rules, html_content, page_url=None, root=None, skip_subtrees=()):
+    """
+    Ejecuta varias reglas con un único recorrido del documento.
+
+    :param rules: lista de instancias de `ManualRule`.
+    :param html_content: HTML en texto o `PageContext` ya parseado.
+    :param page_url: URL de la página (solo se usa si hay que parsear el HTML).
+    :param root: si se indica, solo se recorre ese elemento y sus descendientes.
+    :param skip_subtrees: elementos cuyos subárboles solo ven las reglas con scope "page"
+                          (las "element" se ejecutan aparte sobre esos subárboles).
+    :return: lista de (regla, incidencias de esa regla), en el orden de `rules`.
+    """
+    page = get_page_context(html_content, page_url)
+    dispatch = _build_dispatch(rules)
+
+    if root is None:
+        elements = page.all_elements()
+    else:
+        elements = [root] + root.find_all(True)
+
+    skipped = set()
+    for subtree in skip_subtrees:
+        skipped.add(id(subtree))
+        skipped.update(id(element) for element in subtree.find_all(True))
+    page_dispatch = _build_dispatch([rule for rule in rules if rule.scope == "page"]) if skipped else dispatch
+
+    for element in elements:
+        element_dispatch = page_dispatch if id(element) in skipped else dispatch
+        for rule in _interested_rules(element, element_dispatch):
+            rule.visit(element)
+
+    return [(rule, rule.finish(page)) for rule in rules]
+
+
+def run_rules(rules, html_content, page_url=None):
+    """
+    Como `run_rules_by_rule`, pero devuelve una sola lista de incidencias,
+    agrupadas en el orden de `rules`.
+    """
+    incidences = []
+    for _, rule_incidences in run_rules_by_rule(rules, html_content, page_url):
+        incidences.extend(rule_incidences)
+    return incidences
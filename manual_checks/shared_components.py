@@ -0,0 +1,187 @@
+# shared_components.py
+
+import hashlib
+import json
+
+# Regiones que suelen repetirse idénticas en todas las páginas del sitio
+LANDMARK_TAGS = ("header", "nav", "footer", "aside")
+LANDMARK_ROLES = ("banner", "navigation", "contentinfo", "complementary")
+
+# Solo merece la pena deduplicar subárboles grandes (mega-menús, pies con cientos de enlaces)
+MIN_COMPONENT_ELEMENTS = 25
+
+DEFAULT_COMPONENTS_FILE = "shared_components.json"
+
+
+def _landmark_name(element):
+    role = element.get("role")
+    if isinstance(role, str) and role in LANDMARK_ROLES:
+        return role
+    if element.name in LANDMARK_TAGS:
+        return element.name
+    return None
+
+
+def find_shared_components(page, min_elements=MIN_COMPONENT_ELEMENTS):
+    """
+    Regiones landmark grandes de la página (solo las más externas: un <nav> dentro
+    de un <header> va con su cabecera).
+
+    :param page: `PageContext` ya parseado.
+    :return: lista de {"hash", "landmark", "element"}. El hash es el SHA-256 del
+             marcado del subárbol: la misma cabecera en dos páginas da el mismo hash.
+    """
+    components = []
+    inside_until = None  # Último descendiente del componente actual
+    for element in page.all_elements():
+        if inside_until is not None:
+            if element is inside_until:
+                inside_until = None
+            continue
+
+        landmark = _landmark_name(element)
+        if landmark is None:
+            continue
+
+        descendants = element.find_all(True)
+        if len(descendants) < min_elements:
+            continue
+
+        markup = str(element)
+        components.append({
+            "hash": hashlib.sha256(markup.encode("utf-8")).hexdigest(),
+            "landmark": landmark,
+            "element": element
+        })
+        inside_until = descendants[-1]
+
+    return components
+
+
+def tag_incidences(incidences, component):
+    """Marca las incidencias de un componente compartido (`shared_component`)."""
+    label = f"{component['landmark']}:{component['hash'][:12]}"
+    return [dict(incidence, shared_component=label) for incidence in incidences]
+
+
+class ComponentRegistry:
+    """
+    Componentes compartidos vistos en la ejecución (vive en el proceso principal).
+
+    - Guarda, por hash de subárbol, las incidencias de cada regla "element" calculadas
+      la primera vez que apareció: las páginas siguientes no vuelven a analizarlo
+      (`known_hashes` se envía a los workers).
+    - Atribuye cada componente a todas las páginas que lo contienen.
+    - `filter_reported`: las incidencias de un componente se informan UNA vez en el
+      informe (en la primera página); el resto de páginas quedan en
+      `shared_components.json` (`save`).
+    - `page_components` / `restore_page`: los componentes de una página se guardan en el
+      ResultsStore, para registrarla también cuando sus testers no se vuelven a ejecutar.
+    """
+
+    def __init__(self):
+        self.components = {}  # hash -> {"landmark", "incidences_by_rule", "pages"}
+        self._reported = set()  # Etiquetas `shared_component` ya informadas
+        self.stats = {"analyzed": 0, "reused": 0, "suppressed_incidences": 0}
+
+    def known_hashes(self, rule_names):
+        """Hashes con incidencias ya calculadas para todas las reglas `rule_names`."""
+        rule_names = list(rule_names)
+        return [
+            component_hash for component_hash, component in self.components.items()
+            if all(name in component["incidences_by_rule"] for name in rule_names)
+        ]
+
+    def add(self, component_hash, landmark, incidences_by_rule):
+        component = self.components.setdefault(
+            component_hash, {"landmark": landmark, "incidences_by_rule": {}, "pages": []}
+        )
+        for name, incidences in incidences_by_rule.items():
+            # Si dos páginas lo analizaron a la vez, gana la primera
+            component["incidences_by_rule"].setdefault(name, incidences)
+        self.stats["analyzed"] += 1
+
+    def incidences_by_rule(self, component_hash):
+        return self.components[component_hash]["incidences_by_rule"]
+
+    def add_page(self, component_hash, page_url):
+        pages = self.components[component_hash]["pages"]
+        if page_url not in pages:
+            pages.append(page_url)
+
+    def merge_into(self, result):
+        """
+        Completa el resultado de `run_testers_job` (modo componentes compartidos):
+        añade a cada regla "element" las incidencias de los componentes de la página,
+        recién calculadas por el worker o ya conocidas.
+        """
+        for component in result.get("components", []):
+            component_hash = component["hash"]
+            if component["incidences_by_rule"] is not None:
+                self.add(component_hash, component["landmark"], component["incidences_by_rule"])
+            else:
+                self.stats["reused"] += 1
+            self.add_page(component_hash, result["page_url"])
+
+            known = self.incidences_by_rule(component_hash)
+            for name in result.get("element_testers", []):
+                result["incidences_by_rule"].setdefault(name, []).extend(known.get(name, []))
+        return result
+
+    def page_components(self, page_url):
+        """Componentes que contiene `page_url` (con sus incidencias), para guardarlos."""
+        return [
+            {"hash": component_hash, "landmark": component["landmark"],
+             "incidences_by_rule": component["incidences_by_rule"]}
+            for component_hash, component in self.components.items() if page_url in component["pages"]
+        ]
+
+    def restore_page(self, entries, page_url):
+        """Registra una página sin analizarla, con los componentes de `page_components`."""
+        for entry in entries:
+            component = self.components.setdefault(
+                entry["hash"], {"landmark": entry["landmark"], "incidences_by_rule": {}, "pages": []}
+            )
+            for name, incidences in entry["incidences_by_rule"].items():
+                component["incidences_by_rule"].setdefault(name, incidences)
+            self.stats["reused"] += 1
+            self.add_page(entry["hash"], page_url)
+
+    def filter_reported(self, incidences):
+        """Quita las incidencias de componentes que ya se informaron en otra página."""
+        output = []
+        first_seen = set()
+        for incidence in incidences:
+            label = incidence.get("shared_component")
+            if label is None:
+                output.append(incidence)
+            elif label not in self._reported or label in first_seen:
+                first_seen.add(label)
+                output.append(incidence)
+            else:
+                self.stats["suppressed_incidences"] += 1
+        self._reported.update(first_seen)
+        return output
+
+    def save(self, path=DEFAULT_COMPONENTS_FILE):
+        """Guarda qué páginas contienen cada componente (y cuántas incidencias tiene)."""
+        data = {
+            component_hash[:12]: {
+                "landmark": component["landmark"],
+                "incidences": sum(len(incidences) for incidences in component["incidences_by_rule"].values()),
+                "pages": component["pages"]
+            }
+            for component_hash, component in self.components.items()
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+
+    def print_summary(self):
+        if not self.components:
+            return
+        pages = sum(len(component["pages"]) for component in self.components.values())
+        print(
+            f"🧱 Componentes compartidos: {len(self.components)} únicos en {pages} apariciones; "
+            f"{self.stats['reused']} análisis evitados, "
+            f"{self.stats['suppressed_incidences']} incidencias repetidas no informadas"
+        )
@@ -0,0 +1,133 @@
+# parser_backend.py
+
+import os
+import re
+from bisect import bisect_left, bisect_right
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = None
+    LXML_AVAILABLE = False
+
+# Punto ÚNICO de configuración del parser HTML de todo el pipeline.
+# - "lxml": parser en C (rápido). Requiere `pip install lxml`.
+# - "html.parser": parser puro Python de la librería estándar (fallback).
+# Se puede forzar con la variable de entorno HTML_PARSER.
+DEFAULT_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+HTML_PARSER = os.environ.get("HTML_PARSER", DEFAULT_PARSER)
+
+SUPPORTED_PARSERS = ("lxml", "html.parser")
+
+# Etiquetas de apertura y comentarios del HTML fuente (para `_start_tag_lines`)
+_TAG_OPEN = re.compile(r"<!--.*?(?:-->|$)|<([A-Za-z][^\s/>]*)", re.S)
+# Elementos cuyo contenido es texto: un "<div" dentro de un <script> no es una etiqueta
+_RAW_TEXT_TAGS = ("script", "style", "textarea", "title", "xmp", "iframe", "noembed", "noframes")
+
+
+def resolve_parser(parser=None):
+    """
+    Devuelve el parser que se va a usar realmente.
+    Si se pide lxml y no está instalado, cae a html.parser.
+    """
+    parser = parser or HTML_PARSER
+    if parser not in SUPPORTED_PARSERS:
+        print(f"⚠️ Parser HTML desconocido '{parser}'. Usando html.parser.")
+        return "html.parser"
+    if parser == "lxml" and not LXML_AVAILABLE:
+        return "html.parser"
+    return parser
+
+
+def _start_tag_lines(html_content):
+    """{etiqueta: ([posición en el fuente], [línea de su "<"])} de las etiquetas de apertura."""
+    line_starts = [match.end() for match in re.finditer("\n", html_content)]
+    tags = {}
+    position = 0
+    index = 0
+    while True:
+        match = _TAG_OPEN.search(html_content, position)
+        if match is None:
+            break
+        position = match.end()
+        if match.group(1) is None:
+            continue  # Comentario
+        name = match.group(1).lower()
+        indexes, lines = tags.setdefault(name, ([], []))
+        indexes.append(index)
+        lines.append(bisect_right(line_starts, match.start()) + 1)
+        index += 1
+        if name in _RAW_TEXT_TAGS:
+            close = re.compile(rf"</{re.escape(name)}\s*>", re.I).search(html_content, position)
+            position = close.end() if close else len(html_content)
+    return tags
+
+
+def _annotate_sourcelines(soup, html_content):
+    """
+    BeautifulSoup solo rellena `sourceline` con html.parser/html5lib.
+    Con lxml lo reconstruimos: libxml2 sí conoce la línea de cada elemento, así que
+    parseamos con lxml.etree (C, muy rápido) y emparejamos ambos árboles en orden
+    de documento (los dos salen de los mismos eventos de libxml2).
+
+    libxml2 da la línea donde TERMINA la etiqueta de apertura; html.parser (y los
+    informes) la línea donde empieza. Cada elemento se empareja con su "<etiqueta" del
+    fuente (la siguiente con ese nombre, que no puede estar después de la línea de
+    libxml2); los que no aparecen en el fuente (<tbody>, <body> implícitos) conservan
+    la de libxml2.
+
+    Devuelve False si los árboles no coinciden (en ese caso no se anota nada).
+    """
+    try:
+        root = etree.HTML(html_content)
+    except (ValueError, etree.ParserError):
+        return False
+
+    bs_elements = soup.find_all(True)
+    if root is None:
+        return not bs_elements
+
+    lxml_elements = [el for el in root.iter() if isinstance(el.tag, str)]
+    if len(lxml_elements) != len(bs_elements):
+        return False
+
+    for bs_element, lxml_element in zip(bs_elements, lxml_elements):
+        if bs_element.name != lxml_element.tag:
+            return False
+
+    start_tags = _start_tag_lines(html_content)
+    next_index = 0  # Etiquetas del fuente ya emparejadas: las anteriores a esta
+    for bs_element, lxml_element in zip(bs_elements, lxml_elements):
+        line = lxml_element.sourceline
+        indexes, lines = start_tags.get(lxml_element.tag, ((), ()))
+        candidate = bisect_left(indexes, next_index)
+        if candidate < len(indexes) and line is not None and lines[candidate] <= line:
+            line = lines[candidate]
+            next_index = indexes[candidate] + 1
+        bs_element.sourceline = line
+    return True
+
+
+def make_soup(html_content, parser=None, sourcelines=True):
+    """
+    Crea el árbol BeautifulSoup con el parser configurado.
+
+    :param html_content: HTML en texto.
+    :param parser: "lxml" o "html.parser" (por defecto, HTML_PARSER).
+    :param sourcelines: si es True, garantiza que `element.sourceline` esté disponible
+                        (lo necesitan los `get_element_info` de los testers).
+                        El scraper solo busca enlaces/imágenes y puede desactivarlo.
+    """
+    parser = resolve_parser(parser)
+
+    if parser == "lxml":
+        soup = BeautifulSoup(html_content, "lxml")
+        if not sourcelines or _annotate_sourcelines(soup, html_content):
+            return soup
+        # Árboles desalineados (HTML muy roto): preferimos números de línea correctos
+        print("⚠️ No se pudieron calcular los números de línea con lxml. Usando html.parser.")
+
+    return BeautifulSoup(html_content, "html.parser")
@@ -0,0 +1,126 @@
+# results_store.py
+
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import time
+
+RESULTS_STORE_FILE = os.path.join(".audit_cache", "results.sqlite")
+
+# Caché por proceso: {nombre del módulo: hash de su código fuente}
+_source_hashes = {}
+
+
+def content_hash(html_content):
+    """Hash SHA-256 del HTML renderizado de una página."""
+    return hashlib.sha256((html_content or "").encode("utf-8")).hexdigest()
+
+
+def _module_source_hash(module):
+    name = module.__name__
+    if name not in _source_hashes:
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = name  # Sin código fuente disponible: solo cambia con el nombre
+        _source_hashes[name] = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return _source_hashes[name]
+
+
+def source_version(*objects, extra=""):
+    """
+    Versión de una etapa de auditoría: hash del código fuente de los módulos donde
+    están definidos `objects` (clases, funciones o módulos) más `extra` (p. ej. la
+    versión de axe o el parser HTML). Si se edita el código, la versión cambia y los
+    resultados guardados dejan de valer.
+    """
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for obj in objects:
+        module = obj if inspect.ismodule(obj) else inspect.getmodule(obj)
+        digest.update(_module_source_hash(module).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ResultsStore:
+    """
+    Resultados de auditoría persistentes entre ejecuciones, para re-auditar de forma incremental.
+
+    Cada resultado se guarda por (URL, etapa) junto con el hash del contenido de la página
+    y la versión de la etapa (ver `source_version`). Una búsqueda solo acierta si ambos
+    coinciden: si la página cambió o se editó el tester, hay que volver a ejecutarlo.
+
+    Etapas usadas por main.py: "axe", "lighthouse" y "manual:<NombreDeLaRegla>"
+    (una por tester manual, así al editar un tester solo se recalcula ese).
+    """
+
+    def __init__(self, path=RESULTS_STORE_FILE):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (url, stage)
+            )
+            """
+        )
+        self._db.commit()
+
+        self.stats = {}  # grupo de etapa -> {"hits": n, "misses": n}
+
+    def close(self):
+        self._db.close()
+
+    def _count(self, stage, hit):
+        group = stage.split(":", 1)[0]  # "manual:AltDistinctionRule" -> "manual"
+        counters = self.stats.setdefault(group, {"hits": 0, "misses": 0})
+        counters["hits" if hit else "misses"] += 1
+
+    def get(self, url, stage, page_hash, version):
+        """Resultado guardado si la página y la versión coinciden; si no, None."""
+        row = self._db.execute(
+            "SELECT result FROM results WHERE url = ? AND stage = ? AND content_hash = ? AND version = ?",
+            (url, stage, page_hash, version)
+        ).fetchone()
+        self._count(stage, row is not None)
+        return json.loads(row[0]) if row else None
+
+    def put(self, url, stage, page_hash, version, result):
+        """Guarda (o reemplaza) el resultado de una etapa para la página."""
+        self._db.execute(
+            """
+            INSERT OR REPLACE INTO results (url, stage, content_hash, version, result, stored_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (url, stage, page_hash, version, json.dumps(result, ensure_ascii=False), time.time())
+        )
+        self._db.commit()
+
+    def hit_rate(self):
+        """Fracción de búsquedas que reutilizaron un resultado (todas las etapas)."""
+        hits = sum(counters["hits"] for counters in self.stats.values())
+        total = hits + sum(counters["misses"] for counters in self.stats.values())
+        return hits / total if total else 0.0
+
+    def print_summary(self):
+        if not self.stats:
+            return
+        parts = []
+        for group, counters in self.stats.items():
+            total = counters["hits"] + counters["misses"]
+            parts.append(f"{group} {counters['hits']}/{total}")
+        print(
+            f"♻️ Re-auditoría incremental: {self.hit_rate():.0%} de resultados reutilizados "
+            f"({', '.join(parts)})"
+        )
@@ -0,0 +1,145 @@
+# checkpoint.py
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+CHECKPOINT_FILE = os.path.join(".crawl_checkpoint", "crawl.sqlite")
+
+
+class CrawlCheckpoint:
+    """
+    Estado del crawl guardado de forma incremental en SQLite, para poder reanudarlo
+    (`python main.py --resume`) si el proceso se cae a mitad (Chromium sin memoria,
+    corte de red...).
+
+    - `urls`: cada URL encolada con su clave de deduplicación, profundidad, orden de
+      descubrimiento y estado ("pending", "done", "failed" o "skipped": duplicada por
+      canonical). Es a la vez el conjunto de visitadas y la frontera pendiente; al reanudar
+      se vuelven a intentar las "pending" y las "failed".
+    - `pages`: el resultado de cada página terminada (comprimido), para entregarla otra
+      vez al reanudar sin volver a cargarla.
+    Una página y los enlaces que encoló se confirman en la MISMA transacción
+    (`mark_done`): tras una caída nunca queda una página terminada sin sus enlaces.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE, resume=False):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                sequence INTEGER NOT NULL,
+                status TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                sequence INTEGER NOT NULL,
+                canonical_key TEXT,
+                result BLOB NOT NULL
+            );
+            """
+        )
+        self._db.commit()
+        self.resume = resume
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+    def _get_meta(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def start(self, start_url):
+        """
+        Prepara el checkpoint para un crawl de `start_url`.
+        :return: True si hay un crawl anterior de esa URL que reanudar; False si se empieza
+                 de cero (sin --resume, o si el checkpoint era de otro sitio).
+        """
+        previous_url = self._get_meta("start_url")
+        if self.resume and previous_url == start_url:
+            return True
+        if self.resume and previous_url is not None:
+            print(f"⚠️ El checkpoint es de {previous_url}, no de {start_url}. Empezando de cero.")
+
+        self._db.execute("DELETE FROM urls")
+        self._db.execute("DELETE FROM pages")
+        self._db.execute("DELETE FROM meta")
+        self._set_meta("start_url", start_url)
+        self._set_meta("started_at", str(time.time()))
+        self._db.commit()
+        return False
+
+    def add_url(self, key, url, depth, sequence):
+        """Anota una URL encolada (se confirma con la página que la descubrió, en `mark_done`)."""
+        self._db.execute(
+            "INSERT OR IGNORE INTO urls (key, url, depth, sequence, status) VALUES (?, ?, ?, ?, 'pending')",
+            (key, url, depth, sequence)
+        )
+
+    def mark_done(self, key, sequence, page_result, canonical_key=None):
+        blob = zlib.compress(json.dumps(page_result, ensure_ascii=False).encode("utf-8"))
+        self._db.execute("UPDATE urls SET status = 'done' WHERE key = ?", (key,))
+        self._db.execute(
+            "INSERT OR REPLACE INTO pages (key, sequence, canonical_key, result) VALUES (?, ?, ?, ?)",
+            (key, sequence, canonical_key, blob)
+        )
+        self._db.commit()
+
+    def mark_status(self, key, status):
+        """Marca una URL como "failed" (no se pudo cargar) o "skipped" (duplicada)."""
+        self._db.execute("UPDATE urls SET status = ? WHERE key = ?", (status, key))
+        self._db.commit()
+
+    def mark_finished(self):
+        self._set_meta("finished_at", str(time.time()))
+        self._db.commit()
+
+    def visited_keys(self):
+        return [row[0] for row in self._db.execute("SELECT key FROM urls")]
+
+    def pending_urls(self):
+        """[(profundidad, orden, url)] por cargar (o que fallaron), en el orden de la frontera."""
+        return self._db.execute(
+            "SELECT depth, sequence, url FROM urls WHERE status IN ('pending', 'failed') ORDER BY depth, sequence"
+        ).fetchall()
+
+    def scraped_keys(self):
+        """Claves de las páginas terminadas y de sus URLs canónicas."""
+        keys = set()
+        for key, canonical_key in self._db.execute("SELECT key, canonical_key FROM pages"):
+            keys.add(key)
+            if canonical_key:
+                keys.add(canonical_key)
+        return keys
+
+    def next_sequence(self):
+        return self._db.execute("SELECT COALESCE(MAX(sequence), -1) + 1 FROM urls").fetchone()[0]
+
+    def completed_pages(self):
+        """Genera (clave, orden, resultado) de las páginas terminadas, en orden de descubrimiento."""
+        # Primero solo las claves: el crawl puede seguir escribiendo mientras se recorren
+        rows = self._db.execute("SELECT key, sequence FROM pages ORDER BY sequence").fetchall()
+        for key, sequence in rows:
+            blob = self._db.execute("SELECT result FROM pages WHERE key = ?", (key,)).fetchone()[0]
+            yield key, sequence, json.loads(zlib.decompress(blob).decode("utf-8"))
+
+    def counts(self):
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM urls GROUP BY status").fetchall())
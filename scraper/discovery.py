@@ -0,0 +1,296 @@
+# discovery.py
+
+import asyncio
+import gzip
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse
+
+import aiohttp
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    etree = None
+    LXML_AVAILABLE = False
+
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024  # Límite del protocolo sitemaps (50 MB sin comprimir)
+MAX_SITEMAPS = 50  # Sitemaps (incluidos los de un índice) que se leen como mucho
+MAX_SITEMAP_URLS = 5000  # URLs que se siembran como mucho en la frontera
+SITEMAP_TIMEOUT_S = 60  # Por sitemap: uno de 50 MB no cabe en el timeout de las imágenes
+SITEMAP_CONCURRENCY = 4  # Sitemaps de un índice que se descargan a la vez
+
+# Parámetros de seguimiento que nunca cambian el contenido de la página
+TRACKING_PARAMS = (
+    "gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "igshid", "ref", "ref_src",
+)
+TRACKING_PARAM_PREFIXES = ("utm_",)
+
+# Segmento de idioma al inicio de la ruta: /en/, /en-us/, /es_ES/ ...
+LOCALE_SEGMENT = re.compile(r"^/[a-z]{2}([-_][a-z]{2})?(?=/|$)", re.I)
+
+
+class NormalizationPolicy:
+    """
+    Cómo se reduce una URL a su clave de deduplicación (dos URLs con la misma clave
+    se consideran la misma página y solo se cargan una vez).
+
+    - `keep_query`: si es False (comportamiento anterior del scraper) se ignora la querystring
+      entera; si es True se conserva, ordenada y sin los parámetros de `drop_params`.
+    - `drop_params` / `drop_param_prefixes`: parámetros de tracking que se ignoran.
+    - `strip_trailing_slash`: /hoteles/ y /hoteles son la misma página.
+    - `lowercase_path`: para servidores que no distinguen mayúsculas en la ruta.
+    - `collapse_locales`: /en-us/hoteles y /es-es/hoteles cuentan como la misma página
+      (solo se audita la primera variante que se encuentre).
+    El esquema y el host siempre se pasan a minúsculas y se quitan el fragment y el puerto por defecto.
+    """
+
+    def __init__(self, keep_query=False, drop_params=TRACKING_PARAMS,
+                 drop_param_prefixes=TRACKING_PARAM_PREFIXES, strip_trailing_slash=True,
+                 lowercase_path=False, collapse_locales=False, locale_pattern=LOCALE_SEGMENT):
+        self.keep_query = keep_query
+        self.drop_params = set(drop_params)
+        self.drop_param_prefixes = tuple(drop_param_prefixes)
+        self.strip_trailing_slash = strip_trailing_slash
+        self.lowercase_path = lowercase_path
+        self.collapse_locales = collapse_locales
+        self.locale_pattern = locale_pattern
+
+    def _keep_param(self, name):
+        return name not in self.drop_params and not name.startswith(self.drop_param_prefixes)
+
+    def key(self, url):
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        if (scheme, parsed.port) in (("http", 80), ("https", 443)):
+            netloc = netloc.rsplit(":", 1)[0]
+
+        path = parsed.path or "/"
+        if self.collapse_locales:
+            path = self.locale_pattern.sub("", path) or "/"
+        if self.lowercase_path:
+            path = path.lower()
+        if self.strip_trailing_slash and len(path) > 1:
+            path = path.rstrip("/") or "/"
+
+        key = f"{scheme}://{netloc}{path}"
+        if self.keep_query:
+            params = sorted((name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+                            if self._keep_param(name))
+            if params:
+                key += "?" + urlencode(params)
+        return key
+
+
+DEFAULT_POLICY = NormalizationPolicy()
+
+
+def canonical_url(soup, page_url):
+    """URL absoluta de `<link rel="canonical">` de la página, o None."""
+    for link in soup.find_all("link", href=True):
+        rel = link.get("rel") or []
+        if isinstance(rel, str):
+            rel = rel.split()
+        if "canonical" in [value.lower() for value in rel]:
+            return urljoin(page_url, link["href"].strip())
+    return None
+
+
+async def fetch_bytes(session, url, max_bytes=MAX_SITEMAP_BYTES):
+    """GET con aiohttp. Devuelve el cuerpo (descomprimido si es .gz) o None si falla."""
+    try:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return None
+            body = await response.content.read(max_bytes + 1)
+            if len(body) > max_bytes:
+                print(f"⚠️ {url} supera {max_bytes} bytes. Omitido.")
+                return None
+    except Exception as e:
+        print(f"⚠️ No se pudo descargar {url}: {e}")
+        return None
+
+    if body[:2] == b"\x1f\x8b":  # sitemap.xml.gz
+        try:
+            body = gzip.decompress(body)
+        except OSError as e:
+            print(f"⚠️ {url} no es un gzip válido: {e}")
+            return None
+        if len(body) > max_bytes:
+            print(f"⚠️ {url} supera {max_bytes} bytes descomprimido. Omitido.")
+            return None
+    return body
+
+
+def robots_url(start_url):
+    parsed = urlparse(start_url)
+    return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+
+
+async def fetch_robots_txt(session, start_url):
+    """Texto de robots.txt del host de `start_url` ("" si no existe)."""
+    body = await fetch_bytes(session, robots_url(start_url), max_bytes=512 * 1024)
+    return body.decode("utf-8", errors="replace") if body else ""
+
+
+def sitemaps_from_robots(robots_txt):
+    """URLs de las líneas `Sitemap:` de robots.txt."""
+    sitemaps = []
+    for line in robots_txt.splitlines():
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "sitemap" and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+
+def _parse_xml(body):
+    """
+    Raíz del XML de un sitemap (contenido no confiable) o None si no es válido.
+    Con lxml no se expanden entidades ni se accede a la red (XXE, "billion laughs");
+    sin lxml se rechaza cualquier DTD, que un sitemap nunca necesita.
+    """
+    if LXML_AVAILABLE:
+        parser = etree.XMLParser(resolve_entities=False, no_network=True, load_dtd=False, huge_tree=False)
+        try:
+            return etree.fromstring(body, parser)
+        except etree.XMLSyntaxError:
+            return None
+    if b"<!DOCTYPE" in body:
+        return None
+    try:
+        return ET.fromstring(body)
+    except ET.ParseError:
+        return None
+
+
+def parse_sitemap(body):
+    """
+    Interpreta un sitemap XML.
+    :return: ("index", [urls de sitemaps]) para un <sitemapindex>,
+             ("urlset", [urls de páginas]) para un <urlset>, o (None, []) si no es válido.
+    """
+    root = _parse_xml(body)
+    if root is None:
+        return None, []
+
+    kind = root.tag.rsplit("}", 1)[-1].lower()  # Sin el namespace
+    if kind == "sitemapindex":
+        kind = "index"
+    elif kind != "urlset":
+        return None, []
+
+    locations = [
+        element.text.strip() for element in root.iter()
+        if isinstance(element.tag, str) and element.tag.rsplit("}", 1)[-1] == "loc" and element.text
+    ]
+    return kind, locations
+
+
+async def discover_sitemap_urls(session, start_url, max_urls=MAX_SITEMAP_URLS, max_sitemaps=MAX_SITEMAPS, robots_txt=None):
+    """
+    URLs de página declaradas en los sitemaps del sitio: los de robots.txt o, si no hay,
+    /sitemap.xml. Sigue los índices de sitemaps (sin repetir ninguno) y acepta .gz.
+    Solo devuelve URLs dentro de `start_url`.
+
+    `session` solo se usa para robots.txt. Los sitemaps van por una sesión propia con
+    timeout por sitemap (SITEMAP_TIMEOUT_S) y se descargan por niveles del índice, hasta
+    SITEMAP_CONCURRENCY a la vez; el orden de las URLs es el de los sitemaps.
+    """
+    if robots_txt is None:
+        robots_txt = await fetch_robots_txt(session, start_url)
+    pending = sitemaps_from_robots(robots_txt) or [urljoin(start_url, "/sitemap.xml")]
+
+    seen_sitemaps = set()
+    page_urls = []
+    semaphore = asyncio.Semaphore(SITEMAP_CONCURRENCY)
+    timeout = aiohttp.ClientTimeout(total=SITEMAP_TIMEOUT_S)
+
+    async with aiohttp.ClientSession(timeout=timeout) as sitemap_session:
+        async def fetch_sitemap(sitemap_url):
+            async with semaphore:
+                return await fetch_bytes(sitemap_session, sitemap_url)
+
+        while pending and len(page_urls) < max_urls:
+            batch = []
+            for sitemap_url in pending:
+                if sitemap_url not in seen_sitemaps and len(seen_sitemaps) < max_sitemaps:
+                    seen_sitemaps.add(sitemap_url)
+                    batch.append(sitemap_url)
+            pending = []
+
+            for body in await asyncio.gather(*(fetch_sitemap(sitemap_url) for sitemap_url in batch)):
+                if body is None:
+                    continue
+                kind, locations = parse_sitemap(body)
+                if kind == "index":
+                    pending.extend(locations)
+                elif kind == "urlset":
+                    page_urls.extend(url for url in locations if url.startswith(start_url))
+
+    return page_urls[:max_urls]
+
+
+class UrlDiscovery:
+    """
+    Descubrimiento y deduplicación de URLs para el crawler.
+
+    - Siembra la frontera con las URLs de los sitemaps (robots.txt / sitemap.xml, índices incluidos).
+    - Deduplica con una `NormalizationPolicy` configurable y con `<link rel="canonical">`:
+      una vez cargada una página, su URL canónica cuenta como vista.
+    - Cuenta las cargas evitadas para el resumen final.
+    """
+
+    def __init__(self, policy=DEFAULT_POLICY, use_sitemaps=True, max_sitemap_urls=MAX_SITEMAP_URLS):
+        self.policy = policy
+        self.use_sitemaps = use_sitemaps
+        self.max_sitemap_urls = max_sitemap_urls
+        self.stats = {
+            "sitemap_urls": 0,  # URLs sembradas desde los sitemaps
+            "duplicate_urls": 0,  # Variantes (slash, tracking, locale...) de una URL ya vista
+            "canonical_skipped": 0,  # URLs no cargadas porque su página canónica ya se cargó
+            "canonical_duplicates": 0  # Páginas cargadas y descartadas: su canónica ya estaba auditada
+        }
+        self._seen_urls = set()
+        self._canonical_keys = set()  # Claves vistas solo por ser la canónica de otra página
+
+    def key(self, url):
+        return self.policy.key(url)
+
+    def mark_seen(self, url):
+        self._seen_urls.add(url)
+
+    def add_canonical(self, key):
+        self._canonical_keys.add(key)
+
+    def count_rejected(self, url, key):
+        """Anota una URL descartada por tener la misma clave que otra ya vista o cargada."""
+        if url in self._seen_urls:
+            return  # La misma URL exacta: el filtro anterior ya la habría descartado
+        self._seen_urls.add(url)
+        if key in self._canonical_keys:
+            self.stats["canonical_skipped"] += 1
+        else:
+            self.stats["duplicate_urls"] += 1
+
+    async def seed_urls(self, session, start_url, robots_txt=None):
+        """URLs de los sitemaps para sembrar la frontera (vacío si `use_sitemaps` es False)."""
+        if not self.use_sitemaps:
+            return []
+        urls = await discover_sitemap_urls(session, start_url, max_urls=self.max_sitemap_urls, robots_txt=robots_txt)
+        self.stats["sitemap_urls"] = len(urls)
+        return urls
+
+    def avoided_fetches(self):
+        return self.stats["duplicate_urls"] + self.stats["canonical_skipped"]
+
+    def print_summary(self):
+        stats = self.stats
+        print(
+            f"🧭 Descubrimiento: {stats['sitemap_urls']} URLs de sitemaps, "
+            f"{self.avoided_fetches()} cargas evitadas ({stats['duplicate_urls']} variantes, "
+            f"{stats['canonical_skipped']} por canonical), "
+            f"{stats['canonical_duplicates']} páginas duplicadas descartadas"
+        )
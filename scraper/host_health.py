@@ -0,0 +1,166 @@
+# host_health.py
+
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+LATENCY_WINDOW = 50  # Últimas cargas por host con las que se calculan los percentiles
+MIN_SAMPLES = 8  # Cargas necesarias antes de fiarse de los percentiles
+OPEN_P95 = 30.0  # Segundos: con un p95 peor el circuito del host se abre
+FAILURE_THRESHOLD = 3  # Fallos seguidos que abren el circuito
+OPEN_SECONDS = 30.0  # Tiempo abierto la primera vez (se duplica si la prueba vuelve a fallar)
+MAX_OPEN_SECONDS = 300.0
+MAX_OPENINGS = 5  # Aperturas seguidas tras las que el host se da por caído
+
+HEDGE_PERCENTILE = 0.9  # Percentil de latencia tras el que se lanza la navegación de cobertura (si se activa)
+HEDGE_MIN_DELAY = 1.0
+MIN_NAVIGATION_TIMEOUT = 15.0  # Segundos: el timeout aprendido nunca baja de aquí
+TIMEOUT_FACTOR = 3  # Timeout aprendido = p99 * TIMEOUT_FACTOR (como mucho el de por defecto)
+
+
+def percentile(values, fraction):
+    """Percentil `fraction` (0-1) de `values` por el método del rango más cercano."""
+    ordered = sorted(values)
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index]
+
+
+class _HostCircuit:
+    def __init__(self):
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # Solo cargas correctas
+        self.failures = 0  # Fallos seguidos
+        self.state = "closed"  # "closed", "open" o "half_open"
+        self.open_until = 0.0
+        self.openings = 0  # Aperturas seguidas sin una carga correcta entre medias
+        self.probing = False  # En "half_open": ya hay una carga de prueba en curso
+        self.probe_started = 0.0
+
+
+class HostHealth:
+    """
+    Salud de cada host (latencia y fallos), compartida por el scraper y axe.
+
+    - Circuit breaker: si el p95 de latencia supera `open_p95` o hay `failure_threshold`
+      fallos seguidos, el circuito del host se abre durante `open_seconds` (el doble en
+      cada apertura seguida). Mientras está abierto `allow` devuelve False y las URLs se
+      aparcan (`retry_after` dice cuánto esperar) en vez de ocupar una pestaña. Pasado ese
+      tiempo se deja pasar UNA carga de prueba: si va bien se cierra, si no se vuelve a abrir.
+      Tras `max_openings` aperturas seguidas el host se da por caído (`is_down`).
+    - Navegación de cobertura (hedging): `hedge_delay` es el percentil `hedge_percentile`
+      de la latencia del host; si una carga lo supera se lanza otra en paralelo y gana la
+      primera que termine. Desactivado por defecto (None); HEDGE_PERCENTILE es el valor habitual.
+    - `navigation_timeout`: timeout de goto aprendido (p99 * TIMEOUT_FACTOR), para no
+      esperar siempre el máximo en hosts que responden en pocos segundos.
+    """
+
+    def __init__(self, open_p95=OPEN_P95, failure_threshold=FAILURE_THRESHOLD, open_seconds=OPEN_SECONDS,
+                 max_openings=MAX_OPENINGS, hedge_percentile=None, min_samples=MIN_SAMPLES):
+        self.open_p95 = open_p95
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_openings = max_openings
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+
+        self._hosts = {}
+        self.stats = {"opened": 0, "parked": 0, "hedged": 0, "hedge_wins": 0}
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostCircuit()
+        return self._hosts[host]
+
+    def _open(self, url, circuit, reason):
+        circuit.openings += 1
+        circuit.state = "open"
+        circuit.probing = False
+        duration = min(self.open_seconds * 2 ** (circuit.openings - 1), MAX_OPEN_SECONDS)
+        circuit.open_until = time.monotonic() + duration
+        self.stats["opened"] += 1
+        print(f"⛔ Circuito abierto para {urlparse(url).netloc} durante {duration:.0f} s ({reason})")
+
+    def allow(self, url):
+        """True si se puede cargar `url` ahora (circuito cerrado, o la carga de prueba)."""
+        circuit = self._host(url)
+        if circuit.state == "open" and time.monotonic() >= circuit.open_until:
+            circuit.state = "half_open"
+        if circuit.state == "closed":
+            return True
+        if circuit.state == "half_open":
+            # Una prueba que nunca informó (error ajeno a la carga) no bloquea el host para siempre
+            now = time.monotonic()
+            if not circuit.probing or now - circuit.probe_started > MAX_OPEN_SECONDS:
+                circuit.probing = True
+                circuit.probe_started = now
+                return True
+        return False
+
+    def retry_after(self, url):
+        """Segundos hasta que el circuito del host deje pasar otra carga."""
+        circuit = self._host(url)
+        return max(circuit.open_until - time.monotonic(), 1.0)
+
+    def is_down(self, url):
+        return self._host(url).openings >= self.max_openings
+
+    def park(self, url):
+        """Cuenta una URL aparcada y devuelve cuánto debe esperar."""
+        self.stats["parked"] += 1
+        return self.retry_after(url)
+
+    def record_success(self, url, latency):
+        circuit = self._host(url)
+        circuit.latencies.append(latency)
+        circuit.failures = 0
+        if circuit.state == "half_open":
+            circuit.state = "closed"
+            circuit.probing = False
+            # Ventana nueva: las latencias degradadas no deben reabrirlo enseguida
+            circuit.latencies = deque([latency], maxlen=LATENCY_WINDOW)
+        if circuit.state != "closed":
+            return  # Carga que empezó antes de abrirse el circuito
+        circuit.openings = 0
+
+        if len(circuit.latencies) >= self.min_samples:
+            p95 = percentile(circuit.latencies, 0.95)
+            if p95 > self.open_p95:
+                self._open(url, circuit, f"p95 de {p95:.1f} s")
+                circuit.latencies.clear()
+
+    def record_failure(self, url):
+        circuit = self._host(url)
+        circuit.failures += 1
+        if circuit.state == "half_open":
+            self._open(url, circuit, "la carga de prueba falló")
+        elif circuit.state == "closed" and circuit.failures >= self.failure_threshold:
+            self._open(url, circuit, f"{circuit.failures} fallos seguidos")
+
+    def hedge_delay(self, url):
+        """Segundos tras los que lanzar la navegación de cobertura, o None (sin datos o desactivado)."""
+        circuit = self._host(url)
+        if self.hedge_percentile is None or len(circuit.latencies) < self.min_samples:
+            return None
+        return max(percentile(circuit.latencies, self.hedge_percentile), HEDGE_MIN_DELAY)
+
+    def navigation_timeout(self, url, default_ms):
+        """Timeout de goto en ms: el aprendido del host, como mucho `default_ms`."""
+        circuit = self._host(url)
+        if len(circuit.latencies) < self.min_samples:
+            return default_ms
+        learned = max(percentile(circuit.latencies, 0.99) * TIMEOUT_FACTOR, MIN_NAVIGATION_TIMEOUT)
+        return int(min(learned * 1000, default_ms))
+
+    def print_summary(self):
+        stats = self.stats
+        if not self._hosts:
+            return
+        p95s = ", ".join(
+            f"{host} p95 {percentile(circuit.latencies, 0.95):.1f} s"
+            for host, circuit in self._hosts.items() if circuit.latencies
+        )
+        print(
+            f"🩺 Salud de hosts: {stats['opened']} aperturas de circuito, {stats['parked']} URLs aparcadas, "
+            f"{stats['hedged']} navegaciones de cobertura ({stats['hedge_wins']} ganaron)"
+            + (f"; {p95s}" if p95s else "")
+        )
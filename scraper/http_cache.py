@@ -0,0 +1,192 @@
+# http_cache.py
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+
+CACHE_FOLDER = ".http_cache"
+MAX_CACHE_BYTES = 500 * 1024 * 1024  # 500 MB
+
+
+class HttpCache:
+    """
+    Caché HTTP en disco, persistente entre ejecuciones, para el HTML de las páginas
+    y las imágenes.
+
+    - Clave: URL normalizada (la misma que `visited_urls` / el manifest de imágenes).
+    - Guarda el cuerpo y sus validadores (ETag / Last-Modified). En la siguiente
+      ejecución se revalida con una petición condicional: si el servidor responde 304
+      se reutiliza el cuerpo guardado sin volver a descargarlo ni renderizarlo.
+    - Tamaño acotado (`max_bytes`): se expulsan las entradas usadas hace más tiempo (LRU).
+
+    Índice en SQLite (`index.sqlite`) y cuerpos como archivos sueltos (sha256 de la URL).
+    """
+
+    def __init__(self, folder=CACHE_FOLDER, max_bytes=MAX_CACHE_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+        self._db = sqlite3.connect(os.path.join(folder, "index.sqlite"))
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                body_file TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_type TEXT,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)")
+        self._db.commit()
+
+        self.stats = {"revalidated": 0, "changed": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def close(self):
+        self._db.close()
+
+    def _body_path(self, body_file):
+        return os.path.join(self.folder, body_file)
+
+    def get(self, url):
+        """Entrada guardada para `url` (dict) o None. Comprueba que el cuerpo siga en disco."""
+        row = self._db.execute(
+            "SELECT url, body_file, size, etag, last_modified, content_type FROM entries WHERE url = ?",
+            (url,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        entry = dict(zip(("url", "body_file", "size", "etag", "last_modified", "content_type"), row))
+        if not os.path.isfile(self._body_path(entry["body_file"])):
+            self.delete(url)
+            return None
+        return entry
+
+    def read_body(self, entry):
+        """Cuerpo guardado (bytes) de una entrada, marcándola como usada recientemente."""
+        self._db.execute("UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), entry["url"]))
+        self._db.commit()
+        with open(self._body_path(entry["body_file"]), "rb") as f:
+            return f.read()
+
+    def conditional_headers(self, entry):
+        """Cabeceras If-None-Match / If-Modified-Since para revalidar `entry`."""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, body, etag=None, last_modified=None, content_type=None):
+        """
+        Guarda (o reemplaza) el cuerpo de `url` con sus validadores.
+        Sin ETag ni Last-Modified no se puede revalidar, así que no se guarda.
+        """
+        if not etag and not last_modified:
+            return False
+        if len(body) > self.max_bytes:
+            return False
+
+        body_file = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, self._body_path(body_file))
+
+        now = time.time()
+        self._db.execute(
+            """
+            INSERT OR REPLACE INTO entries
+                (url, body_file, size, etag, last_modified, content_type, stored_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, body_file, len(body), etag, last_modified, content_type, now, now)
+        )
+        self._db.commit()
+        self.stats["stored"] += 1
+
+        self._evict()
+        return True
+
+    def delete(self, url):
+        row = self._db.execute("SELECT body_file FROM entries WHERE url = ?", (url,)).fetchone()
+        self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+        self._db.commit()
+        if row:
+            try:
+                os.remove(self._body_path(row[0]))
+            except OSError:
+                pass
+
+    def total_size(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """Expulsa las entradas menos usadas recientemente hasta caber en `max_bytes`."""
+        total = self.total_size()
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute("SELECT url, size FROM entries ORDER BY last_access ASC").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.delete(url)
+            total -= size
+            self.stats["evicted"] += 1
+
+    async def fetch(self, session, url, key=None, headers=None, store=True):
+        """
+        GET condicional con aiohttp.
+
+        :param session: `aiohttp.ClientSession` compartida.
+        :param key: clave de la caché (por defecto la propia URL).
+        :param store: si es False, un 200 no se guarda (el llamador guardará otra versión,
+                      p. ej. el HTML renderizado por el navegador).
+        :return: (status, body, response_headers). En un 304 devuelve status 304 con el
+                 cuerpo guardado; en un 200 guarda el nuevo cuerpo si trae validadores.
+                 Ante un error de red devuelve (None, None, {}).
+        """
+        key = key or url
+        entry = self.get(key)
+        request_headers = dict(headers or {})
+        request_headers.update(self.conditional_headers(entry))
+
+        try:
+            async with session.get(url, headers=request_headers) as response:
+                if response.status == 304 and entry is not None:
+                    self.stats["revalidated"] += 1
+                    return 304, self.read_body(entry), dict(response.headers)
+
+                body = await response.read()
+                if response.status == 200:
+                    self.stats["changed" if entry else "misses"] += 1
+                if response.status == 200 and store:
+                    self.put(
+                        key,
+                        body,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                        content_type=response.headers.get("Content-Type")
+                    )
+                return response.status, body, dict(response.headers)
+        except Exception as e:
+            print(f"⚠️ Error en la petición condicional a {url}: {e}")
+            return None, None, {}
+
+    def print_summary(self):
+        stats = self.stats
+        print(
+            f"🗄️ Caché HTTP: {stats['revalidated']} revalidadas (304), {stats['changed']} cambiadas, "
+            f"{stats['misses']} nuevas, {stats['evicted']} expulsadas, "
+            f"{self.total_size() / (1024 * 1024):.1f} MB en disco"
+        )
@@ -0,0 +1,190 @@
+# image_downloader.py
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import tempfile
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+from scraper.image_manifest import IMAGES_FOLDER, load_manifest, save_manifest
+
+MAX_CONCURRENT_DOWNLOADS = 8
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # Imágenes más grandes se descartan (10 MB)
+DOWNLOAD_TIMEOUT = 10  # Segundos por imagen
+ALLOWED_CONTENT_TYPE_PREFIX = "image/"
+
+
+class ImageDownloader:
+    """
+    Descargador asíncrono de imágenes para el scraper.
+
+    - Una sola sesión aiohttp (conexiones reutilizadas) y como mucho
+      `max_concurrent` descargas a la vez.
+    - Descarta respuestas que no sean `image/*` o que superen `max_bytes`.
+    - Guarda cada imagen con el hash SHA-256 de su contenido como nombre: dos imágenes
+      distintas con el mismo nombre ya no se pisan, y una misma imagen se guarda una vez.
+    - Mantiene un manifest {url_absoluta: ruta_local} (ver image_manifest.py) que usan
+      los testers de OCR para encontrar el archivo correcto. Se guarda tras cada página
+      con imágenes nuevas: los testers corren durante el crawl y lo leen del disco.
+    """
+
+    def __init__(self, images_folder=IMAGES_FOLDER, max_concurrent=MAX_CONCURRENT_DOWNLOADS,
+                 max_bytes=MAX_IMAGE_BYTES, timeout=DOWNLOAD_TIMEOUT, http_cache=None):
+        self.images_folder = images_folder
+        self.max_concurrent = max_concurrent
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+
+        self.http_cache = http_cache  # HttpCache opcional: revalidación con ETag/Last-Modified
+        self.manifest = dict(load_manifest(images_folder))
+        self._downloaded = {}  # url -> ruta local, solo de esta ejecución
+        self._manifest_dirty = False  # Hay entradas del manifest sin guardar
+        self.session = None
+        self._semaphore = None
+        self._in_progress = {}  # url -> Future (la misma URL se descarga una sola vez)
+
+        self.stats = {"downloaded": 0, "reused": 0, "revalidated": 0, "rejected": 0, "failed": 0}
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        os.makedirs(self.images_folder, exist_ok=True)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    async def close(self):
+        """Cierra la sesión y guarda el manifest."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.save_manifest()
+
+    def save_manifest(self):
+        """Guarda el manifest si tiene entradas nuevas."""
+        if self._manifest_dirty:
+            save_manifest(self.manifest, self.images_folder)
+            self._manifest_dirty = False
+
+    def _extension(self, content_type, image_url):
+        extension = mimetypes.guess_extension(content_type) if content_type else None
+        if not extension:
+            extension = os.path.splitext(urlparse(image_url).path)[1]
+        return extension or ".img"
+
+    def _store(self, data, content_type, image_url):
+        """Guarda el contenido bajo su hash (si no existía ya) y devuelve la ruta."""
+        digest = hashlib.sha256(data).hexdigest()
+        local_path = os.path.join(self.images_folder, digest + self._extension(content_type, image_url))
+        if os.path.isfile(local_path):
+            self.stats["reused"] += 1
+            return local_path
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.images_folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, local_path)
+        self.stats["downloaded"] += 1
+        return local_path
+
+    async def _fetch(self, image_url):
+        """Descarga una imagen respetando tipo y tamaño. Devuelve la ruta local o None."""
+        cache_entry = self.http_cache.get(image_url) if self.http_cache else None
+        headers = self.http_cache.conditional_headers(cache_entry) if self.http_cache else {}
+
+        async with self._semaphore:
+            try:
+                async with self.session.get(image_url, headers=headers) as response:
+                    # Sin cambios desde la última ejecución: reutilizamos el cuerpo de la caché
+                    if response.status == 304 and cache_entry is not None:
+                        self.stats["revalidated"] += 1
+                        self.http_cache.stats["revalidated"] += 1
+                        data = self.http_cache.read_body(cache_entry)
+                        return self._store(data, cache_entry["content_type"] or "", image_url)
+
+                    if response.status != 200:
+                        self.stats["failed"] += 1
+                        return None
+
+                    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                    if not content_type.startswith(ALLOWED_CONTENT_TYPE_PREFIX):
+                        self.stats["rejected"] += 1
+                        return None
+
+                    if response.content_length and response.content_length > self.max_bytes:
+                        self.stats["rejected"] += 1
+                        return None
+
+                    chunks = []
+                    total = 0
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        total += len(chunk)
+                        if total > self.max_bytes:
+                            self.stats["rejected"] += 1
+                            return None
+                        chunks.append(chunk)
+
+                    validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+            except Exception as e:
+                print(f"⚠️ Error descargando {image_url}: {e}")
+                self.stats["failed"] += 1
+                return None
+
+        data = b"".join(chunks)
+        if self.http_cache:
+            self.http_cache.stats["changed" if cache_entry else "misses"] += 1
+            self.http_cache.put(image_url, data, etag=validators[0], last_modified=validators[1], content_type=content_type)
+        return self._store(data, content_type, image_url)
+
+    async def download(self, image_url):
+        """Ruta local de `image_url`, descargándola si hace falta (una vez por URL y ejecución)."""
+        local_path = self._downloaded.get(image_url)
+        if local_path and os.path.isfile(local_path):
+            self.stats["reused"] += 1
+            return local_path
+
+        if image_url not in self._in_progress:
+            self._in_progress[image_url] = asyncio.ensure_future(self._fetch(image_url))
+        try:
+            local_path = await self._in_progress[image_url]
+        finally:
+            self._in_progress.pop(image_url, None)
+
+        if local_path:
+            self._downloaded[image_url] = local_path
+            if self.manifest.get(image_url) != local_path:
+                self.manifest[image_url] = local_path
+                self._manifest_dirty = True
+        return local_path
+
+    async def download_page_images(self, soup, base_url):
+        """
+        Descarga en paralelo las <img> de la página.
+        Retorna la lista de rutas locales (sin duplicados, en el orden de la página).
+        """
+        image_urls = []
+        for img in soup.find_all("img"):
+            src = img.get("src")
+            if not src or src.startswith("data:"):
+                continue
+            # Resolver URL relativa con respecto a la página base
+            image_url = urljoin(base_url, src)
+            if image_url not in image_urls:
+                image_urls.append(image_url)
+
+        local_paths = await asyncio.gather(*(self.download(image_url) for image_url in image_urls))
+        # Antes de devolver la página: sus testers pueden empezar ya y buscarán aquí las imágenes
+        self.save_manifest()
+        return [local_path for local_path in dict.fromkeys(local_paths) if local_path]
@@ -0,0 +1,78 @@
+# image_manifest.py
+
+import json
+import os
+import tempfile
+from urllib.parse import urljoin
+
+IMAGES_FOLDER = "downloaded_images"
+MANIFEST_FILE_NAME = "manifest.json"
+
+# Caché por proceso: {ruta_del_manifest: ((mtime_ns, tamaño), datos)}
+_loaded_manifests = {}
+
+
+def manifest_path(images_folder=IMAGES_FOLDER):
+    return os.path.join(images_folder, MANIFEST_FILE_NAME)
+
+
+def load_manifest(images_folder=IMAGES_FOLDER):
+    """
+    Devuelve el manifest {url_absoluta_de_la_imagen: ruta_local}.
+    Se lee una vez por proceso y se vuelve a leer solo si el archivo cambió.
+    """
+    path = manifest_path(images_folder)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    # El scraper lo reescribe tras cada página: mtime en ns y tamaño para no perder cambios seguidos
+    version = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _loaded_manifests.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        data = {}
+
+    _loaded_manifests[path] = (version, data)
+    return data
+
+
+def save_manifest(entries, images_folder=IMAGES_FOLDER):
+    """Guarda el manifest de forma atómica (los testers pueden estar leyéndolo)."""
+    os.makedirs(images_folder, exist_ok=True)
+    path = manifest_path(images_folder)
+    fd, tmp_path = tempfile.mkstemp(dir=images_folder, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def resolve_image_path(src, page_url=None, images_folder=IMAGES_FOLDER):
+    """
+    Ruta local de la imagen `src` de la página `page_url`, o None si no se descargó.
+
+    1) Busca en el manifest la URL absoluta (src resuelto contra page_url) y el src tal cual.
+    2) Si no está (p. ej. HTML local analizado sin crawl), cae al nombre de archivo
+       en `images_folder` (comportamiento anterior).
+    """
+    if not src:
+        return None
+
+    manifest = load_manifest(images_folder)
+    if manifest:
+        candidates = [urljoin(page_url, src), src] if page_url else [src]
+        for candidate in candidates:
+            local_path = manifest.get(candidate)
+            if local_path and os.path.isfile(local_path):
+                return local_path
+
+    local_path = os.path.join(images_folder, os.path.basename(src))
+    if os.path.isfile(local_path):
+        return local_path
+    return None
@@ -0,0 +1,208 @@
+# rate_limiter.py
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from scraper.discovery import fetch_robots_txt
+
+THROTTLE_STATUSES = (429, 503)  # El servidor pide que bajemos el ritmo
+
+MIN_DELAY = 0.0  # Pausa mínima entre cargas del mismo host (si robots.txt no pide otra)
+MAX_DELAY = 60.0  # Tope de la pausa entre cargas tras respuestas 429/503
+SLOW_LATENCY = 15.0  # Segundos (media móvil) a partir de los que el host se considera saturado
+LATENCY_SMOOTHING = 0.3  # Peso de la última medida en la media móvil de latencia
+
+RETRY_BASE_DELAY = 2.0  # Primer reintento diferido (luego se duplica)
+RETRY_MAX_DELAY = 120.0
+
+
+def parse_retry_after(value):
+    """Segundos de la cabecera Retry-After (número o fecha HTTP), o None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_crawl_delay(robots_txt, user_agent="*"):
+    """
+    Crawl-delay (segundos) del grupo de `user_agent` en robots.txt, o del grupo "*".
+    urllib.robotparser solo acepta enteros; aquí también valen decimales ("0.5").
+    """
+    delays = {}
+    agents, in_rules = [], False
+    for line in robots_txt.splitlines():
+        name, _, value = line.split("#", 1)[0].partition(":")
+        name, value = name.strip().lower(), value.strip()
+        if name == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+        elif name:
+            in_rules = True
+            if name == "crawl-delay":
+                try:
+                    delay = float(value)
+                except ValueError:
+                    continue
+                for agent in agents:
+                    delays.setdefault(agent, delay)
+    return delays.get(user_agent.lower(), delays.get("*"))
+
+
+class _HostState:
+    def __init__(self, max_concurrency, min_delay):
+        self.limit = max_concurrency  # Cargas simultáneas permitidas ahora (se adapta)
+        self.in_flight = 0
+        self.crawl_delay = min_delay  # Crawl-delay de robots.txt (o MIN_DELAY)
+        self.delay = min_delay  # Pausa actual entre cargas (>= crawl_delay)
+        self.next_start = 0.0  # Momento (monotonic) a partir del que puede empezar otra carga
+        self.latency = None  # Media móvil de la latencia de carga
+        self.successes = 0  # Cargas correctas desde el último ajuste al alza
+        self.robots = None  # RobotFileParser (None: sin robots.txt o no se respeta)
+        self.robots_txt = None
+        self.condition = asyncio.Condition()
+        self.robots_lock = asyncio.Lock()
+
+
+class RateLimiter:
+    """
+    Ritmo de carga por host para el crawler.
+
+    - robots.txt: se lee una vez por host; las URLs prohibidas no se cargan (`allowed`)
+      y su Crawl-delay es la pausa mínima entre dos cargas del host.
+    - Concurrencia adaptativa (AIMD): cada host empieza con `max_concurrency` cargas a la
+      vez; una respuesta 429/503 la reduce a la mitad y duplica la pausa entre cargas
+      (o usa Retry-After), un error de carga solo la reduce a la mitad y, si la latencia
+      media supera `slow_latency`, baja de uno en uno. Con cargas correctas y rápidas se recupera poco a poco.
+    - `retry_delay`: espera con backoff exponencial (y jitter) para los reintentos, que el
+      scraper devuelve a la frontera en vez de repetirlos en el momento.
+    """
+
+    def __init__(self, max_concurrency=2, respect_robots=True, user_agent="*",
+                 min_delay=MIN_DELAY, max_delay=MAX_DELAY, slow_latency=SLOW_LATENCY):
+        self.max_concurrency = max_concurrency
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.slow_latency = slow_latency
+
+        self._hosts = {}
+        self.stats = {"throttled": 0, "errors": 0, "retries": 0, "robots_blocked": 0, "waited_seconds": 0.0}
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.max_concurrency, self.min_delay)
+        return self._hosts[host]
+
+    async def robots_txt(self, session, url):
+        """Texto de robots.txt del host de `url` (se descarga una sola vez)."""
+        state = self._host(url)
+        async with state.robots_lock:
+            if state.robots_txt is None:
+                state.robots_txt = await fetch_robots_txt(session, url)
+                if self.respect_robots and state.robots_txt:
+                    state.robots = RobotFileParser()
+                    state.robots.parse(state.robots_txt.splitlines())
+                    crawl_delay = parse_crawl_delay(state.robots_txt, self.user_agent)
+                    if crawl_delay:
+                        state.crawl_delay = max(float(crawl_delay), self.min_delay)
+                        state.delay = max(state.delay, state.crawl_delay)
+                        print(f"🤖 {urlparse(url).netloc}: Crawl-delay de {state.crawl_delay:g} s (robots.txt)")
+        return state.robots_txt
+
+    async def allowed(self, session, url):
+        """False si robots.txt prohíbe cargar `url`."""
+        await self.robots_txt(session, url)
+        state = self._host(url)
+        if state.robots is None or state.robots.can_fetch(self.user_agent, url):
+            return True
+        self.stats["robots_blocked"] += 1
+        return False
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """Plaza para cargar `url`: respeta la concurrencia actual y la pausa del host."""
+        state = self._host(url)
+        async with state.condition:
+            await state.condition.wait_for(lambda: state.in_flight < state.limit)
+            state.in_flight += 1
+            now = time.monotonic()
+            wait = state.next_start - now
+            state.next_start = max(now, state.next_start) + state.delay
+
+        try:
+            if wait > 0:
+                self.stats["waited_seconds"] += wait
+                await asyncio.sleep(wait)
+            yield
+        finally:
+            async with state.condition:
+                state.in_flight -= 1
+                state.condition.notify_all()
+
+    def record(self, url, latency, status=None, retry_after=None, error=False):
+        """Ajusta el ritmo del host con el resultado de una carga."""
+        state = self._host(url)
+
+        if error or status in THROTTLE_STATUSES:
+            self.stats["errors" if error else "throttled"] += 1
+            state.limit = max(1, state.limit // 2)
+            state.successes = 0
+            if not error:
+                backoff = max(state.delay * 2, 1.0, parse_retry_after(retry_after) or 0.0)
+                state.delay = min(backoff, self.max_delay)
+                state.next_start = time.monotonic() + state.delay
+                print(
+                    f"🐢 {urlparse(url).netloc} respondió {status}: {state.limit} cargas a la vez, "
+                    f"{state.delay:.1f} s entre cargas"
+                )
+            return
+
+        if state.latency is None:
+            state.latency = latency
+        else:
+            state.latency += LATENCY_SMOOTHING * (latency - state.latency)
+
+        if state.latency > self.slow_latency:
+            state.limit = max(1, state.limit - 1)
+            state.successes = 0
+            return
+
+        # Recuperación lenta: la pausa vuelve hacia el Crawl-delay y, tras `limit`
+        # cargas correctas seguidas, se permite una carga simultánea más
+        state.delay = max(state.crawl_delay, state.delay * 0.9)
+        state.successes += 1
+        if state.successes >= state.limit and state.limit < self.max_concurrency:
+            state.limit += 1
+            state.successes = 0
+
+    def retry_delay(self, url, attempt):
+        """Segundos hasta el reintento número `attempt + 1` (backoff exponencial con jitter)."""
+        self.stats["retries"] += 1
+        backoff = min(RETRY_BASE_DELAY * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+        return max(backoff * random.uniform(1.0, 1.5), self._host(url).delay)
+
+    def print_summary(self):
+        stats = self.stats
+        limits = ", ".join(
+            f"{host} {state.limit}x/{state.delay:.1f} s" for host, state in self._hosts.items()
+            if state.robots_txt is not None or state.latency is not None
+        )
+        print(
+            f"🚦 Ritmo por host: {stats['throttled']} respuestas 429/503, {stats['errors']} errores, "
+            f"{stats['retries']} reintentos diferidos, {stats['robots_blocked']} URLs prohibidas por robots.txt, "
+            f"{stats['waited_seconds']:.1f} s de pausas ({limits or 'sin cargas'})"
+        )
@@ -0,0 +1,168 @@
+# resource_policy.py
+
+import asyncio
+import re
+
+# Tipos de recurso de Chromium (request.resourceType):
+# document, stylesheet, image, media, font, script, texttrack, xhr, fetch,
+# eventsource, websocket, manifest, other
+
+# Dominios de analítica / publicidad / tracking que nunca aportan nada a la auditoría
+TRACKER_PATTERNS = (
+    r"googletagmanager\.com",
+    r"google-analytics\.com",
+    r"doubleclick\.net",
+    r"googlesyndication\.com",
+    r"facebook\.(net|com)/tr",
+    r"connect\.facebook\.net",
+    r"hotjar\.com",
+    r"clarity\.ms",
+    r"bat\.bing\.com",
+    r"criteo\.(com|net)",
+    r"taboola\.com",
+    r"outbrain\.com",
+    r"tiktok\.com/i18n/pixel",
+    r"/pixel(\.gif)?(\?|$)",
+)
+
+
+class ResourcePolicy:
+    """
+    Qué peticiones bloquear durante la carga de una página.
+
+    - `blocked_types`: tipos de recurso que se bloquean siempre.
+    - `denylist`: patrones (regex) de URL que se bloquean.
+    - `allowlist`: patrones de URL que NUNCA se bloquean (ganan a lo anterior).
+    El documento principal no se bloquea nunca.
+    """
+
+    def __init__(self, name, blocked_types=(), denylist=(), allowlist=()):
+        self.name = name
+        self.blocked_types = set(blocked_types)
+        self.denylist = [re.compile(pattern, re.I) for pattern in denylist]
+        self.allowlist = [re.compile(pattern, re.I) for pattern in allowlist]
+
+    def should_block(self, url, resource_type):
+        if resource_type == "document":
+            return False
+        if any(pattern.search(url) for pattern in self.allowlist):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return any(pattern.search(url) for pattern in self.denylist)
+
+
+# Solo crawl + testers estáticos: basta con el DOM (sin imágenes, fuentes, CSS ni vídeo)
+CRAWL_ONLY = ResourcePolicy(
+    "crawl_only",
+    blocked_types=("image", "media", "font", "stylesheet", "texttrack", "manifest", "eventsource", "websocket"),
+    denylist=TRACKER_PATTERNS
+)
+
+# Auditorías en el navegador (axe en modo fusionado): CSS, fuentes e imágenes afectan
+# a contraste, tamaños y visibilidad, así que solo quitamos vídeo/audio y tracking
+FULL_RENDER = ResourcePolicy(
+    "full_render",
+    blocked_types=("media",),
+    denylist=TRACKER_PATTERNS
+)
+
+PROFILES = {
+    CRAWL_ONLY.name: CRAWL_ONLY,
+    FULL_RENDER.name: FULL_RENDER,
+}
+
+
+class ResourceBlocker:
+    """
+    Aplica una `ResourcePolicy` a las pestañas de pyppeteer (intercepción de peticiones)
+    y cuenta las peticiones bloqueadas.
+
+    Las pestañas vienen del BrowserPool y se reutilizan: `attach()` activa la política en
+    la pestaña y `detach()` la desactiva al devolverla (axe u otros la usarán sin bloqueo).
+
+    No se estiman bytes ahorrados: con "crawl_only" se bloquean tipos enteros (imágenes,
+    fuentes, CSS), así que no hay respuestas permitidas del mismo tipo con las que medir.
+    Solo se informa de peticiones bloqueadas por tipo y de los bytes realmente recibidos.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.stats = {
+            "requests_allowed": 0,
+            "requests_blocked": 0,
+            "blocked_by_type": {},
+            "bytes_received": 0
+        }
+
+    async def attach(self, page):
+        """Activa la política en `page` (el handler se instala una sola vez por pestaña)."""
+        page._resource_blocker = self
+        if not getattr(page, "_resource_handlers_installed", False):
+            page.on("request", lambda request: asyncio.ensure_future(_dispatch_request(page, request)))
+            page.on("response", lambda response: _dispatch_response(page, response))
+            page._resource_handlers_installed = True
+        page._resource_interception = True
+        await page.setRequestInterception(True)
+
+    async def detach(self, page):
+        """Desactiva la intercepción: la pestaña vuelve al pool cargando todo."""
+        page._resource_blocker = None
+        if getattr(page, "_resource_interception", False):
+            page._resource_interception = False
+            try:
+                await page.setRequestInterception(False)
+            except Exception:
+                pass  # Pestaña ya cerrada o navegador caído: el pool la descartará
+
+    async def handle_request(self, request):
+        resource_type = request.resourceType
+        if self.policy.should_block(request.url, resource_type):
+            self.stats["requests_blocked"] += 1
+            by_type = self.stats["blocked_by_type"]
+            by_type[resource_type] = by_type.get(resource_type, 0) + 1
+            await request.abort()
+        else:
+            self.stats["requests_allowed"] += 1
+            await request.continue_()
+
+    def handle_response(self, response):
+        size = response.headers.get("content-length")
+        if not size or not size.isdigit():
+            return
+        self.stats["bytes_received"] += int(size)
+
+    def summary(self):
+        return {
+            "profile": self.policy.name,
+            **self.stats
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(
+            f"🚫 Recursos bloqueados ({summary['profile']}): {summary['requests_blocked']} peticiones "
+            f"de {summary['requests_blocked'] + summary['requests_allowed']}, "
+            f"{summary['bytes_received'] / 1024:.0f} KB recibidos. "
+            f"Por tipo: {summary['blocked_by_type']}"
+        )
+
+
+async def _dispatch_request(page, request):
+    """Handler de 'request' de la pestaña: usa el bloqueador activo en ese momento."""
+    if not getattr(page, "_resource_interception", False):
+        return  # Intercepción desactivada: Chromium no espera respuesta
+    blocker = getattr(page, "_resource_blocker", None)
+    try:
+        if blocker is None:
+            await request.continue_()
+        else:
+            await blocker.handle_request(request)
+    except Exception:
+        pass  # Petición ya resuelta o pestaña cerrada
+
+
+def _dispatch_response(page, response):
+    blocker = getattr(page, "_resource_blocker", None)
+    if blocker is not None:
+        blocker.handle_response(response)
@@ -1,158 +1,656 @@
 import asyncio
 import os
-import requests
-from pyppeteer import launch
-from bs4 import BeautifulSoup
+import time
+from contextlib import AsyncExitStack, aclosing
+from parser_backend import make_soup
 from urllib.parse import urljoin, urlparse
 
-CHROMIUM_PATH = "./chrome-win/chrome.exe"
+from accessibility_checker.browser_pool import BrowserPool
+from scraper.discovery import UrlDiscovery, canonical_url
+from scraper.host_health import HostHealth
+from scraper.image_downloader import ImageDownloader
+from scraper.image_manifest import IMAGES_FOLDER
+from scraper.rate_limiter import THROTTLE_STATUSES, RateLimiter
+from scraper.resource_policy import CRAWL_ONLY, FULL_RENDER, PROFILES, ResourceBlocker
+from scraper.templates import template_signature
+
+# Páginas ya scrapeadas que esperan a ser consumidas en `stream()` / `iter_pages()`.
+# Con la cola llena los workers del crawl esperan (backpressure): la memoria queda
+# acotada por este tamaño y no por el del sitio.
+PAGE_QUEUE_SIZE = 8
+
+# Intentos de carga por página. Cada reintento vuelve a la frontera con backoff
+# exponencial (ver RateLimiter.retry_delay) en vez de bloquear la pestaña.
+MAX_ATTEMPTS = 3
+PAGE_TIMEOUT_MS = 60000
 
 class WebScraper:
-    def __init__(self, start_url, max_pages=1, max_depth=2):
+    def __init__(self, start_url, max_pages=1, max_depth=2, pool=None, page_analyzers=None,
+                 concurrency=4, per_host_limit=2, resource_policy=None, http_cache=None, discovery=None,
+                 template_clusterer=None, checkpoint=None, rate_limiter=None, host_health=None,
+                 cached_analysis=None):
         self.start_url = start_url
         self.visited_urls = {}
         self.page_count = 0  # Contador de páginas visitadas correctamente
         self.max_pages = max_pages
         self.max_depth = max_depth
-        self.browser = None  # Aquí guardaremos el navegador
+        self.pool = pool  # BrowserPool compartido (si es None, run() abre uno propio)
+
+        # Frontera en anchura: páginas cargando a la vez (total y, como máximo, por host)
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+
+        # Ritmo por host: robots.txt (Disallow y Crawl-delay) y concurrencia adaptativa
+        # según la latencia y las respuestas 429/503
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrency=per_host_limit)
+
+        # Latencia por host: circuit breaker (las URLs de un host degradado se aparcan),
+        # timeout de navegación aprendido y, si está activada, navegación de cobertura
+        self.host_health = host_health or HostHealth()
+
+        # Modo fusionado: mediciones que se ejecutan en la MISMA pestaña ya cargada, antes de
+        # cerrarla (evita volver a navegar). {nombre: async def analyzer(page, url) -> resultado}
+        self.page_analyzers = page_analyzers or {}
+        # Resultados ya guardados de page_analyzers para un HTML concreto:
+        # def cached_analysis(url, html) -> {nombre: resultado} o None. Si los hay, una página
+        # de la caché HTTP que responde 304 no se vuelve a renderizar (ver _revalidate_cached_page)
+        self.cached_analysis = cached_analysis
 
-        # Carpeta donde guardamos las imágenes
-        self.images_folder = "downloaded_images"
+        # Recursos que no se cargan durante el crawl. Por defecto: si hay mediciones en la
+        # pestaña (axe) hace falta el render completo; si no, basta con el DOM.
+        if resource_policy is None:
+            resource_policy = FULL_RENDER if self.page_analyzers else CRAWL_ONLY
+        elif isinstance(resource_policy, str):
+            resource_policy = PROFILES[resource_policy]
+        self.resource_blocker = ResourceBlocker(resource_policy) if resource_policy else None
+
+        # Sitemaps + deduplicación (política de normalización y rel=canonical)
+        self.discovery = discovery or UrlDiscovery()
+
+        # Modo muestreo: TemplateClusterer que agrupa las páginas por plantilla. Solo los
+        # representantes de cada plantilla pasan page_analyzers y descargan imágenes (OCR)
+        self.template_clusterer = template_clusterer
+
+        # CrawlCheckpoint opcional: guarda frontera, visitadas y páginas para poder reanudar
+        self.checkpoint = checkpoint
+
+        # Caché HTTP persistente (HTML + imágenes) con revalidación ETag/Last-Modified
+        self.http_cache = http_cache
+
+        # Carpeta donde guardamos las imágenes (por hash de contenido, con manifest)
+        self.images_folder = IMAGES_FOLDER
+        self.image_downloader = None
         if not os.path.exists(self.images_folder):
             os.makedirs(self.images_folder)
 
-    async def scrape_page(self, url, depth=0):
-        """Scrapea una página y busca enlaces internos recursivamente."""
-        # Si ya alcanzamos el límite de páginas, no seguir
-        if self.page_count >= self.max_pages:
-            return []
-
-        # Normalizar la URL (sin querystring ni fragment)
+    def normalize_url(self, url):
+        """
+        URL de la página en los resultados (sin querystring ni fragment).
+        La deduplicación usa otra clave más estricta: `self.discovery.key(url)`.
+        """
         parsed_url = urlparse(url)
-        normalized_url = f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+        return f"{parsed_url.scheme}://{parsed_url.netloc}{parsed_url.path}"
+
+    def enqueue(self, url, depth):
+        """
+        Añade una URL a la frontera si no se ha visto y no supera `max_depth`.
+        Se marca en `visited_urls` (por su clave de deduplicación) al encolarla,
+        así nunca entra dos veces, ni tampoco sus variantes.
+        """
+        if depth > self.max_depth:
+            return False
 
-        # Verificar si ya visitamos la página o si pasamos la profundidad
-        if normalized_url in self.visited_urls or depth > self.max_depth:
-            return []
+        key = self.discovery.key(url)
+        if key in self.visited_urls:
+            self.discovery.count_rejected(url, key)
+            return False
 
         # Marcar en visited_urls para no reintentar
-        self.visited_urls[normalized_url] = True
+        self.visited_urls[key] = True
+        self.discovery.mark_seen(url)
+
+        # Prioridad (profundidad, orden de descubrimiento): recorrido en anchura
+        self._frontier.put_nowait((depth, self._sequence, url))
+        if self.checkpoint:
+            self.checkpoint.add_url(key, url, depth, self._sequence)
+        self._sequence += 1
+        return True
 
-        # Crear una nueva pestaña (no un nuevo navegador)
-        page = await self.browser.newPage()
+    async def scrape_page(self, url, depth=0, attempt=1):
+        """
+        Scrapea UNA página (sin recursión), con un único intento de carga.
+        Retorna (resultado_de_la_página, enlaces_internos) o (None, []) si no se pudo cargar
+        (el crawler decide si reintentarla más tarde).
+        """
+        normalized_url = self.normalize_url(url)
+
+        # Sin mediciones en el navegador, una página que no cambió (304) no se vuelve a renderizar
+        revalidated = await self._revalidate_cached_page(url, normalized_url)
+        if revalidated is not None:
+            content, analysis = revalidated
+            soup = make_soup(content, sourcelines=False)
+            template = self._assign_template(soup, normalized_url)
+            return await self._build_page_result(url, normalized_url, depth, content, analysis, soup, template)
 
-        loaded_correctly = False
-        for attempt in range(3):
+        # Pedimos una pestaña al pool (no un nuevo navegador); se devuelve al salir del bloque
+        async with self.rate_limiter.slot(url), self.pool.tab() as page, AsyncExitStack() as hedge_tabs:
+            if self.resource_blocker:
+                await self.resource_blocker.attach(page)
+
+            print(f"Intento {attempt}/{MAX_ATTEMPTS} de cargar: {normalized_url}")
+            started = time.monotonic()
             try:
-                print(f"Intento {attempt+1}/3 de cargar: {normalized_url}")
-                await page.goto(url, {"waitUntil": "domcontentloaded", "timeout": 60000})
-                loaded_correctly = True
-                break
+                # Con navegación de cobertura la pestaña que gana puede ser otra
+                page, response = await self._navigate(page, url, hedge_tabs)
+                latency = time.monotonic() - started
+                status = getattr(response, "status", None)
+                if status in THROTTLE_STATUSES:
+                    # Página de error del servidor saturado: no es el contenido real
+                    headers = response.headers or {}
+                    self.rate_limiter.record(url, latency, status=status, retry_after=headers.get("retry-after"))
+                    self.host_health.record_failure(url)
+                else:
+                    # Si cargó correctamente, extraemos el contenido HTML
+                    content = await page.content()
+                    self.rate_limiter.record(url, latency, status=status)
+                    self.host_health.record_success(url, latency)
+                    self._cache_rendered_page(normalized_url, content, response)
             except Exception as e:
-                print(f"⚠️ Intento {attempt+1} fallido en {normalized_url}: {e}")
+                self.rate_limiter.record(url, time.monotonic() - started, error=True)
+                self.host_health.record_failure(url)
+                print(f"⚠️ Intento {attempt} fallido en {normalized_url}: {e}")
+
+            # Mediciones en el navegador sobre la pestaña ya abierta (axe, etc.)
+            analysis = {}
+            if content is not None:
+                # Solo buscamos enlaces, imágenes y la estructura: no hacen falta números de línea
+                soup = make_soup(content, sourcelines=False)
+                template = self._assign_template(soup, normalized_url)
+                if template is None or template["representative"]:
+                    analysis = await self.run_page_analyzers(page, normalized_url)
+
+            if self.resource_blocker:
+                await self.resource_blocker.detach(page)
 
-        if not loaded_correctly:
-            print(f"❌ No se pudo cargar {normalized_url}. Omitiendo...\n")
+        if content is None:
+            return None, []
+
+        return await self._build_page_result(url, normalized_url, depth, content, analysis, soup, template)
+
+    async def _navigate(self, page, url, hedge_tabs):
+        """
+        `page.goto` con el timeout aprendido del host. Con navegación de cobertura, si la
+        carga supera el percentil de latencia del host (y el pool tiene una pestaña libre)
+        se lanza la misma navegación en otra pestaña (`hedge_tabs`); gana la primera que
+        termine y la otra pestaña se cierra.
+        :return: (pestaña con la página cargada, respuesta del documento)
+        """
+        options = {
+            "waitUntil": "domcontentloaded",
+            "timeout": self.host_health.navigation_timeout(url, PAGE_TIMEOUT_MS)
+        }
+        first = asyncio.ensure_future(page.goto(url, options))
+        hedge_delay = self.host_health.hedge_delay(url)
+        if hedge_delay is None:
+            return page, await first
+
+        done, _ = await asyncio.wait({first}, timeout=hedge_delay)
+        if done or not getattr(self.pool, "has_free_tab", lambda: False)():
+            return page, await first
+
+        self.host_health.stats["hedged"] += 1
+        print(f"🏁 {self.normalize_url(url)} tarda más de {hedge_delay:.1f} s: segunda navegación en otra pestaña")
+        hedge_page = await hedge_tabs.enter_async_context(self.pool.tab())
+        if self.resource_blocker:
+            await self.resource_blocker.attach(hedge_page)
+        second = asyncio.ensure_future(hedge_page.goto(url, options))
+
+        tabs = {first: page, second: hedge_page}
+        pending = set(tabs)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    if task is second:
+                        self.host_health.stats["hedge_wins"] += 1
+                    for loser in pending:
+                        loser.cancel()
+                        await self._close_tab(tabs[loser])
+                    return tabs[task], task.result()
+            raise first.exception()  # Fallaron las dos
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _close_tab(self, page):
+        """Cierra la pestaña que perdió la carrera (el pool la descarta al devolverla)."""
+        try:
             await page.close()
-            return []
+        except Exception:
+            pass
 
-        # Si cargó correctamente, extraemos el contenido HTML
-        content = await page.content()
-        soup = BeautifulSoup(content, "html.parser")
+    def _assign_template(self, soup, normalized_url):
+        """Grupo de plantilla de la página (None si no hay modo muestreo)."""
+        if self.template_clusterer is None:
+            return None
+        return self.template_clusterer.assign(template_signature(soup), normalized_url)
+
+    async def _revalidate_cached_page(self, url, normalized_url):
+        """
+        Si la página está en la caché HTTP, la revalida con una petición condicional.
+        Devuelve (HTML guardado, análisis) si el servidor responde 304; si no, None (hay
+        que cargarla). Con page_analyzers solo se intenta si `cached_analysis` tiene ya sus
+        resultados para ese HTML: si no, axe necesita la página viva en una pestaña.
+        """
+        if self.http_cache is None:
+            return None
+        entry = self.http_cache.get(normalized_url)
+        if entry is None:
+            return None
 
-        # Cerramos la pestaña
-        await page.close()
+        analysis = {}
+        if self.page_analyzers:
+            if self.cached_analysis is None:
+                return None
+            cached_html = self.http_cache.read_body(entry).decode("utf-8", errors="replace")
+            analysis = self.cached_analysis(normalized_url, cached_html)
+            if analysis is None:
+                return None
 
-        # Ahora sí sumamos 1 a nuestro contador
-        self.page_count += 1
-        print(f"Scrapeando ({self.page_count}/{self.max_pages}): {normalized_url}\n")
+        async with self.rate_limiter.slot(url):
+            started = time.monotonic()
+            status, body, _ = await self.http_cache.fetch(
+                self.image_downloader.session, url, key=normalized_url, store=False
+            )
+        if status is None or status >= 500:
+            self.host_health.record_failure(url)
+        else:
+            self.host_health.record_success(url, time.monotonic() - started)
+        if status != 304:
+            return None
 
+        print(f"♻️ Sin cambios (304), usando la caché: {normalized_url}")
+        return body.decode("utf-8", errors="replace"), analysis
+
+    def _cache_rendered_page(self, normalized_url, content, response):
+        """Guarda el HTML renderizado con los validadores de la respuesta del documento."""
+        if self.http_cache is None or response is None:
+            return
+        self.http_cache.stats["changed" if self.http_cache.get(normalized_url) else "misses"] += 1
+        headers = response.headers or {}
+        self.http_cache.put(
+            normalized_url,
+            content.encode("utf-8"),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_type=headers.get("content-type")
+        )
+
+    async def _build_page_result(self, url, normalized_url, depth, content, analysis, soup, template=None):
+        """Extrae enlaces, descarga imágenes y arma el resultado de la página."""
         # ─────────────────────────────────────────────────────────────
         # NUEVO: Descarga de imágenes encontradas en la página actual
-        local_images = self.download_images(soup, base_url=normalized_url)
+        # (las páginas muestreadas no pasan OCR: sus imágenes no hacen falta)
+        local_images = []
+        if template is None or template["representative"]:
+            local_images = await self.download_images(soup, normalized_url)
         # ─────────────────────────────────────────────────────────────
 
         # Extraer enlaces internos
         links = [urljoin(url, a["href"]) for a in soup.find_all("a", href=True)]
         # Filtrar sólo aquellos que comienzan con self.start_url, así evitamos salir de dominio
-        links = list(set(filter(lambda x: x.startswith(self.start_url), links)))
+        # (ordenados para que el recorrido sea reproducible)
+        links = sorted(set(filter(lambda x: x.startswith(self.start_url), links)))
 
         # Recolectamos la info del "page actual"
-        page_results = [{
+        page_result = {
             "url": normalized_url,
+            "canonical": canonical_url(soup, url),  # <link rel="canonical"> (o None)
             "content": content,
-            "local_images": local_images  # Rutas locales de las imágenes descargadas
-        }]
+            "local_images": local_images,  # Rutas locales de las imágenes descargadas
+            "analysis": analysis,  # Resultados de page_analyzers (modo fusionado)
+            "template": template,  # {"cluster", "representative", "similarity"} en modo muestreo
+            "depth": depth
+        }
+        return page_result, links
+
+    async def _crawl_worker(self, emit):
+        """
+        Toma URLs de la frontera (la menos profunda primero) hasta que se vacía.
+        Cada página se entrega con `await emit(orden_de_descubrimiento, resultado)`.
+        """
+        while True:
+            depth, sequence, url = await self._frontier.get()
+            try:
+                # Su página canónica se cargó después de encolarla: ya no hace falta
+                if self.discovery.key(url) in self._scraped_keys:
+                    self.discovery.stats["canonical_skipped"] += 1
+                    self._checkpoint_status(url, "skipped")
+                    continue
+
+                if not await self.rate_limiter.allowed(self.image_downloader.session, url):
+                    print(f"🤖 robots.txt no permite cargar {url}. Omitiendo...\n")
+                    self._checkpoint_status(url, "skipped")
+                    continue
+
+                # Reservamos plaza ANTES de cargar: así nunca se superan las max_pages. Si
+                # las plazas libres las ocupan cargas en curso, esperamos: pueden fallar y
+                # liberarla. Solo se descarta la URL cuando ya hay max_pages páginas.
+                if not await self._wait_for_page_slot():
+                    continue
+
+                # Host degradado (circuito abierto): la URL espera fuera de la frontera sin
+                # ocupar una pestaña, y vuelve cuando el circuito deje pasar cargas
+                if not self.host_health.allow(url):
+                    if self.host_health.is_down(url):
+                        print(f"❌ {urlparse(url).netloc} no responde. Omitiendo {url}...\n")
+                        self._checkpoint_status(url, "failed")
+                        continue
+                    delay = self.host_health.park(url)
+                    print(f"🅿️ Circuito abierto para {urlparse(url).netloc}: {url} aparcada {delay:.0f} s")
+                    self._requeue_later((depth, sequence, url), delay)
+                    continue
+                self._in_flight += 1
+                attempt = self._attempts.get(url, 0) + 1
+                self._attempts[url] = attempt
+                try:
+                    page_result, links = await self.scrape_page(url, depth, attempt)
+                finally:
+                    self._in_flight -= 1
+                    self._page_slot_freed.set()
 
-        # Recorrer recursivamente los enlaces (mientras no se supere el límite)
-        for link in links:
-            if self.page_count < self.max_pages:
-                child_pages = await self.scrape_page(link, depth+1)
-                page_results.extend(child_pages)
-            else:
-                break
+                if page_result is None:
+                    # Plaza liberada: otra URL de la frontera puede ocuparla mientras esta espera
+                    if not self._schedule_retry((depth, sequence, url), attempt):
+                        print(f"❌ No se pudo cargar {self.normalize_url(url)}. Omitiendo...\n")
+                        self._checkpoint_status(url, "failed")
+                    continue
 
-        return page_results
+                if not self._register_scraped(url, page_result):
+                    print(f"♊ {page_result['url']} es un duplicado de {page_result['canonical']}. Omitiendo...\n")
+                    self._checkpoint_status(url, "skipped")
+                    continue
 
-    def download_images(self, soup, base_url):
+                # Ahora sí sumamos 1 a nuestro contador
+                self.page_count += 1
+                print(f"Scrapeando ({self.page_count}/{self.max_pages}): {page_result['url']}\n")
+
+                for link in links:
+                    self.enqueue(link, depth + 1)
+
+                # La página y sus enlaces se guardan juntos en el checkpoint
+                if self.checkpoint:
+                    canonical = page_result["canonical"]
+                    self.checkpoint.mark_done(
+                        self.discovery.key(url), sequence, page_result,
+                        self.discovery.key(canonical) if canonical else None
+                    )
+
+                # Puede esperar si el consumidor va más lento (backpressure)
+                await emit(sequence, page_result)
+            except Exception as e:
+                print(f"⚠️ Error inesperado procesando {url}: {e}")
+            finally:
+                self._frontier.task_done()
+
+    async def _wait_for_page_slot(self):
         """
-        Busca <img> en 'soup' y descarga cada imagen en self.images_folder.
-        Retorna una lista con las rutas locales de las imágenes descargadas.
+        Espera a que haya plaza para otra carga sin superar `max_pages`.
+        :return: False si ya se alcanzó `max_pages` (la URL sobra).
+        """
+        while self.page_count + self._in_flight >= self.max_pages:
+            if self.page_count >= self.max_pages:
+                return False
+            self._page_slot_freed.clear()
+            await self._page_slot_freed.wait()
+        return True
+
+    def _schedule_retry(self, item, attempt):
+        """
+        Devuelve la URL a la frontera tras una espera con backoff exponencial, sin ocupar
+        un worker mientras tanto. False si ya agotó sus MAX_ATTEMPTS intentos.
+        """
+        if attempt >= MAX_ATTEMPTS:
+            return False
+        url = item[2]
+        delay = self.rate_limiter.retry_delay(url, attempt)
+        print(f"🔁 Reintento {attempt + 1}/{MAX_ATTEMPTS} de {self.normalize_url(url)} en {delay:.1f} s")
+        self._requeue_later(item, delay)
+        return True
+
+    def _requeue_later(self, item, delay):
+        """Devuelve `item` a la frontera dentro de `delay` segundos (reintentos y URLs aparcadas)."""
+        async def requeue():
+            await asyncio.sleep(delay)
+            self._frontier.put_nowait(item)
+
+        task = asyncio.ensure_future(requeue())
+        self._retry_tasks.add(task)
+        task.add_done_callback(self._retry_tasks.discard)
+
+    def _checkpoint_status(self, url, status):
+        if self.checkpoint:
+            self.checkpoint.mark_status(self.discovery.key(url), status)
+
+    def _restore_checkpoint(self):
+        """
+        Reanuda un crawl anterior: visitadas, frontera pendiente y contador de páginas.
+        Las páginas terminadas NO se vuelven a cargar (ver `_replay_checkpoint`).
+        """
+        for key in self.checkpoint.visited_keys():
+            self.visited_urls[key] = True
+        self._scraped_keys = self.checkpoint.scraped_keys()
+        for key in self._scraped_keys:
+            self.visited_urls[key] = True
+
+        self._sequence = self.checkpoint.next_sequence()
+        pending = self.checkpoint.pending_urls()
+        for depth, sequence, url in pending:
+            self._frontier.put_nowait((depth, sequence, url))
+
+        counts = self.checkpoint.counts()
+        self.page_count = counts.get("done", 0)
+        print(
+            f"⏯️ Reanudando el crawl: {self.page_count} páginas ya terminadas, "
+            f"{len(pending)} URLs pendientes"
+        )
+
+    async def _replay_checkpoint(self, emit):
+        """Entrega otra vez (sin cargarlas) las páginas terminadas antes de la caída."""
+        for _, sequence, page_result in self.checkpoint.completed_pages():
+            await emit(sequence, page_result)
+
+    def _register_scraped(self, url, page_result):
         """
-        local_paths = []
+        Anota la página cargada y su URL canónica como ya vistas.
+        Devuelve False si la canónica ya se había cargado (la página es un duplicado).
+        """
+        page_key = self.discovery.key(url)
+        canonical_key = self.discovery.key(page_result["canonical"]) if page_result["canonical"] else page_key
 
-        images = soup.find_all("img")
-        for img in images:
-            src = img.get("src")
-            if not src:
-                continue
+        if canonical_key != page_key and canonical_key in self._scraped_keys:
+            self.discovery.stats["canonical_duplicates"] += 1
+            return False
 
-            # Resolver URL relativa con respecto a la página base
-            image_url = urljoin(base_url, src)
+        self._scraped_keys.update((page_key, canonical_key))
+        if canonical_key not in self.visited_urls:
+            # Los enlaces a la canónica ya no se encolarán
+            self.visited_urls[canonical_key] = True
+            self.discovery.add_canonical(canonical_key)
+        return True
 
+    async def _crawl(self, emit):
+        """
+        Crawler en anchura con frontera: hasta `concurrency` páginas cargando a la vez
+        (y lo que permita el RateLimiter por host, como mucho `per_host_limit`),
+        respetando exactamente `max_pages` y `max_depth`.
+        Cada página scrapeada se entrega a `emit` en cuanto está lista.
+        """
+        self._frontier = asyncio.PriorityQueue()
+        self._sequence = 0
+        self._in_flight = 0
+        self._page_slot_freed = asyncio.Event()  # Se activa cada vez que termina una carga
+        self._attempts = {}  # url -> intentos de carga hechos
+        self._retry_tasks = set()  # Reintentos y URLs aparcadas esperando para volver a la frontera
+        self._scraped_keys = set()
+
+        resuming = self.checkpoint is not None and self.checkpoint.start(self.start_url)
+        if resuming:
+            self._restore_checkpoint()
+        else:
+            self.enqueue(self.start_url, 0)
+
+        self.image_downloader = ImageDownloader(self.images_folder, http_cache=self.http_cache)
+        await self.image_downloader.start()
+
+        # Semillas de los sitemaps (como enlaces de la página inicial). Al reanudar ya
+        # están en la frontera guardada
+        if not resuming:
+            robots_txt = await self.rate_limiter.robots_txt(self.image_downloader.session, self.start_url)
+            for url in await self.discovery.seed_urls(self.image_downloader.session, self.start_url, robots_txt):
+                self.enqueue(url, 1)
+
+        workers = [asyncio.ensure_future(self._crawl_worker(emit)) for _ in range(self.concurrency)]
+        try:
+            if resuming:
+                await self._replay_checkpoint(emit)
+            # La frontera puede vaciarse mientras quedan reintentos esperando su turno
+            await self._frontier.join()
+            while self._retry_tasks:
+                await asyncio.wait(set(self._retry_tasks))
+                await self._frontier.join()
+            if self.checkpoint:
+                self.checkpoint.mark_finished()
+        finally:
+            for task in workers + list(self._retry_tasks):
+                task.cancel()
+            await asyncio.gather(*workers, *self._retry_tasks, return_exceptions=True)
+            # Cierra la sesión HTTP y guarda lo que quede del manifest src -> archivo
+            await self.image_downloader.close()
+
+        self.discovery.print_summary()
+        self.rate_limiter.print_summary()
+        self.host_health.print_summary()
+        if self.template_clusterer:
+            self.template_clusterer.print_summary()
+        if self.resource_blocker:
+            self.resource_blocker.print_summary()
+        if self.http_cache:
+            self.http_cache.print_summary()
+
+    async def crawl(self):
+        """Crawl completo. Retorna las páginas en orden de descubrimiento (en anchura)."""
+        results = []
+
+        async def collect(sequence, page_result):
+            results.append((sequence, page_result))
+
+        await self._crawl(collect)
+        results.sort(key=lambda item: item[0])
+        return [page_result for _, page_result in results]
+
+    async def iter_pages(self, max_buffered=PAGE_QUEUE_SIZE):
+        """
+        Generador asíncrono: entrega cada página en cuanto se scrapea (en orden de llegada),
+        mientras el crawl continúa. Como mucho `max_buffered` páginas esperan en la cola;
+        si el consumidor no las recoge, el crawl se detiene hasta que haya sitio.
+        Si el consumidor deja de iterar, el crawl se cancela.
+        """
+        queue = asyncio.Queue(maxsize=max_buffered)
+        finished = object()
+
+        async def produce():
+            cancelled = False
             try:
-                response = requests.get(image_url, stream=True, timeout=10)
-                if response.status_code == 200:
-                    # Nombre de archivo basado en la parte final de la URL
-                    filename = os.path.basename(urlparse(image_url).path)
-                    if not filename:
-                        # Si la URL termina en '/', asignar un nombre genérico
-                        filename = "image.jpg"
-
-                    local_path = os.path.join(self.images_folder, filename)
-
-                    # Evita sobreescribir si ya existe (puedes usar otro método si lo deseas)
-                    # Aquí se sobreescribe si el nombre coincide
-                    with open(local_path, "wb") as f:
-                        for chunk in response.iter_content(chunk_size=1024):
-                            f.write(chunk)
-
-                    local_paths.append(local_path)
+                await self._crawl(lambda sequence, page_result: queue.put(page_result))
+            except asyncio.CancelledError:
+                # El consumidor dejó de iterar: nadie recogerá el centinela y, con la cola
+                # llena, esperar para ponerlo bloquearía la cancelación para siempre
+                cancelled = True
+                raise
+            finally:
+                if not cancelled:
+                    await queue.put(finished)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                page_result = await queue.get()
+                if page_result is finished:
+                    break
+                yield page_result
+            await producer  # Propaga los errores del crawl
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+    async def run_page_analyzers(self, page, url):
+        """Ejecuta cada analizador sobre la pestaña abierta; el fallo de uno no afecta al resto."""
+        analysis = {}
+        for name, analyzer in self.page_analyzers.items():
+            try:
+                analysis[name] = await analyzer(page, url)
             except Exception as e:
-                print(f"⚠️ Error descargando {image_url}: {e}")
+                print(f"⚠️ El analizador '{name}' falló en {url}: {e}")
+                analysis[name] = {"url": url, "error": str(e)}
+        return analysis
 
-        return local_paths
+    async def download_images(self, soup, base_url):
+        """
+        Descarga las <img> de 'soup' con el ImageDownloader compartido (asíncrono, con
+        conexiones reutilizadas y guardadas por hash de contenido).
+        Retorna una lista con las rutas locales de las imágenes descargadas.
+        """
+        return await self.image_downloader.download_page_images(soup, base_url)
 
     async def run(self):
         """
-        Inicia el navegador (headless) y arranca el scraping a partir de self.start_url.
+        Arranca el crawl a partir de self.start_url usando el BrowserPool compartido
+        (si no se pasó ninguno, abre uno propio y lo cierra al terminar).
         Retorna una lista de diccionarios con la información de cada página scrapeada:
         {
           "url": <URL de la página>,
+          "canonical": <URL de <link rel="canonical"> o None>,
           "content": <HTML raw>,
-          "local_images": [<ruta local img1>, <ruta local img2>, ...]
+          "local_images": [<ruta local img1>, <ruta local img2>, ...],
+          "analysis": {<nombre del analizador>: <resultado>, ...},
+          "template": <grupo de plantilla (modo muestreo) o None>,
+          "depth": <profundidad desde start_url>
         }
         """
-        self.browser = await launch(
-            headless=True,
-            executablePath=CHROMIUM_PATH,
-            args=["--no-sandbox"]
-        )
+        if self.pool is not None:
+            return await self.crawl()
 
-        results = await self.scrape_page(self.start_url)
+        async with BrowserPool(browsers=1, max_tabs=self.concurrency) as pool:
+            self.pool = pool
+            try:
+                return await self.crawl()
+            finally:
+                self.pool = None
 
-        # Cierra el navegador al terminar
-        await self.browser.close()
+    async def stream(self, max_buffered=PAGE_QUEUE_SIZE):
+        """
+        Como `run()`, pero como generador asíncrono: cada página (mismo diccionario)
+        se entrega en cuanto se scrapea, con backpressure (ver `iter_pages`).
 
-        return results
+            async for page in scraper.stream():
+                ...
+        """
+        # aclosing: si se cierra el stream, se cierra también iter_pages (y se cancela el crawl)
+        if self.pool is not None:
+            async with aclosing(self.iter_pages(max_buffered)) as pages:
+                async for page_result in pages:
+                    yield page_result
+            return
 
+        async with BrowserPool(browsers=1, max_tabs=self.concurrency) as pool:
+            self.pool = pool
+            try:
+                async with aclosing(self.iter_pages(max_buffered)) as pages:
+                    async for page_result in pages:
+                        yield page_result
+            finally:
+                self.pool = None
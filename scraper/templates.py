@@ -0,0 +1,151 @@
+# templates.py
+
+import hashlib
+import random
+
+SHINGLE_SIZE = 4  # Rutas de etiquetas consecutivas por shingle
+NUM_PERMUTATIONS = 64  # Tamaño de la firma MinHash
+LSH_BANDS = 16  # Bandas para buscar candidatos (NUM_PERMUTATIONS / LSH_BANDS filas por banda)
+SIMILARITY_THRESHOLD = 0.7  # Jaccard estimado mínimo para considerar la misma plantilla
+REPRESENTATIVES_PER_TEMPLATE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Permutaciones fijas (misma semilla): las firmas son comparables entre ejecuciones y procesos
+_random = random.Random(1337)
+_PERMUTATIONS = [
+    (_random.randrange(1, _MERSENNE_PRIME), _random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+
+def tag_paths(soup):
+    """
+    Recorrido del DOM como secuencia de rutas de etiquetas ("html/body/div/ul/li").
+    Solo la estructura: textos, atributos e imágenes no cuentan, así dos fichas de hotel
+    con la misma plantilla y distinto contenido dan la misma secuencia (o casi).
+    """
+    paths = []
+    stack = [(soup, "")]
+    while stack:
+        node, parent_path = stack.pop()
+        for child in reversed([child for child in node.children if getattr(child, "name", None)]):
+            if child.name in ("script", "style", "noscript", "template"):
+                continue
+            path = f"{parent_path}/{child.name}"
+            paths.append(path)
+            stack.append((child, path))
+    return paths
+
+
+def shingles(paths, size=SHINGLE_SIZE):
+    """Conjunto de hashes de `size` rutas consecutivas."""
+    if len(paths) < size:
+        size = max(len(paths), 1)
+    result = set()
+    for index in range(max(len(paths) - size + 1, 1)):
+        shingle = "|".join(paths[index:index + size])
+        result.add(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big"))
+    return result
+
+
+def minhash_signature(shingle_hashes):
+    """Firma MinHash (lista de NUM_PERMUTATIONS enteros) de un conjunto de shingles."""
+    if not shingle_hashes:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return [
+        min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in shingle_hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def template_signature(soup):
+    """Huella estructural de la página (MinHash de shingles de rutas de etiquetas)."""
+    return minhash_signature(shingles(tag_paths(soup)))
+
+
+def estimated_similarity(signature_a, signature_b):
+    """Jaccard estimado entre dos firmas MinHash."""
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+
+class TemplateClusterer:
+    """
+    Agrupa en línea las páginas por plantilla (firma MinHash + LSH por bandas).
+
+    Cada página se asigna al llegar (funciona con el crawl en streaming):
+    - si se parece (Jaccard estimado >= `threshold`) al primer miembro de un grupo
+      ya existente, entra en ese grupo;
+    - si no, abre un grupo nuevo.
+    Los primeros `representatives` miembros de cada grupo son sus representantes:
+    sobre ellos se ejecutan axe, Lighthouse y todas las reglas manuales; el resto solo
+    pasa las reglas con `expensive = False` (CHEAP_TESTERS en global_tester.py). Las
+    reglas con OCR o modelos de lenguaje se marcan `expensive` porque su coste crece con
+    cada imagen o texto de la página, y dentro de una plantilla esas imágenes y textos
+    suelen repetirse: basta con auditarlas en los representantes.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, representatives=REPRESENTATIVES_PER_TEMPLATE, bands=LSH_BANDS):
+        self.threshold = threshold
+        self.representatives = representatives
+        self.bands = bands
+        self.rows = NUM_PERMUTATIONS // bands
+
+        self.clusters = []  # [{"id", "signature", "size", "members": [urls de representantes]}]
+        self._buckets = {}  # (banda, valores) -> [índices de grupo]
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, tuple(signature[band * self.rows:(band + 1) * self.rows])
+
+    def assign(self, signature, url=None):
+        """
+        Asigna una página a su grupo.
+        :return: {"cluster": id, "representative": bool, "similarity": float}
+        """
+        candidates = []
+        for band_key in self._band_keys(signature):
+            for cluster_index in self._buckets.get(band_key, []):
+                if cluster_index not in candidates:
+                    candidates.append(cluster_index)
+
+        best_index, best_similarity = None, 0.0
+        for cluster_index in candidates:
+            similarity = estimated_similarity(signature, self.clusters[cluster_index]["signature"])
+            if similarity > best_similarity:
+                best_index, best_similarity = cluster_index, similarity
+
+        if best_index is None or best_similarity < self.threshold:
+            best_index, best_similarity = len(self.clusters), 1.0
+            self.clusters.append({"id": best_index, "signature": signature, "size": 0, "members": []})
+            for band_key in self._band_keys(signature):
+                self._buckets.setdefault(band_key, []).append(best_index)
+
+        cluster = self.clusters[best_index]
+        cluster["size"] += 1
+        representative = cluster["size"] <= self.representatives
+        if representative and url:
+            cluster["members"].append(url)
+
+        return {"cluster": cluster["id"], "representative": representative, "similarity": round(best_similarity, 3)}
+
+    def summary(self):
+        pages = sum(cluster["size"] for cluster in self.clusters)
+        full_audits = sum(min(cluster["size"], self.representatives) for cluster in self.clusters)
+        return {
+            "pages": pages,
+            "templates": len(self.clusters),
+            "full_audits": full_audits,
+            "sampled_pages": pages - full_audits
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary["pages"]:
+            return
+        print(
+            f"🧩 Plantillas: {summary['pages']} páginas en {summary['templates']} plantillas; "
+            f"auditoría completa en {summary['full_audits']}, solo testers estáticos en {summary['sampled_pages']}"
+        )
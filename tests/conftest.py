@@ -0,0 +1,61 @@
+# conftest.py
+#
+# Sustitutos deterministas de las dependencias pesadas (modelos, OCR, navegador):
+# así las pruebas del motor de reglas y del crawler se ejecutan sin ellas y los
+# resultados no dependen de un modelo descargado ni de Tesseract.
+
+import importlib.util
+import sys
+import types
+
+
+class _Similarity:
+    def __init__(self, value):
+        self.value = value
+
+    def item(self):
+        return self.value
+
+
+class _SentenceTransformer:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, text, convert_to_tensor=True):
+        return text
+
+
+def _cos_sim(a, b):
+    """1.0 si un texto contiene al otro, 0.0 si no."""
+    a, b = a.lower(), b.lower()
+    return _Similarity(1.0 if a in b or b in a else 0.0)
+
+
+def _classify(text):
+    """Inglés si el texto lleva artículos ingleses; si no, español."""
+    words = set(text.lower().split())
+    return ("en" if words & {"the", "and", "of"} else "es"), 0.9
+
+
+def _module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__dict__.update(attributes)
+    return module
+
+
+STUBS = {
+    "sentence_transformers": _module(
+        "sentence_transformers", SentenceTransformer=_SentenceTransformer, util=_module("util", cos_sim=_cos_sim)
+    ),
+    "langid": _module("langid", classify=_classify),
+    "pytesseract": _module(
+        "pytesseract", image_to_string=lambda image: "", pytesseract=_module("pytesseract", tesseract_cmd="")
+    ),
+    "PIL": _module("PIL", Image=_module("PIL.Image", open=lambda path: path)),
+}
+
+# Los modelos y el OCR se sustituyen siempre (resultados reproducibles); pyppeteer solo
+# si no está instalado: las pruebas nunca lanzan un navegador (usan un pool falso)
+sys.modules.update(STUBS)
+if importlib.util.find_spec("pyppeteer") is None:
+    sys.modules["pyppeteer"] = _module("pyppeteer", launch=None)
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from accessibility_checker import axe_checker
+
+AXE_SOURCE = '/*! axe v4.4.1\n * Copyright (c) 2021 Deque Systems */ window.axe = {version: "4.4.1"};'
+
+
+class FakePage:
+    """Pestaña mínima: `axe_version` es la versión de `axe` en la página (None si no hay)."""
+
+    def __init__(self, axe_version=None, csp_blocks_inline=False):
+        self.axe_version = axe_version
+        self.csp_blocks_inline = csp_blocks_inline
+        self.injections = []
+
+    async def evaluate(self, expression, force_expr=False):
+        if expression == AXE_SOURCE:
+            self.injections.append("devtools")
+            self.axe_version = "4.4.1"
+            return None
+        return self._ready(expression)
+
+    async def addScriptTag(self, options):
+        self.injections.append("script_tag")
+        if not self.csp_blocks_inline:
+            self.axe_version = "4.4.1"
+
+    async def waitForFunction(self, expression, options):
+        if not self._ready(expression):
+            raise TimeoutError()
+
+    def _ready(self, expression):
+        assert expression == "typeof axe !== 'undefined' && axe.version === '4.4.1'"
+        return self.axe_version == "4.4.1"
+
+
+@pytest.fixture
+def axe_source(tmp_path, monkeypatch):
+    path = tmp_path / "axe.min.js"
+    path.write_text(AXE_SOURCE, encoding="utf-8")
+    monkeypatch.setattr(axe_checker, "AXE_JS_PATH", str(path))
+    monkeypatch.setattr(axe_checker, "_axe_source", None)
+    monkeypatch.setattr(axe_checker, "_axe_source_version", None)
+
+
+@pytest.mark.parametrize("axe_version, injections", [
+    (None, ["script_tag"]),
+    ("3.5.6", ["script_tag"]),  # axe propio del sitio: se sustituye por el fijado
+    ("4.4.1", []),
+])
+def test_inject_axe_only_reuses_the_pinned_version(axe_source, axe_version, injections):
+    page = FakePage(axe_version)
+    asyncio.run(axe_checker._inject_axe(page))
+    assert page.injections == injections
+    assert page.axe_version == "4.4.1"
+
+
+def test_inject_axe_falls_back_to_devtools_when_csp_blocks_inline(axe_source):
+    page = FakePage("3.5.6", csp_blocks_inline=True)
+    asyncio.run(axe_checker._inject_axe(page))
+    assert page.injections == ["script_tag", "devtools"]
+    assert page.axe_version == "4.4.1"
+
+
+def test_load_axe_source_from_several_event_loops(axe_source):
+    async def load_concurrently():
+        return await asyncio.gather(*(axe_checker.load_axe_source_async() for _ in range(4)))
+
+    # Cada asyncio.run crea un event loop nuevo: el lock no puede quedar ligado al primero
+    for _ in range(2):
+        axe_checker._axe_source = None
+        assert asyncio.run(load_concurrently()) == [AXE_SOURCE] * 4
@@ -0,0 +1,63 @@
+from scraper.checkpoint import CrawlCheckpoint
+
+START_URL = "https://example.com/"
+
+
+def _crawl_two_pages(path):
+    checkpoint = CrawlCheckpoint(str(path))
+    assert checkpoint.start(START_URL) is False
+    checkpoint.add_url("k0", START_URL, 0, 0)
+    checkpoint.add_url("k1", START_URL + "a", 1, 1)
+    checkpoint.add_url("k2", START_URL + "b", 1, 2)
+    checkpoint.mark_done("k0", 0, {"url": START_URL, "content": "<html>ñ</html>"}, canonical_key="canon")
+    checkpoint.mark_status("k2", "failed")
+    return checkpoint
+
+
+def test_resume_restores_pages_and_frontier(tmp_path):
+    path = tmp_path / "crawl.sqlite"
+    _crawl_two_pages(path).close()
+
+    checkpoint = CrawlCheckpoint(str(path), resume=True)
+    assert checkpoint.start(START_URL) is True
+    # Las "failed" se vuelven a intentar, en el orden de la frontera
+    assert checkpoint.pending_urls() == [(1, 1, START_URL + "a"), (1, 2, START_URL + "b")]
+    assert checkpoint.scraped_keys() == {"k0", "canon"}
+    assert list(checkpoint.completed_pages()) == [("k0", 0, {"url": START_URL, "content": "<html>ñ</html>"})]
+    assert sorted(checkpoint.visited_keys()) == ["k0", "k1", "k2"]
+    assert checkpoint.next_sequence() == 3
+    assert checkpoint.counts() == {"done": 1, "pending": 1, "failed": 1}
+    checkpoint.close()
+
+
+def test_without_resume_starts_from_scratch(tmp_path):
+    path = tmp_path / "crawl.sqlite"
+    _crawl_two_pages(path).close()
+
+    checkpoint = CrawlCheckpoint(str(path))
+    assert checkpoint.start(START_URL) is False
+    assert checkpoint.pending_urls() == []
+    assert list(checkpoint.completed_pages()) == []
+    assert checkpoint.next_sequence() == 0
+    checkpoint.close()
+
+
+def test_resume_of_another_site_starts_from_scratch(tmp_path):
+    path = tmp_path / "crawl.sqlite"
+    _crawl_two_pages(path).close()
+
+    checkpoint = CrawlCheckpoint(str(path), resume=True)
+    assert checkpoint.start("https://other.example.com/") is False
+    assert checkpoint.visited_keys() == []
+    checkpoint.close()
+
+
+def test_links_added_without_mark_done_are_not_committed(tmp_path):
+    path = tmp_path / "crawl.sqlite"
+    checkpoint = _crawl_two_pages(path)
+    checkpoint.add_url("k3", START_URL + "c", 2, 3)  # Su página nunca llegó a mark_done
+    checkpoint._db.close()  # Caída: sin commit
+
+    checkpoint = CrawlCheckpoint(str(path), resume=True)
+    assert "k3" not in checkpoint.visited_keys()
+    checkpoint.close()
@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from aiohttp import ClientSession, web
+
+from scraper import discovery
+from scraper.discovery import NormalizationPolicy, discover_sitemap_urls, parse_sitemap
+
+
+def test_default_policy_drops_query_fragment_and_trailing_slash():
+    policy = NormalizationPolicy()
+    assert policy.key("HTTPS://Example.COM:443/Hoteles/?page=2#top") == "https://example.com/Hoteles"
+    assert policy.key("https://example.com") == "https://example.com/"
+
+
+def test_keep_query_sorts_and_drops_tracking_params():
+    policy = NormalizationPolicy(keep_query=True)
+    url = "https://example.com/search?utm_source=x&q=playa&gclid=1&a=2"
+    assert policy.key(url) == "https://example.com/search?a=2&q=playa"
+    assert policy.key("https://example.com/search?utm_medium=mail") == "https://example.com/search"
+
+
+def test_non_default_port_is_kept():
+    assert NormalizationPolicy().key("http://example.com:8080/a") == "http://example.com:8080/a"
+
+
+def test_lowercase_path_and_collapse_locales():
+    policy = NormalizationPolicy(lowercase_path=True, collapse_locales=True)
+    assert policy.key("https://example.com/en-us/Hoteles/") == policy.key("https://example.com/es_ES/hoteles")
+    assert policy.key("https://example.com/en") == "https://example.com/"
+    # Un segmento de más de dos letras no es un idioma
+    assert policy.key("https://example.com/hotel/") == "https://example.com/hotel"
+
+
+def _urlset(*urls):
+    locs = "".join(f"<url><loc>{url}</loc></url>" for url in urls)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'.encode()
+
+
+def test_parse_sitemap_does_not_expand_entities(tmp_path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("https://example.com/secret", encoding="utf-8")
+    for entity in (f'SYSTEM "{secret.as_uri()}"', '"https://example.com/secret"'):
+        body = (
+            f'<?xml version="1.0"?><!DOCTYPE urlset [<!ENTITY xxe {entity}>]>'
+            "<urlset><url><loc>&xxe;</loc></url></urlset>"
+        ).encode()
+        kind, locations = parse_sitemap(body)
+        assert not any("secret" in location for location in locations)
+
+
+def test_index_children_are_fetched_concurrently_and_in_order(monkeypatch):
+    monkeypatch.setattr(discovery, "SITEMAP_CONCURRENCY", 3)
+
+    async def main():
+        base = {}
+
+        async def index(request):
+            locs = "".join(f"<sitemap><loc>{base['url']}s{i}.xml</loc></sitemap>" for i in range(3))
+            return web.Response(body=f"<sitemapindex>{locs}</sitemapindex>".encode())
+
+        def child(i):
+            async def handler(request):
+                await asyncio.sleep(0.3)
+                return web.Response(body=_urlset(f"{base['url']}page{i}"))
+            return handler
+
+        app = web.Application()
+        app.router.add_get("/sitemap.xml", index)
+        for i in range(3):
+            app.router.add_get(f"/s{i}.xml", child(i))
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        base["url"] = f"http://{host}:{port}/"
+        try:
+            async with ClientSession() as session:
+                started = time.monotonic()
+                urls = await discover_sitemap_urls(session, base["url"], robots_txt="")
+                return urls, time.monotonic() - started, base["url"]
+        finally:
+            await runner.cleanup()
+
+    urls, elapsed, base_url = asyncio.run(main())
+    assert urls == [f"{base_url}page{i}" for i in range(3)]
+    assert elapsed < 0.8  # En serie serían 0.9 s
@@ -0,0 +1,83 @@
+import copy
+import glob
+import json
+import os
+
+import pytest
+
+from manual_checks.global_tester import (
+    TESTERS, run_testers, run_testers_by_rule, run_testers_job, run_testers_with_components
+)
+from manual_checks.page_context import get_page_context
+from manual_checks.rule_engine import run_rules_by_rule
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "html_succesfull_pass", "*.html")))
+
+# Incidencias de los `check_*` originales (commit "baseline", con html.parser y los
+# sustitutos de conftest.py) por fixture: [tester, elemento, line_number]
+with open(os.path.join(os.path.dirname(__file__), "golden", "manual_incidences.json"), "r", encoding="utf-8") as f:
+    GOLDEN = json.load(f)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _summary(incidence):
+    element = copy.deepcopy(incidence.get("element_info", incidence.get("affected_element")))
+    line_number = element.pop("line_number", None) if isinstance(element, dict) else None
+    return [incidence.get("resolution") or incidence["title"], element, line_number]
+
+
+def _per_tester(html_content, page_url):
+    """Cada regla con un recorrido propio del documento (sin compartir la pasada)."""
+    results = {}
+    for rule_class in TESTERS:
+        [(rule, incidences)] = run_rules_by_rule([rule_class(page_url)], get_page_context(html_content, page_url))
+        results[rule_class.__name__] = incidences
+    return results
+
+
+def test_golden_covers_every_fixture():
+    assert sorted(GOLDEN) == [os.path.basename(path) for path in FIXTURES]
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_rules_match_baseline_checks(path):
+    name = os.path.basename(path)
+    incidences = run_testers(_read(path), "file:///" + name)
+    assert [_summary(incidence) for incidence in incidences] == GOLDEN[name]
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+def test_single_traversal_matches_per_tester_runs(path):
+    html_content = _read(path)
+    page_url = "file:///" + os.path.basename(path)
+    assert run_testers_by_rule(html_content, page_url) == _per_tester(html_content, page_url)
+
+
+@pytest.mark.parametrize("path", FIXTURES[:5], ids=os.path.basename)
+def test_job_with_subset_of_testers(path):
+    html_content = _read(path)
+    page_url = "file:///" + os.path.basename(path)
+    names = [rule_class.__name__ for rule_class in TESTERS[::3]]
+    result = run_testers_job({"page_url": page_url, "html_content": html_content, "testers": names})
+    assert result["error"] is None
+    assert list(result["incidences_by_rule"]) == names
+    expected = _per_tester(html_content, page_url)
+    for name in names:
+        assert result["incidences_by_rule"][name] == expected[name]
+
+
+def test_image_rules_are_not_shared_between_pages():
+    # El mismo <header> en dos rutas: "logo.png" es un fichero distinto en cada página
+    links = "".join(f'<a href="/s{i}">Sección {i}</a>' for i in range(30))
+    html_content = f'<html><body><header><img src="logo.png">{links}</header><main>x</main></body></html>'
+    testers = ["ImagesOfTextRule", "InformativeImagesRule"]
+    for page_url in ("https://example.com/a/", "https://example.com/b/"):
+        page_incidences, components = run_testers_with_components(html_content, page_url, testers=testers)
+        [component] = components
+        assert component["incidences_by_rule"] == {}
+        [incidence] = page_incidences["InformativeImagesRule"]
+        assert incidence["page_url"] == page_url
@@ -0,0 +1,98 @@
+import pytest
+
+from scraper import host_health
+from scraper.host_health import HostHealth, percentile
+
+URL = "https://example.com/page"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(host_health.time, "monotonic", fake)
+    return fake
+
+
+def test_percentile_nearest_rank():
+    assert percentile([5, 1, 3, 2, 4], 0.5) == 3
+    assert percentile([1, 2, 3], 0.99) == 3
+
+
+def test_consecutive_failures_open_the_circuit(clock):
+    health = HostHealth(failure_threshold=3, open_seconds=30)
+    health.record_failure(URL)
+    health.record_failure(URL)
+    assert health.allow(URL)
+    health.record_failure(URL)
+    assert not health.allow(URL)
+    assert health.retry_after(URL) == 30
+    assert health.park(URL) == 30
+    assert health.stats["opened"] == 1
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    health = HostHealth(failure_threshold=1, open_seconds=30)
+    health.record_failure(URL)
+    clock.now += 31
+    assert health.allow(URL)  # La carga de prueba
+    assert not health.allow(URL)  # Las demás esperan al resultado
+    health.record_success(URL, 0.5)
+    assert health.allow(URL)
+    assert health._host(URL).state == "closed"
+
+
+def test_failed_probe_reopens_for_twice_as_long(clock):
+    health = HostHealth(failure_threshold=1, open_seconds=30)
+    health.record_failure(URL)
+    clock.now += 31
+    assert health.allow(URL)
+    health.record_failure(URL)
+    assert not health.allow(URL)
+    assert health.retry_after(URL) == 60
+
+
+def test_host_is_down_after_max_openings(clock):
+    health = HostHealth(failure_threshold=1, open_seconds=1, max_openings=3)
+    health.record_failure(URL)
+    for _ in range(2):
+        clock.now += host_health.MAX_OPEN_SECONDS
+        assert health.allow(URL)
+        health.record_failure(URL)
+    assert health.is_down(URL)
+
+
+def test_slow_p95_opens_the_circuit(clock):
+    health = HostHealth(open_p95=2.0, min_samples=4)
+    for _ in range(3):
+        health.record_success(URL, 5.0)
+    assert health.allow(URL)  # Aún no hay muestras suficientes
+    health.record_success(URL, 5.0)
+    assert not health.allow(URL)
+
+
+def test_hosts_are_independent(clock):
+    health = HostHealth(failure_threshold=1)
+    health.record_failure(URL)
+    assert not health.allow(URL)
+    assert health.allow("https://other.example.com/")
+
+
+def test_learned_navigation_timeout_and_hedge_delay(clock):
+    health = HostHealth(min_samples=4, hedge_percentile=0.9)
+    assert health.navigation_timeout(URL, 60000) == 60000
+    assert health.hedge_delay(URL) is None
+    for latency in (1.0, 2.0, 3.0, 4.0):
+        health.record_success(URL, latency)
+    # p99 * TIMEOUT_FACTOR = 12 s, pero nunca por debajo de MIN_NAVIGATION_TIMEOUT
+    assert health.navigation_timeout(URL, 60000) == int(host_health.MIN_NAVIGATION_TIMEOUT * 1000)
+    assert health.navigation_timeout(URL, 5000) == 5000
+    assert health.hedge_delay(URL) == 4.0
+    assert HostHealth(min_samples=4).hedge_delay(URL) is None  # Desactivado por defecto
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from manual_checks.incidence_log import append_incidences, export_legacy_json, iter_incidences
+
+
+def test_append_and_iterate_skip_corrupt_lines(tmp_path):
+    log = tmp_path / "log.jsonl"
+    append_incidences([{"rule": "a"}, {"rule": "b"}], str(log))
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"rule": "cortada\n')
+    assert [inc["rule"] for inc in iter_incidences(str(log))] == ["a", "b"]
+
+
+def test_export_keeps_existing_incidences(tmp_path):
+    log, output = tmp_path / "log.jsonl", tmp_path / "legacy.json"
+    output.write_text(json.dumps([{"rule": "old"}]), encoding="utf-8")
+    append_incidences([{"rule": "new"}], str(log))
+
+    with pytest.raises(FileExistsError):
+        export_legacy_json(str(log), str(output))
+    assert json.loads(output.read_text(encoding="utf-8")) == [{"rule": "old"}]
+
+    assert export_legacy_json(str(log), str(output), base_file=str(output), truncate_log=True) == 2
+    assert [inc["rule"] for inc in json.loads(output.read_text(encoding="utf-8"))] == ["old", "new"]
+    assert log.read_text(encoding="utf-8") == ""
+
+    append_incidences([{"rule": "newer"}], str(log))
+    assert export_legacy_json(str(log), str(output), force=True) == 1
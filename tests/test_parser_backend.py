@@ -0,0 +1,49 @@
+import glob
+import os
+
+import pytest
+
+from parser_backend import make_soup
+
+MULTILINE_HTML = """<html>
+<body>
+<!-- <input id="commented"> -->
+<script>var template = "<input id='in-script'>";</script>
+<form><input id="search-input"
+    type="text"
+    name="q">
+<table><tr><td
+  class="price">10</td></tr></table>
+<p>fin</p></form>
+</body></html>"""
+
+
+def _lines(html_content, parser):
+    # En fragmentos lxml añade <html>/<head>/<body> y html.parser no
+    return [
+        (element.name, element.sourceline) for element in make_soup(html_content, parser).find_all(True)
+        if element.name not in ("html", "head", "body")
+    ]
+
+
+def test_multiline_start_tag_reports_the_line_where_it_begins():
+    lines = dict(_lines(MULTILINE_HTML, "lxml"))
+    assert lines["input"] == 5
+    assert lines["td"] == 8
+    assert lines["p"] == 10
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(
+    os.path.dirname(__file__), "..", "html_succesfull_pass", "*.html"))) + ["multiline"], ids=os.path.basename)
+def test_lxml_line_numbers_match_html_parser(path):
+    if path == "multiline":
+        html_content = MULTILINE_HTML
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            html_content = f.read()
+    assert _lines(html_content, "lxml") == _lines(html_content, "html.parser")
+
+
+def test_without_sourcelines_the_soup_is_still_built():
+    soup = make_soup(MULTILINE_HTML, "lxml", sourcelines=False)
+    assert soup.find("input")["id"] == "search-input"
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from scraper import rate_limiter
+from scraper.rate_limiter import RateLimiter, parse_crawl_delay, parse_retry_after
+
+
+def test_parse_crawl_delay_accepts_decimals_and_prefers_own_agent():
+    robots = "\n".join([
+        "User-agent: *",
+        "Crawl-delay: 0.5  # medio segundo",
+        "Disallow: /private",
+        "",
+        "User-agent: auditbot",
+        "User-agent: otherbot",
+        "Crawl-delay: 3",
+    ])
+    assert parse_crawl_delay(robots) == 0.5
+    assert parse_crawl_delay(robots, "AuditBot") == 3.0
+    assert parse_crawl_delay(robots, "otherbot") == 3.0
+    assert parse_crawl_delay(robots, "unknown") == 0.5
+
+
+def test_parse_crawl_delay_without_value():
+    assert parse_crawl_delay("User-agent: *\nDisallow: /\n") is None
+    assert parse_crawl_delay("User-agent: *\nCrawl-delay: soon\n") is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # Fecha pasada
+
+
+def test_throttle_halves_concurrency_and_backs_off():
+    limiter = RateLimiter(max_concurrency=4)
+    url = "https://example.com/a"
+    limiter.record(url, 0.1, status=429, retry_after="5")
+    state = limiter._host(url)
+    assert state.limit == 2
+    assert state.delay == 5.0
+    limiter.record(url, 0.1, status=503)
+    assert state.limit == 1
+    assert state.delay == 10.0
+    assert limiter.stats["throttled"] == 2
+
+
+def test_error_halves_concurrency_without_backoff():
+    limiter = RateLimiter(max_concurrency=4)
+    url = "https://example.com/a"
+    limiter.record(url, 0.1, error=True)
+    state = limiter._host(url)
+    assert (state.limit, state.delay) == (2, 0.0)
+
+
+def test_slow_host_decreases_by_one_and_fast_loads_recover():
+    limiter = RateLimiter(max_concurrency=3, slow_latency=1.0)
+    url = "https://example.com/a"
+    state = limiter._host(url)
+    limiter.record(url, 5.0)
+    assert state.limit == 2
+
+    state.latency = None
+    limiter.record(url, 0.1)
+    assert state.limit == 2  # Hacen falta `limit` cargas correctas seguidas
+    limiter.record(url, 0.1)
+    assert state.limit == 3
+    for _ in range(5):
+        limiter.record(url, 0.1)
+    assert state.limit == 3  # Nunca por encima de max_concurrency
+
+
+def test_retry_delay_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda a, b: 1.0)
+    limiter = RateLimiter()
+    url = "https://example.com/a"
+    assert limiter.retry_delay(url, 1) == rate_limiter.RETRY_BASE_DELAY
+    assert limiter.retry_delay(url, 2) == rate_limiter.RETRY_BASE_DELAY * 2
+    assert limiter.retry_delay(url, 50) == rate_limiter.RETRY_MAX_DELAY
+    # Nunca por debajo de la pausa actual del host
+    limiter._host(url).delay = 500.0
+    assert limiter.retry_delay(url, 1) == 500.0
+
+
+def test_slot_respects_concurrency_limit():
+    limiter = RateLimiter(max_concurrency=2)
+    url = "https://example.com/a"
+    running = []
+    peak = []
+
+    async def load():
+        async with limiter.slot(url):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+    async def main():
+        await asyncio.gather(*(load() for _ in range(6)))
+
+    asyncio.run(main())
+    assert max(peak) == 2
+    assert limiter._host(url).in_flight == 0
+
+
+@pytest.mark.parametrize("status", [200, None])
+def test_successful_load_moves_delay_back_towards_crawl_delay(status):
+    limiter = RateLimiter()
+    url = "https://example.com/a"
+    state = limiter._host(url)
+    state.crawl_delay, state.delay = 1.0, 10.0
+    limiter.record(url, 0.1, status=status)
+    assert state.delay == 9.0
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from aiohttp import ClientSession, web
+
+from scraper import scraper as scraper_module
+from scraper.discovery import UrlDiscovery
+from scraper.http_cache import HttpCache
+from scraper.scraper import WebScraper
+
+
+class FakeResponse:
+    def __init__(self, status, headers):
+        self.status = status
+        self.headers = {name.lower(): value for name, value in headers.items()}
+
+
+class FakePage:
+    """Pestaña mínima: `goto` descarga la URL por HTTP y `content` devuelve el cuerpo."""
+
+    def __init__(self, failing, navigations):
+        self.failing = failing
+        self.navigations = navigations
+        self._content = ""
+
+    async def goto(self, url, options):
+        self.navigations.append(url)
+        if any(url.endswith(path) for path in self.failing):
+            await asyncio.sleep(0.2)
+            raise RuntimeError("navegación fallida")
+        async with ClientSession() as session:
+            async with session.get(url) as response:
+                self._content = await response.text()
+                return FakeResponse(response.status, response.headers)
+
+    async def content(self):
+        return self._content
+
+
+class FakePool:
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.navigations = []
+
+    def tab(self):
+        pool = self
+
+        class Tab:
+            async def __aenter__(self):
+                return FakePage(pool.failing, pool.navigations)
+
+            async def __aexit__(self, *exc_info):
+                pass
+
+        return Tab()
+
+
+async def _serve(routes):
+    app = web.Application()
+    for path, handler in routes.items():
+        app.router.add_get(path, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+    return runner, f"http://{host}:{port}/"
+
+
+def _scraper(start_url, pool, **options):
+    return WebScraper(start_url, pool=pool, resource_policy=False,
+                      discovery=UrlDiscovery(use_sitemaps=False), **options)
+
+
+@pytest.fixture(autouse=True)
+def _work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # Imágenes y manifest van a la carpeta de trabajo
+
+
+def test_failed_load_frees_its_max_pages_slot(monkeypatch):
+    monkeypatch.setattr(scraper_module, "MAX_ATTEMPTS", 1)
+
+    async def start(request):
+        return web.Response(text='<a href="/a">a</a><a href="/b">b</a>', content_type="text/html")
+
+    async def page_b(request):
+        return web.Response(text="<p>b</p>", content_type="text/html")
+
+    async def main():
+        runner, base = await _serve({"/": start, "/b": page_b})
+        try:
+            crawler = _scraper(base, FakePool(failing=("/a",)), max_pages=2, concurrency=2)
+            return await asyncio.wait_for(crawler.crawl(), 30)
+        finally:
+            await runner.cleanup()
+
+    pages = asyncio.run(main())
+    assert sorted(page["url"].rsplit("/", 1)[1] for page in pages) == ["", "b"]
+
+
+def test_closing_the_stream_stops_the_crawl():
+    fetched = []
+
+    async def tree(request):
+        n = int(request.match_info.get("n") or 0)
+        fetched.append(n)
+        return web.Response(text=f'<a href="/p/{2 * n + 1}">x</a><a href="/p/{2 * n + 2}">y</a>',
+                            content_type="text/html")
+
+    async def main(method):
+        runner, base = await _serve({"/p/": tree, "/p/{n}": tree})
+        try:
+            crawler = _scraper(base + "p/", FakePool(), max_pages=40, max_depth=6, concurrency=4)
+            pages = getattr(crawler, method)(1)
+            await pages.__anext__()
+            await asyncio.sleep(0.3)  # La cola se llena y los workers esperan
+            await asyncio.wait_for(pages.aclose(), 5)
+            loaded = len(fetched)
+            await asyncio.sleep(0.3)
+            return len(fetched) - loaded
+        finally:
+            await runner.cleanup()
+
+    for method in ("iter_pages", "stream"):
+        assert asyncio.run(main(method)) == 0
+
+
+def test_not_modified_page_skips_render_when_analysis_is_cached(tmp_path):
+    async def page(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(text="<p>igual</p>", content_type="text/html", headers={"ETag": '"v1"'})
+
+    stored = {}
+    analyzed = []
+
+    async def axe(tab, url):
+        analyzed.append(url)
+        stored[url, await tab.content()] = {"url": url, "violations": []}
+        return stored[url, await tab.content()]
+
+    def cached_analysis(url, html):
+        result = stored.get((url, html))
+        return None if result is None else {"axe": result}
+
+    async def crawl(base, pool, cache, **options):
+        crawler = _scraper(base, pool, http_cache=cache, page_analyzers={"axe": axe}, **options)
+        return await crawler.crawl()
+
+    async def main():
+        runner, base = await _serve({"/": page})
+        cache = HttpCache(str(tmp_path / "http_cache"))
+        try:
+            first, second, without_store = FakePool(), FakePool(), FakePool()
+            await crawl(base, first, cache, cached_analysis=cached_analysis)
+            [page_result] = await crawl(base, second, cache, cached_analysis=cached_analysis)
+            await crawl(base, without_store, cache)
+            return first.navigations, second.navigations, without_store.navigations, page_result
+        finally:
+            cache.close()
+            await runner.cleanup()
+
+    first, second, without_store, page_result = asyncio.run(main())
+    assert len(first) == 1
+    assert second == []  # 304 y axe ya guardado: sin pestaña
+    assert page_result["analysis"] == {"axe": {"url": page_result["url"], "violations": []}}
+    assert len(without_store) == 1  # Sin resultados guardados, axe necesita la página viva
+    assert len(analyzed) == 2
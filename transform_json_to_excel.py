@@ -1,6 +1,8 @@
-import pandas as pd
+import atexit
 import os
 
+import pandas as pd
+
 # Campos originales del Excel con su mapeo al JSON
 FIELD_MAPPING = {
     "To review": None,
@@ -24,32 +26,26 @@ FIELD_MAPPING = {
     "User Impact": "impact",
 }
 
-def transform_json_to_excel(json_data, excel_file):
-    """
-    Agrega datos de un JSON ya cargado a un archivo Excel existente, sin sobrescribirlo.
-    Si hay campos en JSON que no existen en el Excel, se agregarán como nuevas columnas.
+# Buffer en memoria: excel_file -> filas ya transformadas pendientes de escribir.
+# Los testers añaden aquí sus incidencias y el libro se reescribe UNA sola vez
+# por ejecución (o en cada `flush_excel_buffer()` explícito).
+_EXCEL_BUFFER = {}
 
-    :param json_data: Lista de objetos JSON ya cargada en memoria.
-    :param excel_file: Ruta al archivo Excel donde se agregarán las filas.
-    """
+
+def _transform_rows(json_data):
+    """Convierte las incidencias JSON en filas con las columnas del Excel."""
 
     # 1️⃣ Asegurar que el JSON es una lista de objetos
     if not isinstance(json_data, list):
         json_data = [json_data]
 
-    # 2️⃣ Verificar si el archivo Excel ya existe
-    if os.path.exists(excel_file):
-        df_excel = pd.read_excel(excel_file)  # Cargar el archivo existente
-    else:
-        df_excel = pd.DataFrame(columns=FIELD_MAPPING.keys())  # Crear un DataFrame con columnas originales si no existe
-
-    # 3️⃣ Crear una lista para almacenar las nuevas filas transformadas
+    # 2️⃣ Crear una lista para almacenar las nuevas filas transformadas
     transformed_rows = []
 
     for item in json_data:
         row_data = {}
 
-        # 4️⃣ Mapear los campos del JSON con los del Excel
+        # 3️⃣ Mapear los campos del JSON con los del Excel
         extra_fields = {}  # Para campos del JSON sin match en el Excel
         for excel_field, json_key in FIELD_MAPPING.items():
             if json_key and json_key in item:
@@ -57,7 +53,7 @@ def transform_json_to_excel(json_data, excel_file):
             else:
                 row_data[excel_field] = ""  # Campo vacío si no hay match
 
-        # 5️⃣ Guardar los campos adicionales no mapeados
+        # 4️⃣ Guardar los campos adicionales no mapeados
         for key, value in item.items():
             if key not in FIELD_MAPPING.values():  # Si el campo no tiene mapeo
                 extra_fields[key] = value
@@ -67,22 +63,80 @@ def transform_json_to_excel(json_data, excel_file):
 
         transformed_rows.append(row_data)
 
-    # 6️⃣ Crear un DataFrame con los nuevos datos
+    return transformed_rows
+
+
+def _append_rows_to_excel(transformed_rows, excel_file):
+    """Lee el Excel existente (si lo hay), añade las filas y lo guarda. Una lectura y una escritura."""
+
+    # 1️⃣ Verificar si el archivo Excel ya existe
+    if os.path.exists(excel_file):
+        df_excel = pd.read_excel(excel_file)  # Cargar el archivo existente
+    else:
+        df_excel = pd.DataFrame(columns=FIELD_MAPPING.keys())  # Crear un DataFrame con columnas originales si no existe
+
+    # 2️⃣ Crear un DataFrame con los nuevos datos
     df_new_data = pd.DataFrame(transformed_rows)
 
-    # 7️⃣ Verificar si hay nuevas columnas que no existen en el Excel
+    # 3️⃣ Verificar si hay nuevas columnas que no existen en el Excel
     for column in df_new_data.columns:
         if column not in df_excel.columns:
             df_excel[column] = ""  # Agregar columna vacía en el Excel original
 
-    # 8️⃣ Concatenar los nuevos datos con el Excel existente
+    # 4️⃣ Concatenar los nuevos datos con el Excel existente
     df_final = pd.concat([df_excel, df_new_data], ignore_index=True)
 
-    # 9️⃣ Guardar el resultado en el mismo archivo Excel
+    # 5️⃣ Guardar el resultado en el mismo archivo Excel
     df_final.to_excel(excel_file, index=False)
 
     print(f"✅ Datos agregados a: {excel_file}")
 
+
+def transform_json_to_excel(json_data, excel_file):
+    """
+    Agrega datos de un JSON ya cargado a un archivo Excel existente, sin sobrescribirlo.
+    Si hay campos en JSON que no existen en el Excel, se agregarán como nuevas columnas.
+
+    ⚠️ Reescribe el libro completo en cada llamada. Para incidencias de los testers
+    usa `buffer_incidences()` + `flush_excel_buffer()`.
+
+    :param json_data: Lista de objetos JSON ya cargada en memoria.
+    :param excel_file: Ruta al archivo Excel donde se agregarán las filas.
+    """
+    _append_rows_to_excel(_transform_rows(json_data), excel_file)
+
+
+def buffer_incidences(json_data, excel_file):
+    """
+    Añade incidencias al buffer del Excel `excel_file` sin tocar el disco.
+
+    Las filas se transforman en el momento (una copia), así que cambios posteriores
+    en los dicts de incidencias no afectan a lo que se escribirá.
+    """
+    _EXCEL_BUFFER.setdefault(excel_file, []).extend(_transform_rows(json_data))
+
+
+def flush_excel_buffer(excel_file=None):
+    """
+    Escribe en disco las filas pendientes (una lectura + una escritura por libro).
+
+    :param excel_file: libro a volcar; si es None, se vuelcan todos los pendientes.
+    """
+    excel_files = [excel_file] if excel_file is not None else list(_EXCEL_BUFFER)
+
+    for file_name in excel_files:
+        rows = _EXCEL_BUFFER.pop(file_name, None)
+        if rows is None:
+            continue
+        if not rows and os.path.exists(file_name):
+            continue  # Nada que añadir: evitamos reescribir el libro
+        _append_rows_to_excel(rows, file_name)
+
+
+# Si el proceso termina sin flush explícito (p. ej. un tester ejecutado suelto),
+# no perdemos las filas pendientes.
+atexit.register(flush_excel_buffer)
+
 # 📌 Ejemplo de uso
 # json_data = [{"title": "Missing heading", "severity": "High", "element_info": "Line 23"}]
 # transform_json_to_excel(json_data, "accessibility_report.xlsx")